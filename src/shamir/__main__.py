@@ -0,0 +1,269 @@
+""" Command line interface.
+
+    python -m shamir split -k 3 -n 5 -o backup.tar backup.tar      writes backup.tar.1 .. backup.tar.5
+    python -m shamir combine backup.tar.2 backup.tar.4 backup.tar.5 > backup.tar
+    echo -n secret | python -m shamir split -k 2 -n 3 --format hex    one hex share per line
+    python -m shamir combine --format hex < two_lines.txt
+    python -m shamir verify -k 3 backup.tar.*
+    python -m shamir bench --suite quick
+
+    Files are processed by chunks: split, combine and verify only keep a few chunks in memory. Block shares
+    are mapped in memory (hex/base64 block shares are first decoded to a temporary file).
+    With hex/base64 lines on stdin or stdout, the shares are held in memory.
+"""
+import argparse
+import base64
+import binascii
+import collections
+import contextlib
+import io
+import mmap
+import shutil
+import sys
+import tempfile
+from shamir import benchmark
+from shamir.container import MAGIC, BlockShare, EncodingError
+from shamir.polynomial import DecodingError
+from shamir.shamir import ShamirStringSharer
+from shamir.verifiable import VerifiableSharer
+
+FORMATS = ["raw", "hex", "base64"]
+ENCODERS = {"hex": binascii.hexlify, "base64": base64.b64encode}
+DECODERS = {"hex": binascii.unhexlify, "base64": base64.b64decode}
+# input/output units of the encodings: hex encodes 1 byte in 2 characters, base64 3 bytes in 4
+UNITS = {"hex": (1, 2), "base64": (3, 4)}
+
+
+class TextSink(object):
+    """ Writes the data written to it, hex or base64 encoded, to the binary file 'output', then a newline on close """
+    def __init__(self, output, encoding):
+        self.output = output
+        self.encoding = encoding
+        self.pending = b""
+
+    def write(self, data):
+        data = self.pending + data
+        usable = len(data) - len(data) % UNITS[self.encoding][0]
+        self.output.write(ENCODERS[self.encoding](data[:usable]))
+        self.pending = data[usable:]
+
+    def close(self):
+        self.output.write(ENCODERS[self.encoding](self.pending) + b"\n")
+        self.pending = b""
+
+
+class TextSource(object):
+    """ Reads the hex or base64 encoded binary file 'source' (whitespace is ignored) """
+    def __init__(self, source, encoding):
+        self.source = source
+        self.encoding = encoding
+        self.pending = b""
+        self.decoded = b""
+
+    def read(self, size=-1):
+        unit = UNITS[self.encoding][1]
+        while size < 0 or len(self.decoded) < size:
+            data = self.source.read(-1 if size < 0 else max(unit, size * 2))
+            text = self.pending + b"".join(data.split())
+            usable = len(text) if not data else len(text) - len(text) % unit
+            self.pending = text[usable:]
+            self.decoded += DECODERS[self.encoding](text[:usable])
+            if not data:
+                break
+        if size < 0:
+            size = len(self.decoded)
+        result, self.decoded = self.decoded[:size], self.decoded[size:]
+        return result
+
+
+def open_input(path):
+    return sys.stdin.buffer if path == "-" else open(path, "rb")
+
+def is_block_share(path, encoding):
+    with open(path, "rb") as f:
+        source = f if encoding == "raw" else TextSource(f, encoding)
+        return source.read(len(MAGIC))[:len(MAGIC)] == MAGIC
+
+def read_share_lines(source, encoding):
+    """ Shares given one per line """
+    return [DECODERS[encoding](line.strip()) for line in source if line.strip()]
+
+def share_inputs(paths, encoding):
+    """ The share files, or the shares given as lines on stdin (bytes) when no path is given """
+    if paths:
+        return paths
+    if encoding == "raw":
+        raise ValueError("raw shares must be given as files")
+    return read_share_lines(sys.stdin.buffer, encoding)
+
+def open_stream(share, encoding, files):
+    """ File-like object reading the decoded share file 'share' by chunks (or a share line).
+        The files are closed by the ExitStack 'files'.
+    """
+    if isinstance(share, bytes):
+        return io.BytesIO(share)
+    f = files.enter_context(open(share, "rb"))
+    return f if encoding == "raw" else TextSource(f, encoding)
+
+def open_share(share, encoding, files, chunk_size=2**20):
+    """ Source of a share for ShamirStringSharer.recombine_stream: a BlockShare of the mapped file
+        for block shares, else a file-like object (see open_stream)
+    """
+    if isinstance(share, bytes):
+        return BlockShare(share) if share[:len(MAGIC)] == MAGIC else io.BytesIO(share)
+    if not is_block_share(share, encoding):
+        return open_stream(share, encoding, files)
+    f = files.enter_context(open(share, "rb"))
+    if encoding != "raw":
+        decoded = files.enter_context(tempfile.TemporaryFile())
+        shutil.copyfileobj(TextSource(f, encoding), decoded, chunk_size)
+        decoded.flush()
+        f = decoded
+    block_share = BlockShare(files.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)))
+    # the view on the map must be released before the map is closed
+    files.callback(block_share.data.release)
+    return block_share
+
+
+def split(args):
+    sharer = ShamirStringSharer()
+    source = open_input(args.input)
+    try:
+        if args.output is None:
+            if args.format == "raw":
+                raise ValueError("raw shares need an output prefix (-o)")
+            buffers = [io.BytesIO() for i in range(args.numshares)]
+            sinks = [TextSink(buffer, args.format) for buffer in buffers]
+            sharer.share_stream(source, sinks, args.threshold, args.chunk_size, args.jobs)
+            for sink, buffer in zip(sinks, buffers):
+                sink.close()
+                sys.stdout.buffer.write(buffer.getvalue())
+            return 0
+        files = [open("%s.%d" % (args.output, idx + 1), "wb") for idx in range(args.numshares)]
+        try:
+            sinks = files if args.format == "raw" else [TextSink(f, args.format) for f in files]
+            sharer.share_stream(source, sinks, args.threshold, args.chunk_size, args.jobs)
+            if args.format != "raw":
+                for sink in sinks:
+                    sink.close()
+        finally:
+            for f in files:
+                f.close()
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+    return 0
+
+def combine(args):
+    sharer = ShamirStringSharer()
+    shares = share_inputs(args.shares, args.format)
+    sink = sys.stdout.buffer if args.output in (None, "-") else open(args.output, "wb")
+    try:
+        with contextlib.ExitStack() as files:
+            sources = [open_share(share, args.format, files, args.chunk_size) for share in shares]
+            sharer.recombine_stream(sources, sink, args.chunk_size, args.jobs)
+    finally:
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    return 0
+
+def verify(args):
+    """ Prints OK or the problem of each share, returns 1 if any share is invalid """
+    shares = share_inputs(args.shares, args.format)
+    names = args.shares or ["line %d" % (i + 1) for i in range(len(shares))]
+    problems = {}
+    with contextlib.ExitStack() as files:
+        if args.commitments is not None:
+            commitments = files.enter_context(open(args.commitments, "rb"))
+            sources = [open_stream(share, args.format, files) for share in shares]
+            for name, valid in zip(names, VerifiableSharer().verify_stream(sources, commitments)):
+                if not valid:
+                    problems[name] = "does not match the commitments"
+        else:
+            sharer = ShamirStringSharer()
+            indexes = {}
+            for name, share in zip(names, shares):
+                try:
+                    source = open_share(share, args.format, files, args.chunk_size)
+                    share_idx = sharer.read_share_index(source)
+                    if isinstance(source, BlockShare):
+                        source.verify()
+                    else:
+                        collections.deque(sharer.iter_share_values(source, args.chunk_size), maxlen=0)
+                    indexes[name] = share_idx
+                except EncodingError as e:
+                    problems[name] = str(e)
+            if args.threshold is not None and len(indexes) > args.threshold:
+                try:
+                    # the shares are read again, in lockstep
+                    sources = [open_share(share, args.format, files, args.chunk_size)
+                               for name, share in zip(names, shares) if name in indexes]
+                    bad = sharer.recombine_robust_stream(sources, None, args.threshold, args.chunk_size)
+                    for name, share_idx in indexes.items():
+                        if share_idx in bad:
+                            problems[name] = "inconsistent with the other shares"
+                except (DecodingError, EncodingError) as e:
+                    for name in indexes:
+                        problems[name] = "cannot be checked: %s" % (e)
+    for name in names:
+        print("%s: %s" % (name, problems.get(name, "OK")))
+    return 1 if problems else 0
+
+def bench(args):
+    return benchmark.main(args.arguments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m shamir", description="Shamir secret sharing of files and streams")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    parser_split = commands.add_parser("split", help="split a secret into shares")
+    parser_split.add_argument("input", nargs="?", default="-", help="secret file (default: stdin)")
+    parser_split.add_argument("-k", "--threshold", type=int, required=True, help="shares needed to recombine")
+    parser_split.add_argument("-n", "--numshares", type=int, required=True)
+    parser_split.add_argument("-o", "--output", help="write the shares to OUTPUT.1 .. OUTPUT.n "
+                                                     "(default: one hex/base64 share per line on stdout)")
+    parser_split.set_defaults(function=split)
+
+    parser_combine = commands.add_parser("combine", help="recombine a secret from k shares")
+    parser_combine.add_argument("shares", nargs="*", help="share files (default: one hex/base64 share per line on stdin)")
+    parser_combine.add_argument("-o", "--output", help="secret file (default: stdout)")
+    parser_combine.set_defaults(function=combine)
+
+    parser_verify = commands.add_parser("verify", help="check shares without recombining the secret")
+    parser_verify.add_argument("shares", nargs="*", help="share files (default: one hex/base64 share per line on stdin)")
+    parser_verify.add_argument("-k", "--threshold", type=int,
+                               help="with more than k shares, also find the shares inconsistent with the others")
+    parser_verify.add_argument("--commitments", help="check verifiable shares against this commitments file")
+    parser_verify.set_defaults(function=verify)
+
+    for subparser in (parser_split, parser_combine, parser_verify):
+        subparser.add_argument("--format", choices=FORMATS, default=None,
+                               help="share encoding (default: raw for files, hex for lines)")
+    for subparser in (parser_split, parser_combine, parser_verify):
+        subparser.add_argument("--chunk-size", type=int, default=2**20, help="bytes read at once (default: 1MiB)")
+    for subparser in (parser_split, parser_combine):
+        subparser.add_argument("--jobs", type=int, default=None, help="process the chunks in N processes")
+
+    parser_bench = commands.add_parser("bench", add_help=False,
+                                       help="run the benchmarks (arguments of python -m shamir.benchmark)")
+    parser_bench.set_defaults(function=bench)
+
+    args, arguments = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.arguments = arguments
+    elif arguments:
+        parser.error("unrecognized arguments: %s" % " ".join(arguments))
+    if args.command != "bench" and args.format is None:
+        files = args.output if args.command == "split" else args.shares
+        args.format = "raw" if files else "hex"
+    try:
+        return args.function(args)
+    except (EncodingError, DecodingError, ValueError, OSError) as e:
+        sys.stderr.write("python -m shamir %s: error: %s\n" % (args.command, e))
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+""" Benchmark and regression suite, run with: python -m shamir.benchmark --help
+
+    Results are {name: seconds} dicts, they can be saved as JSON and compared
+    against a saved baseline: the run fails when a benchmark is slower than
+    the baseline by more than the allowed regression.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from shamir.field import ZpField, FastZpField
+from shamir.polynomial import Polynomial, PointSet
+from shamir.random_source import UnitTestRandomSource
+from shamir.shamir import ShamirStringSharer
+
+P = 4294967311
+
+SUITES = {
+    # (secret sizes, (k, n) schemes) pairs
+    "quick": [([16, 1024, 65536], [(2, 3), (3, 5), (10, 20)]),
+              ([16], [(100, 200)])],
+    "full": [([16, 1024, 65536, 2**20, 16 * 2**20, 64 * 2**20], [(2, 3), (3, 5), (5, 9), (10, 20)]),
+             ([16, 1024], [(100, 200), (500, 1000), (1000, 2000)])],
+}
+
+
+def time_per_call(func, number):
+    """ Best time of a single call to func in seconds """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+def time_once(func, repeat=1):
+    """ Best time of 'repeat' single calls to func in seconds """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def bench_field(field, number=100000):
+    """ Time per operation for the value type of 'field' """
+    V = field.value_type
+    a, b = V(1234567891), V(3987654321)
+    k = 50
+    poly = Polynomial([V(i * 7919 + 1) for i in range(k)])
+    points = PointSet([(V(i+1), V(i * 104729 + 3)) for i in range(k)], field.zero(), field.one())
+    return {
+        "add": time_per_call(lambda: a + b, number),
+        "mul": time_per_call(lambda: a * b, number),
+        "neg": time_per_call(lambda: -a, number),
+        "invert": time_per_call(lambda: ~a, number // 10),
+        "polynomial_evaluate_k50": time_per_call(lambda: poly.evaluate(b), number // 100),
+        "evaluate_lagrange_k50": time_per_call(lambda: points.evaluate_lagrange(field.zero()), max(1, number // 10000)),
+    }
+
+def bench_fast_field_ints(field, number=100000):
+    """ Time per operation for the plain int methods of a FastZpField """
+    a, b = 1234567891, 3987654321
+    coefs = [i * 7919 + 1 for i in range(50)]
+    return {
+        "add": time_per_call(lambda: field.add(a, b), number),
+        "mul": time_per_call(lambda: field.mul(a, b), number),
+        "neg": time_per_call(lambda: field.neg(a), number),
+        "invert": time_per_call(lambda: field.inverse(a), number // 10),
+        "polynomial_evaluate_k50": time_per_call(lambda: field.evaluate(coefs, b), number // 100),
+    }
+
+def compare_fields(number=100000):
+    """ Returns [(operation, ZpField time, FastZpField time, FastZpField plain int time or None)] """
+    random_source = UnitTestRandomSource(itertools.count())
+    slow = bench_field(ZpField(P, random_source), number)
+    fast = bench_field(FastZpField(P, random_source), number)
+    ints = bench_fast_field_ints(FastZpField(P, random_source), number)
+    return [(op, slow[op], fast[op], ints.get(op)) for op in sorted(slow)]
+
+def bench_micro(number=100000):
+    """ Hot paths below share/recombine """
+    results = {}
+    for name, field in [("ZpField", ZpField(P)), ("FastZpField", FastZpField(P))]:
+        for op, seconds in bench_field(field, number).items():
+            results["micro/%s/%s" % (name, op)] = seconds
+        V = field.value_type
+        points = PointSet([(V(i+1), V(i * 104729 + 3)) for i in range(20)], field.zero(), field.one())
+        results["micro/%s/get_lagrange_polynomial_k20" % name] = time_per_call(points.get_lagrange_polynomial, 3)
+    sharer = ShamirStringSharer()
+    values = [(i * 2654435761) % P for i in range(2**16)]
+    encoded = sharer.encode_share_values(values)
+    results["micro/encode_share_values_64k"] = time_per_call(lambda: sharer.encode_share_values(values), 10)
+    results["micro/decode_share_values_64k"] = time_per_call(lambda: sharer.decode_share_values(encoded), 10)
+    return results
+
+def bench_end_to_end(matrix, repeat=1):
+    """ share and recombine for every (secret sizes, schemes) pair of the matrix """
+    results = {}
+    sharer = ShamirStringSharer()
+    for sizes, schemes in matrix:
+        for size, (k, n) in itertools.product(sizes, schemes):
+            secret = os.urandom(size)
+            shares = sharer.share(secret, k, n)
+            name = "size=%d/k=%d/n=%d" % (size, k, n)
+            results["share/" + name] = time_once(lambda: sharer.share(secret, k, n), repeat)
+            results["recombine/" + name] = time_once(lambda: sharer.recombine(shares[:k]), repeat)
+    return results
+
+def run_suite(suite="quick", micro=True, repeat=1):
+    results = bench_micro() if micro else {}
+    results.update(bench_end_to_end(SUITES[suite] if isinstance(suite, str) else suite, repeat))
+    return results
+
+def compare_results(results, baseline, max_regression=0.25):
+    """ Returns [(name, baseline seconds, seconds)] for the benchmarks slower than the baseline
+        by more than max_regression (0.25: 25% slower)
+    """
+    return [(name, baseline[name], seconds) for name, seconds in sorted(results.items())
+            if name in baseline and seconds > baseline[name] * (1 + max_regression)]
+
+def save_results(results, path):
+    report = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+def print_fields_comparison():
+    print("%-26s %12s %12s %8s %12s %8s" % ("operation", "ZpField", "FastZpField", "speedup", "plain int", "speedup"))
+    for op, slow, fast, ints in compare_fields():
+        line = "%-26s %10.3fus %10.3fus %7.2fx" % (op, slow * 1e6, fast * 1e6, slow / fast)
+        if ints is not None:
+            line += " %10.3fus %7.2fx" % (ints * 1e6, slow / ints)
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m shamir.benchmark", description="shamir benchmarks")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--no-micro", action="store_true", help="skip the micro-benchmarks")
+    parser.add_argument("--repeat", type=int, default=1, help="runs of each end-to-end benchmark (best is kept)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="fail when slower than the baseline by more than this ratio (default: 0.25)")
+    parser.add_argument("--fields", action="store_true", help="only compare ZpField and FastZpField operations")
+    args = parser.parse_args(argv)
+    if args.fields:
+        print_fields_comparison()
+        return 0
+    results = run_suite(args.suite, micro=not args.no_micro, repeat=args.repeat)
+    for name, seconds in sorted(results.items()):
+        print("%-50s %14.3fus" % (name, seconds * 1e6))
+    if args.output:
+        save_results(results, args.output)
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.max_regression)
+        for name, before, after in regressions:
+            print("REGRESSION %s: %.6fs -> %.6fs (%+.0f%%)" % (name, before, after, (after / before - 1) * 100))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
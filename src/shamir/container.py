@@ -0,0 +1,160 @@
+""" Versioned container formats.
+
+    header: MAGIC + format version (1 byte) + mode (1 byte)
+
+    Shares of ShamirStringSharer have no header (MODE_PLAIN). They never start with MAGIC:
+    a share index can only start with 0xff when followed by 8 bytes starting with 0x00.
+
+    Block share (MODE_BLOCKS): a ShamirStringSharer share whose values can be sliced without parsing.
+        header
+        BLOCK_HEADER: field id, share index, threshold, block count, secret length, blocks per chunk,
+                      overflow count, CRC32 of these fields
+        overflow count * 8 bytes: sorted indexes of the values >= 2**32, then their CRC32
+        block count * 4 bytes: the low 32 bits of each value, little-endian
+        CRC32 of each chunk of values
+"""
+import array
+import bisect
+import struct
+import sys
+import zlib
+from shamir.vectorized import numpy
+
+
+class EncodingError(Exception):
+    pass
+
+MAGIC = b"\xffSHM"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+MODE_PLAIN = 0
+MODE_HYBRID_KEY = 1
+MODE_HYBRID_CIPHERTEXT = 2
+MODE_DISPERSAL = 3
+MODE_VERIFIABLE_SHARE = 4
+MODE_COMMITMENTS = 5
+MODE_BLOCKS = 6
+
+MODE_NAMES = {MODE_PLAIN: "plain", MODE_HYBRID_KEY: "hybrid key share", MODE_HYBRID_CIPHERTEXT: "hybrid ciphertext",
+              MODE_DISPERSAL: "dispersal share", MODE_VERIFIABLE_SHARE: "verifiable share",
+              MODE_COMMITMENTS: "commitments", MODE_BLOCKS: "block share"}
+
+FIELD_GF_4294967311 = 1
+BLOCK_HEADER = struct.Struct(">BQIQQIQ")
+CHUNK_BLOCKS = 4096
+
+
+def pack_header(mode, version=FORMAT_VERSION):
+    return MAGIC + struct.pack("BB", version, mode)
+
+def unpack_header(data):
+    """ Returns (version, mode, cursor after the header). Data without header is (0, MODE_PLAIN, 0) """
+    if data[:len(MAGIC)] != MAGIC:
+        return (0, MODE_PLAIN, 0)
+    if len(data) < HEADER_SIZE:
+        raise EncodingError("Decoding error: truncated header")
+    version, mode = struct.unpack_from("BB", data, len(MAGIC))
+    if version > FORMAT_VERSION:
+        raise EncodingError("Decoding error: unsupported format version: %d" % (version))
+    return (version, mode, HEADER_SIZE)
+
+def get_mode(data):
+    return unpack_header(data)[1]
+
+def expect_header(data, mode):
+    """ Check that data starts with the header of 'mode', returns the cursor after the header """
+    version, found, cursor = unpack_header(data)
+    if found != mode:
+        raise EncodingError("Decoding error: expected %s, got %s" % (MODE_NAMES[mode], MODE_NAMES.get(found, found)))
+    return cursor
+
+
+def encode_block_share(share_idx, values, threshold, secret_length, chunk_blocks=CHUNK_BLOCKS):
+    """ Block share of the values (list or NumPy array) of share 'share_idx' """
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        overflow = numpy.flatnonzero(values >> numpy.uint64(32)).tolist()
+        low = (values & numpy.uint64(0xffffffff)).astype("<u4").tobytes()
+    else:
+        overflow = [i for i, v in enumerate(values) if v >> 32]
+        words = array.array("I", [v & 0xffffffff for v in values])
+        if sys.byteorder != "little":
+            words.byteswap()
+        low = words.tobytes()
+    fields = BLOCK_HEADER.pack(FIELD_GF_4294967311, share_idx, threshold, len(values), secret_length,
+                               chunk_blocks, len(overflow))
+    overflow_table = struct.pack(">%dQ" % len(overflow), *overflow)
+    chunk_size = 4 * chunk_blocks
+    crcs = [zlib.crc32(low[i:i+chunk_size]) for i in range(0, len(low), chunk_size)]
+    return b"".join([pack_header(MODE_BLOCKS), fields, struct.pack(">I", zlib.crc32(fields)),
+                     overflow_table, struct.pack(">I", zlib.crc32(overflow_table)),
+                     low, struct.pack(">%dI" % len(crcs), *crcs)])
+
+
+class BlockShare(object):
+    """ Block share read from any buffer (bytes, mmap, memoryview) without copying it.
+        Only the chunks of the values that are read are checked against their CRC.
+    """
+    def __init__(self, data):
+        self.data = memoryview(data)
+        cursor = expect_header(self.data, MODE_BLOCKS)
+        if len(self.data) < cursor + BLOCK_HEADER.size + 4:
+            raise EncodingError("Decoding error: truncated block share header")
+        fields = self.data[cursor:cursor+BLOCK_HEADER.size]
+        (self.field_id, self.share_idx, self.threshold, self.numblocks, self.secret_length,
+         self.chunk_blocks, numoverflow) = BLOCK_HEADER.unpack(fields)
+        cursor += BLOCK_HEADER.size
+        if struct.unpack_from(">I", self.data, cursor)[0] != zlib.crc32(fields):
+            raise EncodingError("Decoding error: block share header CRC mismatch")
+        if self.field_id != FIELD_GF_4294967311 or self.chunk_blocks == 0:
+            raise EncodingError("Decoding error: unsupported block share field %d" % (self.field_id))
+        cursor += 4
+        self.numchunks = -(-self.numblocks // self.chunk_blocks)
+        self.values_offset = cursor + 8 * numoverflow + 4
+        self.crcs_offset = self.values_offset + 4 * self.numblocks
+        if len(self.data) != self.crcs_offset + 4 * self.numchunks:
+            raise EncodingError("Decoding error: block share has %d bytes, %d expected" %
+                                (len(self.data), self.crcs_offset + 4 * self.numchunks))
+        overflow_table = self.data[cursor:cursor+8*numoverflow]
+        if struct.unpack_from(">I", self.data, cursor + 8 * numoverflow)[0] != zlib.crc32(overflow_table):
+            raise EncodingError("Decoding error: overflow table CRC mismatch")
+        self.overflow = list(struct.unpack(">%dQ" % numoverflow, overflow_table))
+        self.verified = set()
+
+    def __len__(self):
+        return self.numblocks
+
+    def verify_chunks(self, first, last):
+        """ Check the CRC of the chunks first to last (included) """
+        chunk_size = 4 * self.chunk_blocks
+        for chunk in range(first, last + 1):
+            if chunk in self.verified:
+                continue
+            start = self.values_offset + chunk * chunk_size
+            end = min(start + chunk_size, self.crcs_offset)
+            if zlib.crc32(self.data[start:end]) != struct.unpack_from(">I", self.data, self.crcs_offset + 4 * chunk)[0]:
+                raise EncodingError("Decoding error: CRC mismatch in chunk %d" % (chunk))
+            self.verified.add(chunk)
+
+    def values(self, start=0, end=None):
+        """ List of the values of the blocks [start:end[ """
+        end = self.numblocks if end is None else min(end, self.numblocks)
+        if start >= end:
+            return []
+        self.verify_chunks(start // self.chunk_blocks, (end - 1) // self.chunk_blocks)
+        raw = self.data[self.values_offset+4*start:self.values_offset+4*end]
+        if numpy is not None:
+            values = numpy.frombuffer(raw, dtype="<u4").tolist()
+        else:
+            words = array.array("I")
+            words.frombytes(raw)
+            if sys.byteorder != "little":
+                words.byteswap()
+            values = words.tolist()
+        for i in self.overflow[bisect.bisect_left(self.overflow, start):bisect.bisect_left(self.overflow, end)]:
+            values[i - start] += 2**32
+        return values
+
+    def verify(self):
+        """ Check the CRC of all the chunks """
+        self.verify_chunks(0, self.numchunks - 1)
@@ -0,0 +1,102 @@
+""" Information dispersal mode (Krawczyk's computational secret sharing): each share is about |S|/k.
+
+    The secret is encrypted with a random key and the key is shared (see shamir.hybrid), the ciphertext
+    is then dispersed with Rabin's IDA instead of being stored by every custodian.
+
+    IDA: the ciphertext is cut in 4 byte blocks, each group of k blocks holds the coefficients (lowest
+    degree first) of a polynomial of degree k-1 in GF(P) and share i holds its value at x=i+1.
+    From k shares the coefficients are recovered with the inverse of the Vandermonde matrix, whose
+    columns are the Lagrange multiplier polynomials of the share points.
+
+    share: header (MODE_DISPERSAL) + varint threshold + varint ciphertext length + varint key share length
+           + hybrid key share + fragment encoded as a ShamirStringSharer share (index + values)
+"""
+import struct
+from shamir.container import MODE_DISPERSAL, pack_header, expect_header
+from shamir.hybrid import HybridSharer, ShakeCipher
+from shamir.polynomial import PointSet
+from shamir.random_source import SecureRandomSource
+from shamir.shamir import EncodingError, pack_varint, unpack_varint
+from shamir.vectorized import numpy
+
+
+class InformationDisperser(object):
+    """ Rabin's IDA of 4 byte blocks in GF(field.modulus), vectorized when 'vectorized' is given """
+    def __init__(self, field, vectorized=None):
+        self.field = field
+        self.vectorized = vectorized
+
+    def disperse(self, data, threshold, numshares):
+        """ data: bytestring of a multiple of 4*threshold bytes. Returns the values of each share (lists or arrays) """
+        numgroups = len(data) // (4 * threshold)
+        if self.vectorized is not None:
+            coefs = numpy.frombuffer(data, dtype=">u4").astype(numpy.uint64).reshape((numgroups, threshold))
+            return list(self.vectorized.evaluate(coefs, range(1, numshares+1)).T)
+        intvalues = struct.unpack(">%dI" % (len(data) // 4), data)
+        groups = [intvalues[i*threshold:(i+1)*threshold][::-1] for i in range(numgroups)]
+        return [[self.field.evaluate(group, x) for group in groups] for x in range(1, numshares+1)]
+
+    def inverse_vandermonde(self, xs):
+        """ Rows of the inverse of the Vandermonde matrix of the points xs: coefficient m is row m . ys """
+        if len(xs) == 1:
+            return [[1]]
+        V = self.field.value_type
+        points = PointSet([(V(x), self.field.zero()) for x in xs], self.field.zero(), self.field.one())
+        columns = [[c.value for c in reversed(p.coefs)] for p in points.get_lagrange_multiplier_polynomials()]
+        return [list(row) for row in zip(*columns)]
+
+    def reconstruct(self, xs, share_values):
+        """ Inverse of disperse from the values of the shares at the points xs (len(xs) == threshold) """
+        rows = self.inverse_vandermonde(xs)
+        if self.vectorized is not None:
+            ys = numpy.array(share_values, dtype=numpy.uint64)
+            coefs = numpy.stack([self.vectorized.combine(row, ys) for row in rows], axis=1)
+            return coefs.astype(">u4").tobytes()
+        modulus = self.field.modulus
+        intvalues = [sum(map(int.__mul__, row, ys)) % modulus for ys in zip(*share_values) for row in rows]
+        return struct.pack(">%dI" % len(intvalues), *intvalues)
+
+
+class DispersalSharer(object):
+    """ Encrypt the secret, share the key with Shamir and disperse the ciphertext with Rabin's IDA """
+    def __init__(self, random_source=SecureRandomSource(), cipher=ShakeCipher()):
+        self.hybrid = HybridSharer(random_source, cipher)
+        self.string_sharer = self.hybrid.key_sharer
+        self.disperser = InformationDisperser(self.string_sharer.field, self.string_sharer.vectorized)
+
+    def share(self, secret, threshold, numshares):
+        key_shares, ciphertext = self.hybrid.share(secret, threshold, numshares)
+        padded = ciphertext + b"\x00" * (-len(ciphertext) % (4 * threshold))
+        fragments = self.disperser.disperse(padded, threshold, numshares)
+        header = pack_header(MODE_DISPERSAL) + pack_varint(threshold) + pack_varint(len(ciphertext))
+        return [header + pack_varint(len(key_share)) + key_share + self.string_sharer.encode_share(idx, values)
+                for idx, (key_share, values) in enumerate(zip(key_shares, fragments))]
+
+    def decode_share(self, share):
+        """ Returns (threshold, ciphertext length, key share, index, fragment values) """
+        cursor = expect_header(share, MODE_DISPERSAL)
+        threshold, cursor = unpack_varint(share, cursor)
+        length, cursor = unpack_varint(share, cursor)
+        keylength, cursor = unpack_varint(share, cursor)
+        if len(share) < cursor + keylength:
+            raise EncodingError("Decoding error: truncated key share")
+        idx, values = self.string_sharer.decode_share(share[cursor+keylength:])
+        return (threshold, length, share[cursor:cursor+keylength], idx, values)
+
+    def recombine(self, shares):
+        decoded = {}
+        for share in shares:
+            threshold, length, key_share, idx, values = self.decode_share(share)
+            decoded.setdefault(idx, (threshold, length, key_share, values))
+        if len(set((threshold, length) for threshold, length, key_share, values in decoded.values())) != 1:
+            raise EncodingError("Decoding error: shares of different secrets")
+        threshold, length = next(iter(decoded.values()))[:2]
+        if len(decoded) < threshold:
+            raise EncodingError("Decoding error: %d shares given, %d required" % (len(decoded), threshold))
+        indexes = sorted(decoded)[:threshold]
+        fragments = [decoded[idx][3] for idx in indexes]
+        if any(len(values) != len(fragments[0]) for values in fragments) or \
+                len(fragments[0]) * 4 * threshold < length:
+            raise EncodingError("Decoding error: fragments have different lengths")
+        ciphertext = self.disperser.reconstruct([idx+1 for idx in indexes], fragments)[:length]
+        return self.hybrid.recombine([decoded[idx][2] for idx in indexes], ciphertext)
@@ -0,0 +1,148 @@
+""" Asyncio distribution of shares to custodians and collection for recombination.
+
+    Custodians are reached over TCP with length-prefixed messages:
+        request:  command (b"S" store / b"F" fetch) + varint key length + key + share
+        response: status (b"\x00" ok / b"\x01" not found) + share
+    CustodianServer is an in-process custodian, used as a local stand-in and in tests.
+"""
+import asyncio
+import collections
+import struct
+from shamir.shamir import EncodingError, pack_varint, unpack_varint
+
+STORE = b"S"
+FETCH = b"F"
+OK = b"\x00"
+NOT_FOUND = b"\x01"
+
+
+class DistributionError(Exception):
+    pass
+
+async def read_message(reader):
+    length = struct.unpack(">I", await reader.readexactly(4))[0]
+    return await reader.readexactly(length)
+
+def write_message(writer, data):
+    writer.write(struct.pack(">I", len(data)) + data)
+
+
+class CustodianServer(object):
+    """ In-process custodian storing the shares in memory.
+        'delay' (seconds) is waited before answering each request.
+    """
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.shares = {}
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.address
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            request = await read_message(reader)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            keylength, cursor = unpack_varint(request, 1)
+            key, share = request[cursor:cursor+keylength], request[cursor+keylength:]
+            if request[:1] == STORE:
+                self.shares[key] = share
+                write_message(writer, OK)
+            elif key in self.shares:
+                write_message(writer, OK + self.shares[key])
+            else:
+                write_message(writer, NOT_FOUND)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, EncodingError, struct.error):
+            pass
+        finally:
+            writer.close()
+
+
+class CustodianClient(object):
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def request(self, command, key, share=b""):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            write_message(writer, command + pack_varint(len(key)) + key + share)
+            await writer.drain()
+            response = await read_message(reader)
+        finally:
+            writer.close()
+        if response[:1] != OK:
+            raise DistributionError("%s:%d: no share for %r" % (self.host, self.port, key))
+        return response[1:]
+
+    async def store(self, key, share):
+        await self.request(STORE, key, share)
+
+    async def fetch(self, key):
+        return await self.request(FETCH, key)
+
+
+class ShareDistributor(object):
+    """ Share a secret and send one share to each custodian endpoint (host, port) concurrently """
+    def __init__(self, sharer, endpoints, timeout=10):
+        self.sharer = sharer
+        self.clients = [CustodianClient(host, port) for host, port in endpoints]
+        self.timeout = timeout
+
+    async def distribute(self, key, secret, threshold):
+        """ Returns the list of exceptions (None on success) for each endpoint.
+            Raises DistributionError if less than 'threshold' custodians stored their share.
+        """
+        shares = self.sharer.share(secret, threshold, len(self.clients))
+        results = await asyncio.gather(*[asyncio.wait_for(client.store(key, share), self.timeout)
+                                         for client, share in zip(self.clients, shares)],
+                                       return_exceptions=True)
+        errors = [r if isinstance(r, BaseException) else None for r in results]
+        if errors.count(None) < threshold:
+            raise DistributionError("only %d shares stored, %d required" % (errors.count(None), threshold))
+        return errors
+
+
+class ShareCollector(object):
+    """ Fetch shares from the custodian endpoints (host, port) concurrently and recombine
+        as soon as 'threshold' valid shares arrived, without waiting for the other custodians.
+        A share is valid if it decodes. The shares are grouped by their number of values, so that a stale
+        or wrong share (e.g. from the fastest custodian) does not exclude the shares of the other length.
+    """
+    def __init__(self, sharer, endpoints, timeout=10):
+        self.sharer = sharer
+        self.clients = [CustodianClient(host, port) for host, port in endpoints]
+        self.timeout = timeout
+
+    async def collect(self, key, threshold):
+        tasks = [asyncio.ensure_future(asyncio.wait_for(client.fetch(key), self.timeout)) for client in self.clients]
+        groups = collections.defaultdict(dict)
+        try:
+            for next_share in asyncio.as_completed(tasks):
+                try:
+                    share = await next_share
+                    share_idx, values = self.sharer.decode_share(share)
+                except (DistributionError, EncodingError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        struct.error):
+                    continue
+                shares = groups[len(values)]
+                shares.setdefault(share_idx, share)
+                if len(shares) == threshold:
+                    return self.sharer.recombine(list(shares.values()))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        collected = max([len(shares) for shares in groups.values()] or [0])
+        raise DistributionError("only %d valid shares collected, %d required" % (collected, threshold))
@@ -34,6 +34,7 @@ def make_zp_value_type(modulus):
             return ZpValue(bezout_a % modulus)
         def __floordiv__(self, other):
             return self * ~other
+        __truediv__ = __div__ = __floordiv__
         def __int__(self):
             return self.value
     return ZpValue
@@ -51,3 +52,151 @@ class ZpField(object):
     def random(self):
         return self.value_type(self.random_source.randrange(0, self.modulus))
 
+
+def make_fast_zp_value_type(modulus):
+    """ Lightweight value type for FastZpField: no range check, no per-instance dict """
+    def inverse(value):
+        if value % modulus == 0:
+            raise ZeroDivisionError()
+        return pow(value, -1, modulus)
+    class FastZpValue(object):
+        __slots__ = ("value",)
+        def __init__(self, value):
+            self.value = value
+        def __neg__(self):
+            return FastZpValue(-self.value % modulus)
+        def __add__(self, other):
+            return FastZpValue((self.value + other.value) % modulus)
+        def __eq__(self, other):
+            return self.value == other.value
+        def __ne__(self, other):
+            return self.value != other.value
+        def __hash__(self):
+            return hash(self.value)
+        def __sub__(self, other):
+            return FastZpValue((self.value - other.value) % modulus)
+        def __mul__(self, other):
+            return FastZpValue(self.value * other.value % modulus)
+        def __pow__(self, other):
+            return FastZpValue(pow(self.value, other.value, modulus))
+        def __str__(self):
+            return str(self.value)
+        def __repr__(self):
+            return repr(self.value)
+        def __invert__(self):
+            return FastZpValue(inverse(self.value))
+        def __floordiv__(self, other):
+            return FastZpValue(self.value * inverse(other.value) % modulus)
+        __truediv__ = __div__ = __floordiv__
+        def __int__(self):
+            return self.value
+    return FastZpValue
+
+class FastZpField(ZpField):
+    """ZpZ field with the given modulus, computing on plain ints.
+
+       The value_type is a thin wrapper so that Polynomial, PointSet and ShamirPointSharer
+       can use it transparently, the int methods below avoid the wrapping altogether.
+    """
+    def __init__(self, modulus=257, random_source=SecureRandomSource()):
+        self.modulus = modulus
+        self.value_type = make_fast_zp_value_type(self.modulus)
+        self.random_source = random_source
+    def add(self, a, b):
+        return (a + b) % self.modulus
+    def sub(self, a, b):
+        return (a - b) % self.modulus
+    def neg(self, a):
+        return -a % self.modulus
+    def mul(self, a, b):
+        return a * b % self.modulus
+    def inverse(self, a):
+        if a % self.modulus == 0:
+            raise ZeroDivisionError()
+        return pow(a, -1, self.modulus)
+    def div(self, a, b):
+        return a * self.inverse(b) % self.modulus
+    def evaluate(self, coefs, x):
+        """ Evaluate the polynomial with int coefs (highest degree first) at x using Horner's method """
+        val = 0
+        for c in coefs:
+            val = (val * x + c) % self.modulus
+        return val
+
+def make_gf256_tables(polynomial=0x11b, generator=3):
+    """ Returns the (exp, log) tables of GF(2^8) for the given reduction polynomial.
+        exp has 510 entries so that exp[log[a] + log[b]] needs no modulo.
+    """
+    exp = [0] * 510
+    log = [0] * 256
+    value = 1
+    for i in range(255):
+        exp[i] = exp[i + 255] = value
+        log[value] = i
+        # multiply by the generator (x + 1): value * x + value
+        doubled = value << 1
+        if doubled & 0x100:
+            doubled ^= polynomial
+        value = doubled ^ value
+    return exp, log
+
+GF256_EXP, GF256_LOG = make_gf256_tables()
+
+def gf256_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return GF256_EXP[GF256_LOG[a] + GF256_LOG[b]]
+
+def gf256_inverse(a):
+    if a == 0:
+        raise ZeroDivisionError()
+    return GF256_EXP[255 - GF256_LOG[a]]
+
+class GF256Value(object):
+    __slots__ = ("value",)
+    def __init__(self, value):
+        self.value = value
+    def __neg__(self):
+        return self
+    def __add__(self, other):
+        return GF256Value(self.value ^ other.value)
+    __sub__ = __add__
+    def __eq__(self, other):
+        return self.value == other.value
+    def __ne__(self, other):
+        return self.value != other.value
+    def __hash__(self):
+        return hash(self.value)
+    def __mul__(self, other):
+        return GF256Value(gf256_mul(self.value, other.value))
+    def __str__(self):
+        return str(self.value)
+    def __repr__(self):
+        return repr(self.value)
+    def __invert__(self):
+        return GF256Value(gf256_inverse(self.value))
+    def __floordiv__(self, other):
+        return GF256Value(gf256_mul(self.value, gf256_inverse(other.value)))
+    __truediv__ = __div__ = __floordiv__
+    def __int__(self):
+        return self.value
+
+class GF256Field(object):
+    """GF(2^8) field (AES polynomial x^8+x^4+x^3+x+1) using log/antilog tables"""
+    def __init__(self, random_source=SecureRandomSource()):
+        self.modulus = 256
+        self.value_type = GF256Value
+        self.random_source = random_source
+        self.mul_tables = {}
+    def zero(self):
+        return self.value_type(0)
+    def one(self):
+        return self.value_type(1)
+    def random(self):
+        return self.value_type(self.random_source.randrange(0, 256))
+    def mul_table(self, a):
+        """ 256 byte translation table: bytestring.translate(mul_table(a)) multiplies every byte by a """
+        table = self.mul_tables.get(a)
+        if table is None:
+            table = self.mul_tables[a] = bytes(gf256_mul(a, b) for b in range(256))
+        return table
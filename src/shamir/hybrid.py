@@ -0,0 +1,118 @@
+""" Hybrid sharing: the payload is encrypted once with a random 32 byte key and only the key is shared.
+
+    Each custodian stores a small key share, the ciphertext is stored once:
+        key share:  header (MODE_HYBRID_KEY) + ShamirStringSharer share of the key
+        ciphertext: header (MODE_HYBRID_CIPHERTEXT) + cipher id (1 byte) + cipher output
+    The header and the cipher id are authenticated by the cipher as associated data.
+"""
+import hashlib
+import hmac
+import os
+import struct
+from shamir.container import MODE_HYBRID_KEY, MODE_HYBRID_CIPHERTEXT, pack_header, expect_header
+from shamir.random_source import SecureRandomSource
+from shamir.shamir import EncodingError, ShamirStringSharer
+from shamir.utils import xor_bytes
+from shamir.vectorized import numpy
+
+KEY_SIZE = 32
+
+
+class AuthenticationError(Exception):
+    pass
+
+
+class ShakeCipher(object):
+    """ Authenticated cipher built from hashlib (encrypt-then-MAC).
+        The keystream of chunk i is SHAKE-256(encryption key + nonce + i), the tag is the HMAC-SHA256
+        of the associated data length (8 bytes), the associated data, the nonce and the ciphertext
+        with the MAC key. Both keys are derived from the key.
+        output: nonce (16 bytes) + ciphertext + tag (32 bytes)
+    """
+    cipher_id = 1
+    NONCE_SIZE = 16
+    TAG_SIZE = 32
+
+    def __init__(self, chunk_size=2**16):
+        self.chunk_size = chunk_size
+
+    def derive_keys(self, key):
+        return (hashlib.blake2b(key, digest_size=32, person=b"shamir-enc").digest(),
+                hashlib.blake2b(key, digest_size=32, person=b"shamir-mac").digest())
+
+    def xor_keystream(self, enc_key, nonce, data):
+        view = memoryview(data)
+        output = bytearray(len(data))
+        output_array = numpy.frombuffer(output, dtype=numpy.uint8) if numpy is not None else None
+        for i, start in enumerate(range(0, len(data), self.chunk_size)):
+            chunk = view[start:start+self.chunk_size]
+            keystream = hashlib.shake_256(enc_key + nonce + struct.pack(">Q", i)).digest(len(chunk))
+            if output_array is not None:
+                numpy.bitwise_xor(numpy.frombuffer(chunk, dtype=numpy.uint8), numpy.frombuffer(keystream, dtype=numpy.uint8),
+                                  out=output_array[start:start+len(chunk)])
+            else:
+                output[start:start+len(chunk)] = xor_bytes(chunk, keystream)
+        return bytes(output)
+
+    def tag(self, mac_key, associated_data, nonce, ciphertext):
+        mac = hmac.new(mac_key, struct.pack(">Q", len(associated_data)), hashlib.sha256)
+        mac.update(associated_data)
+        mac.update(nonce)
+        mac.update(ciphertext)
+        return mac.digest()
+
+    def encrypt(self, key, plaintext, associated_data=b""):
+        enc_key, mac_key = self.derive_keys(key)
+        nonce = os.urandom(self.NONCE_SIZE)
+        ciphertext = self.xor_keystream(enc_key, nonce, plaintext)
+        return nonce + ciphertext + self.tag(mac_key, associated_data, nonce, ciphertext)
+
+    def decrypt(self, key, data, associated_data=b""):
+        if len(data) < self.NONCE_SIZE + self.TAG_SIZE:
+            raise AuthenticationError("ciphertext too short")
+        enc_key, mac_key = self.derive_keys(key)
+        nonce, ciphertext, tag = data[:self.NONCE_SIZE], data[self.NONCE_SIZE:-self.TAG_SIZE], data[-self.TAG_SIZE:]
+        if not hmac.compare_digest(tag, self.tag(mac_key, associated_data, nonce, ciphertext)):
+            raise AuthenticationError("ciphertext authentication failed")
+        return self.xor_keystream(enc_key, nonce, ciphertext)
+
+
+class CallbackCipher(object):
+    """ Cipher from two callbacks, to plug an external authenticated cipher (AES-GCM, ChaCha20-Poly1305...):
+        encrypt(key, plaintext, associated_data) -> data and decrypt(key, data, associated_data) -> plaintext,
+        decrypt raises on tampered data or associated data.
+        cipher_id (2-255) is stored in the ciphertext header and checked at recombination.
+    """
+    def __init__(self, cipher_id, encrypt, decrypt):
+        self.cipher_id = cipher_id
+        self.encrypt = encrypt
+        self.decrypt = decrypt
+
+
+class HybridSharer(object):
+    """ Encrypt the secret with a random key and share the key with a ShamirStringSharer """
+    def __init__(self, random_source=SecureRandomSource(), cipher=ShakeCipher()):
+        self.key_sharer = ShamirStringSharer(random_source)
+        self.random_source = random_source
+        self.cipher = cipher
+
+    def share(self, secret, threshold, numshares):
+        """ Returns (key shares, ciphertext) """
+        key = bytes(self.random_source.randrange_many(0, 256, KEY_SIZE))
+        header = pack_header(MODE_HYBRID_CIPHERTEXT) + struct.pack("B", self.cipher.cipher_id)
+        ciphertext = header + self.cipher.encrypt(key, secret, header)
+        key_shares = [pack_header(MODE_HYBRID_KEY) + share for share in self.key_sharer.share(key, threshold, numshares)]
+        return (key_shares, ciphertext)
+
+    def recombine_key(self, key_shares):
+        shares = [share[expect_header(share, MODE_HYBRID_KEY):] for share in key_shares]
+        return self.key_sharer.recombine(shares)
+
+    def recombine(self, key_shares, ciphertext):
+        cursor = expect_header(ciphertext, MODE_HYBRID_CIPHERTEXT)
+        if len(ciphertext) <= cursor:
+            raise EncodingError("Decoding error: truncated ciphertext")
+        cipher_id = struct.unpack_from("B", ciphertext, cursor)[0]
+        if cipher_id != self.cipher.cipher_id:
+            raise EncodingError("Decoding error: ciphertext uses cipher %d, expected %d" % (cipher_id, self.cipher.cipher_id))
+        return self.cipher.decrypt(self.recombine_key(key_shares), ciphertext[cursor+1:], ciphertext[:cursor+1])
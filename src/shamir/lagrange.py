@@ -0,0 +1,75 @@
+import collections
+import operator
+from shamir.extended_gcd import extended_gcd
+
+
+def inverse_mod(value, modulus):
+    """ Return the inverse of 'value' modulo 'modulus' """
+    if value % modulus == 0:
+        raise ZeroDivisionError()
+    bezout_a, _, _ = extended_gcd(value % modulus, modulus)
+    return bezout_a % modulus
+
+def batch_inverse_mod(values, modulus):
+    """ Invert all values modulo 'modulus' using a single modular inversion (Montgomery's trick) """
+    prefix = [1]
+    for v in values:
+        prefix.append((prefix[-1] * v) % modulus)
+    inv = inverse_mod(prefix[-1], modulus)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = (inv * prefix[i]) % modulus
+        inv = (inv * values[i]) % modulus
+    return result
+
+
+class LagrangeWeights(object):
+    """ Lagrange basis values l_j(x_recomb) for a fixed set of x coordinates in GF(modulus).
+
+        Once the weights are known, interpolating any set of y values at x_recomb
+        is a single dot product: sum(w_j * y_j).
+    """
+    def __init__(self, xs, modulus, x_recomb=0):
+        self.xs = tuple(xs)
+        self.modulus = modulus
+        self.x_recomb = x_recomb
+        numerators = []
+        denominators = []
+        for j, x_j in enumerate(self.xs):
+            num, den = 1, 1
+            for i, x_i in enumerate(self.xs):
+                if i != j:
+                    num = (num * (x_recomb - x_i)) % modulus
+                    den = (den * (x_j - x_i)) % modulus
+            numerators.append(num)
+            denominators.append(den)
+        inverses = batch_inverse_mod(denominators, modulus)
+        self.weights = [(n * d) % modulus for n, d in zip(numerators, inverses)]
+
+    def combine(self, ys):
+        """ Interpolate the y values (given in the order of xs) at x_recomb """
+        return sum(map(operator.mul, self.weights, ys)) % self.modulus
+
+
+class LagrangeWeightsCache(object):
+    """ LRU cache of LagrangeWeights keyed by the tuple of x coordinates """
+    def __init__(self, modulus, x_recomb=0, maxsize=128):
+        self.modulus = modulus
+        self.x_recomb = x_recomb
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.misses = 0
+
+    def get(self, xs):
+        key = tuple(xs)
+        weights = self.entries.pop(key, None)
+        if weights is None:
+            weights = LagrangeWeights(key, self.modulus, self.x_recomb)
+            self.misses += 1
+            if len(self.entries) >= self.maxsize:
+                self.entries.popitem(last=False)
+        self.entries[key] = weights
+        return weights
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,143 @@
+""" Instrumentation hooks of ShamirStringSharer and ShamirPointSharer.
+
+    The sharers report to their 'metrics' object:
+        metrics.stage(name): context manager around each stage (padding, random, evaluate, encode, ...)
+        metrics.count(name, value): counters (blocks, field_mul, field_add, inversions, bytes_shared, ...)
+
+    Field operations are counted per stage from the number of blocks, the threshold and the number of
+    shares, not one by one, so counting costs the same whether the arithmetic runs in NumPy or in Python.
+    The default NULL_METRICS ignores everything: a disabled stage costs a method call and an empty with block.
+"""
+import collections
+import time
+import tracemalloc
+
+
+class NullStage(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_STAGE = NullStage()
+
+
+class Metrics(object):
+    """ Base class of the metrics: override on_stage and on_count to forward the events (e.g. to a monitoring system) """
+    def stage(self, name):
+        return TimedStage(self, name)
+
+    def count(self, name, value=1):
+        self.on_count(name, value)
+
+    def on_stage(self, name, seconds, peak_memory):
+        """ Called at the end of each stage. peak_memory is None unless memory is traced """
+        pass
+
+    def on_count(self, name, value):
+        pass
+
+
+class NullMetrics(Metrics):
+    """ Disabled instrumentation """
+    def stage(self, name):
+        return NULL_STAGE
+
+    def count(self, name, value=1):
+        pass
+
+NULL_METRICS = NullMetrics()
+
+
+class TimedStage(object):
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.traced = getattr(self.metrics, "trace_memory", False) and tracemalloc.is_tracing()
+        if self.traced:
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        peak_memory = tracemalloc.get_traced_memory()[1] - self.memory_start if self.traced else None
+        self.metrics.on_stage(self.name, seconds, peak_memory)
+        return False
+
+
+class CallbackMetrics(Metrics):
+    """ Metrics calling on_stage(name, seconds, peak_memory) and on_count(name, value) """
+    def __init__(self, on_stage=None, on_count=None):
+        if on_stage is not None:
+            self.on_stage = on_stage
+        if on_count is not None:
+            self.on_count = on_count
+
+
+class StageStats(object):
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_memory = None
+
+    def add(self, seconds, peak_memory):
+        self.calls += 1
+        self.seconds += seconds
+        if peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, peak_memory)
+
+
+class Profiler(Metrics):
+    """ Accumulate the time, calls and peak allocation of each stage and the counters.
+        With trace_memory=True, the peak allocation of the stages is measured with tracemalloc
+        (which must be started, see start()); stages should then not be nested.
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+        self.started_tracing = False
+
+    def on_stage(self, name, seconds, peak_memory):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.add(seconds, peak_memory)
+
+    def on_count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def total_seconds(self):
+        return sum(stats.seconds for stats in self.stages.values())
+
+    def report(self):
+        """ Stage breakdown and counters as text """
+        total = self.total_seconds() or 1.0
+        lines = ["%-16s %8s %12s %7s %12s" % ("stage", "calls", "time (ms)", "%", "peak (KiB)")]
+        for name, stats in self.stages.items():
+            peak = "-" if stats.peak_memory is None else "%.1f" % (stats.peak_memory / 1024.0)
+            lines.append("%-16s %8d %12.3f %6.1f%% %12s" %
+                         (name, stats.calls, stats.seconds * 1e3, stats.seconds / total * 100, peak))
+        lines.append("%-16s %8s %12.3f" % ("total", "", self.total_seconds() * 1e3))
+        for name, value in self.counters.items():
+            lines.append("%-16s %d" % (name, value))
+        return "\n".join(lines)
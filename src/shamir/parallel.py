@@ -0,0 +1,95 @@
+import array
+import collections
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from shamir.vectorized import matmul_mod, mulmod, numpy
+
+
+def _recombine_range_worker(values_name, output_name, numshares, numblocks, start, end, weights, modulus):
+    """ Recombine blocks [start:end[ from the share values in shared memory.
+        The values are stored share after share as unsigned 64 bit integers, the
+        result is written in the output block as 4 byte big-endian integers.
+    """
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        if numpy is not None:
+            values = numpy.frombuffer(values_shm.buf, dtype=numpy.uint64, count=numshares * numblocks)
+            values = values.reshape(numshares, numblocks)[:, start:end]
+            output = numpy.frombuffer(output_shm.buf, dtype=">u4", count=end - start, offset=4 * start)
+            row = numpy.array([weights], dtype=numpy.uint64)
+            output[:] = matmul_mod(row, values, modulus)[0]
+            # the views must be released before the shared memory is closed
+            del values, output
+            return
+        values = values_shm.buf.cast("Q")
+        columns = [values[i*numblocks+start:i*numblocks+end] for i in range(numshares)]
+        intvalues = [sum(map(int.__mul__, weights, blockvalues)) % modulus for blockvalues in zip(*columns)]
+        struct.pack_into(">%dI" % (end - start), output_shm.buf, start * 4, *intvalues)
+        del columns, values
+    finally:
+        values_shm.close()
+        output_shm.close()
+
+def split_range(size, parts):
+    """ Split range(size) in 'parts' contiguous (start, end) ranges of nearly equal sizes """
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start != end]
+
+def recombine_parallel(share_values, weights, modulus, workers):
+    """ Recombine the blocks of the decoded 'share_values' (one list of values per share, in the order of
+        the 'weights') using a pool of 'workers' processes. Returns the 4 byte big-endian encoded blocks.
+    """
+    numshares = len(share_values)
+    numblocks = len(share_values[0])
+    values_shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * numshares * numblocks))
+    output_shm = shared_memory.SharedMemory(create=True, size=max(1, 4 * numblocks))
+    try:
+        if numpy is not None:
+            values = numpy.frombuffer(values_shm.buf, dtype=numpy.uint64, count=numshares * numblocks)
+            values.reshape(numshares, numblocks)[:] = share_values
+        else:
+            values = values_shm.buf.cast("Q")
+            for i, share in enumerate(share_values):
+                values[i*numblocks:(i+1)*numblocks] = array.array("Q", share)
+        del values
+        ranges = split_range(numblocks, workers)
+        with ProcessPoolExecutor(max_workers=len(ranges) or 1) as pool:
+            futures = [pool.submit(_recombine_range_worker, values_shm.name, output_shm.name, numshares, numblocks,
+                                   start, end, weights, modulus)
+                       for start, end in ranges]
+            for future in futures:
+                future.result()
+        return bytes(output_shm.buf[:4 * numblocks])
+    finally:
+        values_shm.close()
+        values_shm.unlink()
+        output_shm.close()
+        output_shm.unlink()
+
+def combine_blocks(columns, weights, modulus):
+    """ Worker: recombine the blocks of the share values 'columns' (lists or arrays of unsigned 64 bit integers).
+        Returns the 4 byte big-endian encoded blocks.
+    """
+    if numpy is not None:
+        values = numpy.array(columns, dtype=numpy.uint64)
+        result = numpy.zeros(values.shape[1:], dtype=numpy.uint64)
+        for column, weight in zip(values, weights):
+            result = (result + mulmod(column, weight, modulus)) % numpy.uint64(modulus)
+        return result.astype(">u4").tobytes()
+    intvalues = [sum(map(int.__mul__, weights, blockvalues)) % modulus for blockvalues in zip(*columns)]
+    return struct.pack(">%dI" % len(intvalues), *intvalues)
+
+def map_bounded(function, iterable, workers, prefetch=2):
+    """ Yields function(*args) for each tuple of 'iterable', in order, computed by a pool of 'workers' processes.
+        At most prefetch*workers tasks are submitted ahead, so that streams are processed with bounded memory.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = collections.deque()
+        for args in iterable:
+            futures.append(pool.submit(function, *args))
+            if len(futures) >= prefetch * workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
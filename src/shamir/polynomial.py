@@ -2,6 +2,106 @@ import operator
 import itertools
 from functools import reduce
 
+KARATSUBA_THRESHOLD = 24
+FAST_INTERPOLATION_THRESHOLD = 32
+HORNER_THRESHOLD = 64
+
+def add_lists(a, b, zero):
+    """ Coefficient-wise sum of two lists aligned on their first element """
+    if len(a) < len(b):
+        a, b = b, a
+    return [x + y for x, y in zip(a, b)] + a[len(b):]
+
+def convolve(a, b, zero):
+    """ Product of two coefficient lists using Karatsuba's algorithm for large lists """
+    if not a or not b:
+        return []
+    if min(len(a), len(b)) < KARATSUBA_THRESHOLD:
+        result = [zero] * (len(a) + len(b) - 1)
+        for j, a_j in enumerate(a):
+            for i, b_i in enumerate(b):
+                result[i+j] += a_j * b_i
+        return result
+    m = max(len(a), len(b)) // 2
+    a_low, a_high = a[:m], a[m:]
+    b_low, b_high = b[:m], b[m:]
+    low = convolve(a_low, b_low, zero)
+    high = convolve(a_high, b_high, zero)
+    middle = convolve(add_lists(a_low, a_high, zero), add_lists(b_low, b_high, zero), zero)
+    result = [zero] * (len(a) + len(b) - 1)
+    for i, c in enumerate(low):
+        result[i] += c
+        middle[i] -= c
+    for i, c in enumerate(high):
+        result[i + 2*m] += c
+        middle[i] -= c
+    for i, c in enumerate(middle[:len(result) - m]):
+        result[i + m] += c
+    return result
+
+def multiply_by_integer(value, n, zero):
+    """ value added n times, with double-and-add (works for any value type supporting +) """
+    result = zero
+    while n:
+        if n & 1:
+            result = result + value
+        value = value + value
+        n >>= 1
+    return result
+
+def divmod_lists(a, b, zero, one):
+    """ (quotient, remainder) of coefficient lists (highest degree first) using long division """
+    if len(a) < len(b):
+        return [], list(a)
+    inverse_lead = one / b[0]
+    remainder = list(a)
+    quotient = []
+    for i in range(len(a) - len(b) + 1):
+        coef = remainder[i] * inverse_lead
+        quotient.append(coef)
+        if coef != zero:
+            for j in range(1, len(b)):
+                remainder[i+j] -= coef * b[j]
+    return quotient, remainder[len(a) - len(b) + 1:]
+
+def trim_list(a, zero):
+    """ Remove the leading zero coefficients (highest degree first) """
+    for i, c in enumerate(a):
+        if c != zero:
+            return a[i:]
+    return []
+
+def sub_lists(a, b, zero):
+    """ Difference of two coefficient lists (highest degree first) """
+    size = max(len(a), len(b))
+    a = [zero] * (size - len(a)) + list(a)
+    for i, c in enumerate(b):
+        a[size - len(b) + i] -= c
+    return a
+
+def evaluate_list(coefs, x, zero):
+    """ Evaluate the coefficient list (highest degree first) at x using Horner's method """
+    val = zero
+    for c in coefs:
+        val = val*x + c
+    return val
+
+def inverse_series(f, precision, zero, one):
+    """ Inverse of the power series f (lowest degree first) modulo x^precision, by Newton iteration """
+    two = one + one
+    g = [one / f[0]]
+    current = 1
+    while current < precision:
+        current = min(2 * current, precision)
+        e = [-c for c in convolve(f[:current], g, zero)[:current]]
+        e[0] += two
+        g = convolve(g, e, zero)[:current]
+    return g
+
+class DecodingError(Exception):
+    pass
+
+
 class Polynomial(object):
     def __init__(self, coefs, zero=0):
         """ coefs: Heighest degree first """
@@ -37,11 +137,7 @@ class Polynomial(object):
 
     def __mul__(self, other):
         if type(other) is Polynomial:
-            res_coefs = [self.zero] * (len(self.coefs)+len(other.coefs)-1)
-            for j in range(0, len(self.coefs)):
-                for i in range(0, len(other.coefs)):
-                    res_coefs[(i+j)] += self.coefs[j] * other.coefs[i]
-            return Polynomial(res_coefs, self.zero)
+            return Polynomial(convolve(self.coefs, other.coefs, self.zero), self.zero)
         else:
             return Polynomial([c * other for c in self.coefs], self.zero)
 
@@ -86,13 +182,18 @@ class PointSet(object):
         for x, _y in self.points:
             yield x
             
-    def evaluate_lagrange(self, x):
-        """ Evaluation without computing the polynomial """
+    def lagrange_weights(self, x):
+        """ Values of the lagrange basis polynomials at x: the result is sum(y_j * weight_j) """
         vector = []
         for j, (x_j, y_j) in enumerate(self.points):
             factors = [((x - x_i) / (x_j - x_i))
                        for i, (x_i, y_i) in enumerate(self.points) if i != j]
-            vector.append(reduce(operator.mul, factors))
+            vector.append(reduce(operator.mul, factors, self.one))
+        return vector
+
+    def evaluate_lagrange(self, x):
+        """ Evaluation without computing the polynomial """
+        vector = self.lagrange_weights(x)
         return sum(map(operator.mul, self.iter_ys(), vector), self.zero)
     
 
@@ -102,13 +203,122 @@ class PointSet(object):
             pols = []
             for i, x_i in enumerate(self.iter_xs()):
                 if i != j:
-                    pols.append(Polynomial([self.one, -x_i], self.zero) // (x_j - x_i))
-            multiplier_polynoms.append(reduce(operator.mul, pols))
+                    pols.append(Polynomial([self.one, -x_i], self.zero) * (self.one / (x_j - x_i)))
+            multiplier_polynoms.append(reduce(operator.mul, pols, Polynomial([self.one], self.zero)))
         return multiplier_polynoms
     
     def get_lagrange_polynomial(self):
+        if len(self.points) >= FAST_INTERPOLATION_THRESHOLD:
+            return self.get_lagrange_polynomial_fast()
         polys = []
         for p, y in zip( self.get_lagrange_multiplier_polynomials(), self.iter_ys()):
             polys.append(p * y)
         return reduce(operator.add, polys)
 
+    def decode(self, k):
+        """ Reed-Solomon decoding with Gao's algorithm: the polynomial of degree < k going through all the
+            points but at most (len(points) - k) // 2 of them.
+            Returns (polynomial, xs of the erroneous points), raises DecodingError if there are more errors.
+        """
+        m = len(self.points)
+        xs = list(self.iter_xs())
+        g0 = reduce(lambda a, b: convolve(a, b, self.zero), [[self.one, -x] for x in xs], [self.one])
+        r0, r1 = g0, trim_list(self.get_lagrange_polynomial().coefs, self.zero)
+        v0, v1 = [], [self.one]
+        while 2 * (len(r1) - 1) >= m + k:
+            quotient, remainder = divmod_lists(r0, r1, self.zero, self.one)
+            r0, r1 = r1, trim_list(remainder, self.zero)
+            v0, v1 = v1, trim_list(sub_lists(v0, convolve(quotient, v1, self.zero), self.zero), self.zero)
+        f, remainder = divmod_lists(r1, v1, self.zero, self.one)
+        f = trim_list(f, self.zero)
+        error_xs = [x for x in xs if evaluate_list(v1, x, self.zero) == self.zero]
+        if trim_list(remainder, self.zero) or len(f) > k or len(error_xs) != len(v1) - 1:
+            raise DecodingError("too many errors to decode: more than %d" % ((m - k) // 2))
+        return Polynomial(f, self.zero), error_xs
+
+    def get_lagrange_polynomial_fast(self):
+        """ Interpolation using a subproduct tree: O(k^2) operations instead of O(k^3) """
+        tree = SubproductTree(list(self.iter_xs()), self.zero, self.one)
+        return Polynomial(tree.interpolate(list(self.iter_ys())), self.zero)
+
+
+class SubproductNode(object):
+    def __init__(self, coefs, start, end, left=None, right=None):
+        """ coefs: product of (x - x_i) for the points start <= i < end, heighest degree first """
+        self.coefs = coefs
+        self.start = start
+        self.end = end
+        self.left = left
+        self.right = right
+        self.inverse = None
+
+    def remainder(self, a, zero, one):
+        """ a modulo the node polynomial.
+            A coefficient list read backwards is the reversed polynomial, so the quotient is
+            rev(a) / rev(node) truncated, using the (cached) power series inverse of rev(node).
+        """
+        degree = len(self.coefs) - 1
+        quotient_length = len(a) - degree
+        if quotient_length > degree + 1 or degree < KARATSUBA_THRESHOLD:
+            return divmod_lists(a, self.coefs, zero, one)[1]
+        if self.inverse is None:
+            self.inverse = inverse_series(self.coefs, degree + 1, zero, one)
+        quotient = convolve(a[:quotient_length], self.inverse[:quotient_length], zero)[:quotient_length]
+        product = convolve(quotient, self.coefs, zero)
+        return [x - y for x, y in zip(a[quotient_length:], product[quotient_length:])]
+
+class SubproductTree(object):
+    """ Binary tree of the products of (x - x_i): the leaves are (x - x_i) and each node is the
+        product of its children (multiplied with Karatsuba).
+        Used for multipoint evaluation (remainder tree) and fast interpolation.
+    """
+    def __init__(self, xs, zero=0, one=1):
+        self.xs = xs
+        self.zero = zero
+        self.one = one
+        self.root = self.build(0, len(xs))
+
+    def build(self, start, end):
+        if end - start == 1:
+            return SubproductNode([self.one, -self.xs[start]], start, end)
+        middle = (start + end) // 2
+        left, right = self.build(start, middle), self.build(middle, end)
+        return SubproductNode(convolve(left.coefs, right.coefs, self.zero), start, end, left, right)
+
+    def evaluate(self, coefs):
+        """ Values of the polynomial (coefs: highest degree first) at all the points:
+            reduce it modulo each node going down the tree, the remainders at the leaves are the values.
+            Small remainders are evaluated with Horner's method at the points of their node.
+        """
+        values = [self.zero] * len(self.xs)
+        stack = [(self.root, list(coefs))]
+        while stack:
+            node, remainder = stack.pop()
+            if len(remainder) >= len(node.coefs):
+                remainder = node.remainder(remainder, self.zero, self.one)
+            if node.left is None:
+                values[node.start] = remainder[-1] if remainder else self.zero
+            elif len(remainder) <= HORNER_THRESHOLD:
+                polynomial = Polynomial(remainder or [self.zero], self.zero)
+                for i in range(node.start, node.end):
+                    values[i] = polynomial.evaluate(self.xs[i])
+            else:
+                stack.append((node.left, remainder))
+                stack.append((node.right, remainder))
+        return values
+
+    def interpolate(self, ys):
+        """ Coefficients (highest degree first) of the polynomial of degree < len(xs) going through (x_i, y_i).
+            With M = prod(x - x_i), P = sum(y_i / M'(x_i) * M / (x - x_i)), combined bottom-up.
+        """
+        root = self.root.coefs
+        derivative = [multiply_by_integer(c, len(root) - 1 - i, self.zero) for i, c in enumerate(root[:-1])]
+        weights = [y / d for y, d in zip(ys, self.evaluate(derivative))]
+        return self.combine(self.root, weights)
+
+    def combine(self, node, weights):
+        if node.left is None:
+            return [weights[node.start]]
+        left = convolve(self.combine(node.left, weights), node.right.coefs, self.zero)
+        right = convolve(self.combine(node.right, weights), node.left.coefs, self.zero)
+        return [l + r for l, r in zip(left, right)]
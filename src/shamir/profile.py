@@ -0,0 +1,53 @@
+""" Stage breakdown of sharing and recombining a secret.
+
+    python -m shamir.profile --size 1000000 -k 3 -n 5 --repeat 3 --memory
+"""
+import argparse
+import os
+import sys
+from shamir.metrics import Profiler
+from shamir.shamir import ShamirStringSharer
+
+
+def run_workload(profiler, size, threshold, numshares, repeat=1, operation="both", container=False, vectorized=True):
+    """ Share (and/or recombine) a random secret of 'size' bytes 'repeat' times, reporting to 'profiler' """
+    sharer = ShamirStringSharer()
+    if not vectorized:
+        sharer.vectorized = None
+    secret = os.urandom(size)
+    shares = sharer.share(secret, threshold, numshares, container=container)
+    profiler.reset()
+    profiler.start()
+    sharer.metrics = profiler
+    try:
+        for i in range(repeat):
+            if operation in ("share", "both"):
+                shares = sharer.share(secret, threshold, numshares, container=container)
+            if operation in ("recombine", "both"):
+                sharer.lagrange_cache.entries.clear()
+                if sharer.recombine(shares[:threshold]) != secret:
+                    raise AssertionError("recombined secret differs")
+    finally:
+        profiler.stop()
+    return profiler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m shamir.profile", description="shamir stage breakdown")
+    parser.add_argument("--size", type=int, default=2**20, help="secret size in bytes (default: 1MiB)")
+    parser.add_argument("-k", "--threshold", type=int, default=3)
+    parser.add_argument("-n", "--numshares", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--operation", choices=["share", "recombine", "both"], default="both")
+    parser.add_argument("--container", action="store_true", help="use block shares")
+    parser.add_argument("--memory", action="store_true", help="measure the peak allocation of each stage (slower)")
+    parser.add_argument("--no-numpy", action="store_true", help="profile the pure Python implementation")
+    args = parser.parse_args(argv)
+    profiler = Profiler(trace_memory=args.memory)
+    run_workload(profiler, args.size, args.threshold, args.numshares, args.repeat, args.operation,
+                 args.container, vectorized=not args.no_numpy)
+    print(profiler.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
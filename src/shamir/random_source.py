@@ -1,14 +1,102 @@
 from random import SystemRandom
+import array
+import itertools
+import os
+import threading
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# array typecode of each word size
+WORD_TYPECODES = {array.array(t).itemsize: t for t in "BHILQ"}
+
 
 class SecureRandomSource(object):
-    def __init__(self):
+    """ Cryptographically secure random values read from os.urandom in blocks of 'buffer_size' bytes.
+
+        Values in [start, end[ are drawn from the smallest word (1, 2, 4 or 8 bytes) holding end-start values:
+        words above the largest multiple of end-start are rejected and the others are reduced modulo end-start.
+        The buffer is dropped after a fork so that parent and child never hand out the same bytes.
+    """
+    def __init__(self, buffer_size=2**16):
         self.rand = SystemRandom()
+        self.buffer_size = buffer_size
+        self.buffer = b""
+        self.offset = 0
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+
+    def randbytes(self, size):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.buffer, self.offset, self.pid = b"", 0, os.getpid()
+            if self.offset + size > len(self.buffer):
+                self.buffer = self.buffer[self.offset:] + os.urandom(max(size, self.buffer_size))
+                self.offset = 0
+            result = self.buffer[self.offset:self.offset+size]
+            self.offset += size
+            return result
+
     def randrange(self, start, end):
-        return self.rand.randrange(start, end)
+        return self.randrange_many(start, end, 1)[0]
+
+    def randrange_many(self, start, end, count):
+        """ list of 'count' random values in [start, end[ """
+        width = end - start
+        if width <= 0:
+            raise ValueError("empty range for randrange_many(%d, %d)" % (start, end))
+        if width > 2**64:
+            return [self.rand.randrange(start, end) for i in range(count)]
+        if numpy is not None:
+            values = self.randrange_array(0, width, count).tolist()
+            return [v + start for v in values] if start else values
+        wordsize, limit = self.word_limit(width)
+        result = []
+        while len(result) < count:
+            missing = count - len(result)
+            words = self.randbytes(wordsize * self.numwords(missing, wordsize, limit))
+            values = [v % width + start for v in array.array(WORD_TYPECODES[wordsize], words) if v < limit]
+            result.extend(values[:missing])
+        return result
 
-class UnitTestRandomSource(object):
+    def randrange_array(self, start, end, count):
+        """ NumPy uint64 array of 'count' random values in [start, end[ (0 <= start < end <= 2**64) """
+        wordsize, limit = self.word_limit(end - start)
+        parts = []
+        missing = count
+        while missing:
+            words = self.randbytes(wordsize * self.numwords(missing, wordsize, limit))
+            values = numpy.frombuffer(words, dtype="u%d" % wordsize)
+            values = values[values <= values.dtype.type(limit - 1)][:missing]
+            parts.append(values)
+            missing -= len(values)
+        values = numpy.concatenate(parts).astype(numpy.uint64) if parts else numpy.zeros(0, dtype=numpy.uint64)
+        if end - start < 2**(8*wordsize):
+            values %= numpy.uint64(end - start)
+        if start:
+            values += numpy.uint64(start)
+        return values
+
+    def word_limit(self, width):
+        """ Smallest word size (bytes) holding 'width' values and the rejection limit: the largest multiple of width """
+        wordsize = next(size for size in (1, 2, 4, 8) if width <= 2**(8*size))
+        return wordsize, 2**(8*wordsize) - 2**(8*wordsize) % width
+
+    def numwords(self, missing, wordsize, limit):
+        """ Words to draw for 'missing' values, with the expected rejection rate (2**bits - limit) / 2**bits """
+        return missing + missing * (2**(8*wordsize) - limit) // limit + 1
+
+
+class PresetRandomSource(object):
+    """ Hands out values drawn beforehand (already in the requested ranges), in order """
     def __init__(self, results):
         self.iter = iter(results)
     def randrange(self, start, end):
         return next(self.iter)
+    def randrange_many(self, start, end, count):
+        return list(itertools.islice(self.iter, count))
+
 
+class UnitTestRandomSource(PresetRandomSource):
+    pass
@@ -0,0 +1,66 @@
+""" Online recombination of ShamirStringSharer shares given one at a time """
+from shamir.lagrange import inverse_mod
+from shamir.shamir import EncodingError, blocks_to_bytes
+from shamir.vectorized import mulmod, numpy
+
+
+class Recombiner(object):
+    """ Recombine the shares as they arrive using Newton interpolation at x=0.
+
+        For each block, 'coefs' holds the divided differences of the shares added so far and
+        'partial' the value at x=0 of their interpolating polynomial. Adding the m-th share evaluates
+        the Newton form at its index (m steps per block) and adds one term to 'partial', so no work
+        is redone and the secret is available as soon as the threshold is reached.
+    """
+    def __init__(self, sharer, threshold):
+        self.sharer = sharer
+        self.modulus = sharer.P
+        self.threshold = threshold
+        self.use_numpy = sharer.vectorized is not None
+        self.xs = []
+        self.coefs = []
+        self.partial = None
+        self.basis_at_zero = 1  # product of (0 - x_i) for the added shares
+        self.secret = None
+
+    @property
+    def missing(self):
+        return self.threshold - len(self.xs)
+
+    def add_share(self, share):
+        """ Returns the secret once 'threshold' distinct shares were added, None before """
+        if self.secret is not None:
+            return self.secret
+        share_idx, values = self.sharer.decode_share(share)
+        x = share_idx + 1
+        if x in self.xs:
+            return None
+        if self.partial is not None and len(values) != len(self.partial):
+            raise EncodingError("Decoding error: shares have different lengths")
+        m = self.modulus
+        denominator = 1
+        for x_i in self.xs:
+            denominator = denominator * (x - x_i) % m
+        factor = inverse_mod(denominator, m)
+        if self.use_numpy:
+            ys = numpy.array(values, dtype=numpy.uint64)
+            newton = numpy.zeros(len(values), dtype=numpy.uint64)
+            for c, x_i in zip(reversed(self.coefs), reversed(self.xs)):
+                newton = (mulmod(newton, (x - x_i) % m, m) + c) % numpy.uint64(m)
+            coef = mulmod((ys + numpy.uint64(m) - newton) % numpy.uint64(m), factor, m)
+            term = mulmod(coef, self.basis_at_zero, m)
+            self.partial = term if self.partial is None else (self.partial + term) % numpy.uint64(m)
+        else:
+            newton = [0] * len(values)
+            for c, x_i in zip(reversed(self.coefs), reversed(self.xs)):
+                newton = [(v * (x - x_i) + c_j) % m for v, c_j in zip(newton, c)]
+            coef = [(y - v) * factor % m for y, v in zip(values, newton)]
+            term = [c * self.basis_at_zero % m for c in coef]
+            self.partial = term if self.partial is None else [(p + t) % m for p, t in zip(self.partial, term)]
+        self.coefs.append(coef)
+        self.xs.append(x)
+        self.basis_at_zero = self.basis_at_zero * -x % m
+        if len(self.xs) == self.threshold:
+            self.secret = blocks_to_bytes(self.partial)
+            self.coefs = []
+        return self.secret
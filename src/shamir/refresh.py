@@ -0,0 +1,58 @@
+""" Proactive refresh and redistribution of ShamirStringSharer shares, without reconstructing the secret.
+
+    All the operations work block by block on file-like objects, like share_stream and recombine_stream.
+
+    Refresh: the update of share i holds, for each block, the value at x=i+1 of a random polynomial with
+    a zero constant term. Adding the update to share i gives a new sharing of the same secret with the
+    same threshold. Several holders can each contribute updates: a sum of zero sharings is a zero sharing.
+
+    Redistribution (new threshold and/or number of shares): 'threshold' old holders each share their own
+    share values with the new threshold, sending one subshare to each new holder. A new holder combines
+    the subshares it received with the Lagrange weights at x=0 of the old share indexes.
+    subshare: varint old share index + varint new share index + share values
+"""
+from shamir.shamir import EncodingError, ShamirStringSharer, pack_varint, read_varint
+
+
+class ShareRefresher(object):
+    def __init__(self, sharer=None):
+        self.sharer = sharer or ShamirStringSharer()
+        self.P = self.sharer.P
+
+    def write_updates(self, numblocks, threshold, sinks, chunk_size=2**14):
+        """ Write the updates of the shares 0..len(sinks)-1 of a secret of 'numblocks' values to the file-like 'sinks' """
+        for idx, sink in enumerate(sinks):
+            sink.write(pack_varint(idx))
+        for start in range(0, numblocks, chunk_size):
+            zeros = [0] * min(chunk_size, numblocks - start)
+            for sink, values in zip(sinks, self.sharer.share_blocks(zeros, threshold, len(sinks))):
+                sink.write(self.sharer.encode_share_values(values))
+
+    def apply_update(self, source, update, sink, chunk_size=2**16):
+        """ Add the update read from the file-like 'update' to the share read from 'source', write the new share to 'sink' """
+        share_idx = read_varint(source)
+        update_idx = read_varint(update)
+        if share_idx != update_idx:
+            raise EncodingError("Decoding error: update for share %d applied to share %d" % (update_idx, share_idx))
+        sink.write(pack_varint(share_idx))
+        for values, updates in self.sharer.iter_share_columns([source, update], chunk_size):
+            sink.write(self.sharer.encode_share_values([(v + u) % self.P for v, u in zip(values, updates)]))
+
+    def redistribute(self, source, sinks, threshold, chunk_size=2**16):
+        """ Old holder: share the share read from 'source' with the new 'threshold', one subshare per new holder in 'sinks' """
+        share_idx = read_varint(source)
+        for new_idx, sink in enumerate(sinks):
+            sink.write(pack_varint(share_idx) + pack_varint(new_idx))
+        for values in self.sharer.iter_share_values(source, chunk_size):
+            for sink, subvalues in zip(sinks, self.sharer.share_blocks(values, threshold, len(sinks))):
+                sink.write(self.sharer.encode_share_values(subvalues))
+
+    def combine_subshares(self, sources, sink, chunk_size=2**16):
+        """ New holder: combine the subshares from (at least old threshold) old holders into the new share """
+        indexes = [(read_varint(source), read_varint(source)) for source in sources]
+        if len(set(new_idx for old_idx, new_idx in indexes)) != 1:
+            raise EncodingError("Decoding error: subshares of different new shares")
+        weights = self.sharer.lagrange_cache.get(old_idx+1 for old_idx, new_idx in indexes)
+        sink.write(pack_varint(indexes[0][1]))
+        for columns in self.sharer.iter_share_columns(sources, chunk_size):
+            sink.write(self.sharer.encode_share_values([weights.combine(block) for block in zip(*columns)]))
@@ -0,0 +1,72 @@
+""" Sharing with a fixed threshold and number of shares (e.g. 3-of-5 or 5-of-9 deployments).
+
+    The share points 1..n and their powers are computed once: with the coefficients of all the blocks
+    in a (blocks x k) matrix C (column 0 is the secret), the shares are the rows of V^T C^T where
+    V[j][i] = x_i^j. The Lagrange weights at x=0 of each k-subset of the points are cached, so
+    recombination is the product of a precomputed row vector with the (k x blocks) share values.
+"""
+from shamir.lagrange import LagrangeWeightsCache
+from shamir.shamir import EncodingError, ShamirStringSharer, blocks_to_bytes, bytes_to_blocks
+from shamir.vectorized import matmul_mod, numpy
+
+
+class SharingScheme(object):
+    """ k-of-n sharing of bytestrings with precomputed tables. The shares are the ones of 'sharer'
+        (ShamirStringSharer.share gives the same shares for the same random source).
+        The weights of at most 'max_cached_weights' subsets are kept (C(9, 5) = 126).
+    """
+    def __init__(self, threshold, numshares, sharer=None, max_cached_weights=128):
+        self.sharer = sharer or ShamirStringSharer()
+        self.P = self.sharer.P
+        assert numshares < self.P, "numshares (%s) must be smaller than P(%s)" % (numshares, self.P)
+        assert threshold <= numshares, "threshold (%s) must be smaller or equal to numshares(%s)" % (threshold, numshares)
+        self.threshold = threshold
+        self.numshares = numshares
+        self.points = list(range(1, numshares + 1))
+        self.vandermonde = [[pow(x, j, self.P) for x in self.points] for j in range(threshold)]
+        self.vectorized = self.sharer.vectorized
+        if self.vectorized is not None:
+            self.vandermonde_transposed = numpy.array(self.vandermonde, dtype=numpy.uint64).T.copy()
+        self.lagrange_cache = LagrangeWeightsCache(self.P, maxsize=max_cached_weights)
+
+    def share_blocks(self, intvalues):
+        """ Share values of each share index (NumPy arrays when NumPy is available) """
+        k = self.threshold
+        if self.vectorized is not None:
+            coefs = self.vectorized.coefficient_matrix(intvalues, k)
+            return list(matmul_mod(self.vandermonde_transposed, coefs.T, self.P))
+        randoms = self.sharer.field.random_source.randrange_many(0, self.P, len(intvalues) * (k-1))
+        coefs = [[v] + randoms[b*(k-1):(b+1)*(k-1)] for b, v in enumerate(intvalues)]
+        return [[sum(map(int.__mul__, block_coefs, powers)) % self.P for block_coefs in coefs]
+                for powers in zip(*self.vandermonde)]
+
+    def share(self, secret):
+        intvalues = bytes_to_blocks(secret, arrays=self.vectorized is not None)
+        return [self.sharer.encode_share(idx, values) for idx, values in enumerate(self.share_blocks(intvalues))]
+
+    def lagrange_weights(self, share_indexes):
+        """ Weights at x=0 of the (sorted) share indexes """
+        return self.lagrange_cache.get(idx + 1 for idx in share_indexes)
+
+    def recombine(self, shares):
+        """ Recombine the secret from the first 'threshold' distinct shares """
+        decoded = {}
+        for share in shares:
+            share_idx, values = self.sharer.decode_share(share)
+            if share_idx >= self.numshares:
+                raise EncodingError("Decoding error: share index %d of a %d-of-%d scheme" %
+                                    (share_idx, self.threshold, self.numshares))
+            decoded.setdefault(share_idx, values)
+            if len(decoded) == self.threshold:
+                break
+        if len(decoded) < self.threshold:
+            raise EncodingError("Decoding error: %d shares given, %d required" % (len(decoded), self.threshold))
+        indexes = sorted(decoded)
+        if len(set(len(decoded[idx]) for idx in indexes)) != 1:
+            raise EncodingError("Decoding error: shares have different lengths")
+        weights = self.lagrange_weights(indexes)
+        if self.vectorized is not None:
+            values = numpy.array([decoded[idx] for idx in indexes], dtype=numpy.uint64)
+            row = numpy.array([weights.weights], dtype=numpy.uint64)
+            return blocks_to_bytes(matmul_mod(row, values, self.P)[0])
+        return blocks_to_bytes([weights.combine(blockvalues) for blockvalues in zip(*[decoded[idx] for idx in indexes])])
@@ -1,42 +1,89 @@
-from polynomial import Polynomial, PointSet
-from field import ZpField
+from shamir.polynomial import Polynomial, PointSet, SubproductTree
+from shamir.field import FastZpField, GF256Field
+from shamir.container import MAGIC, BlockShare, EncodingError, encode_block_share
+from shamir.lagrange import LagrangeWeights, LagrangeWeightsCache
+from shamir.metrics import NULL_METRICS
+from shamir.parallel import combine_blocks, map_bounded, recombine_parallel
+from shamir.vectorized import VectorizedSharer, matmul_mod, numpy
 from struct import pack, unpack
-from random_source import SecureRandomSource
-from utils import iterslices, joinbase, splitbase
+from shamir.random_source import PresetRandomSource, SecureRandomSource
+from shamir.utils import xor_bytes
+import array
+import bisect
 import collections
 import struct
+import sys
+
+MULTIPOINT_THRESHOLD = 1024
 
 class ShamirPointSharer(object):
-    def __init__(self, field):
+    def __init__(self, field, multipoint_threshold=MULTIPOINT_THRESHOLD, max_cached_trees=4, metrics=NULL_METRICS):
+        """ From 'multipoint_threshold', polynomials are evaluated with a subproduct tree
+            of the share points (cached for the last 'max_cached_trees' sets of points).
+            The stages and operation counts are reported to 'metrics' (see shamir.metrics)
+        """
         self.field = field
+        self.multipoint_threshold = multipoint_threshold
+        self.max_cached_trees = max_cached_trees
+        self.trees = collections.OrderedDict()
+        self.metrics = metrics
    
     def share(self, secret, threshold, points):
-        coef = [secret]
-        coef += [self.field.random() for j in range(threshold-1)]
-        p = Polynomial(list(reversed(coef)))
-        shares = [(pt, p.evaluate(pt)) for pt in points]
+        metrics = self.metrics
+        with metrics.stage("random"):
+            coef = [secret]
+            coef += [self.field.random() for j in range(threshold-1)]
+        metrics.count("random_values", threshold-1)
+        with metrics.stage("evaluate"):
+            p = Polynomial(list(reversed(coef)))
+            if threshold >= self.multipoint_threshold:
+                shares = list(zip(points, self.subproduct_tree(points).evaluate(p.coefs)))
+            else:
+                shares = [(pt, p.evaluate(pt)) for pt in points]
+        metrics.count("field_mul", len(points) * (threshold-1))
+        metrics.count("field_add", len(points) * (threshold-1))
         return shares
 
+    def subproduct_tree(self, points):
+        key = tuple(points)
+        tree = self.trees.pop(key, None)
+        if tree is None:
+            tree = SubproductTree(list(key), self.field.zero(), self.field.one())
+            if len(self.trees) >= self.max_cached_trees:
+                self.trees.popitem(last=False)
+        self.trees[key] = tree
+        return tree
+
     def recombine(self, shares, x_recomb):
-        p = PointSet(shares, self.field.zero(), self.field.one())
-        return p.evaluate_lagrange(x_recomb)
+        k = len(shares)
+        with self.metrics.stage("interpolate"):
+            p = PointSet(shares, self.field.zero(), self.field.one())
+            result = p.evaluate_lagrange(x_recomb)
+        self.metrics.count("inversions", k * (k-1))
+        self.metrics.count("field_mul", k * k)
+        self.metrics.count("field_add", 2 * k * (k-1) + k)
+        return result
 
     def recombine_polynomial(self, shares):
         p = PointSet(shares, self.field.zero(), self.field.one())
         return p.get_lagrange_polynomial()
 
-class EncodingError(Exception):
-    pass
+    def decode(self, shares, threshold):
+        """ Polynomial of degree < threshold through the shares but at most (len(shares) - threshold) // 2
+            corrupted ones. Returns (polynomial, x of the corrupted shares), see PointSet.decode
+        """
+        p = PointSet(shares, self.field.zero(), self.field.one())
+        return p.decode(threshold)
 
 def pack_varint(value):
     """ Pack an integer in such a way that small values take less space (similar to bitcoin encoding but big-endian) """ 
     if (value < 0xfd):
         return (struct.pack("B", value))
     if (value <= 0xffff):
-        return ("\xfd" + struct.pack(">H", value))
+        return (b"\xfd" + struct.pack(">H", value))
     if (value <= 0xffffffff):
-        return ("\xfe" + struct.pack(">I", value))
-    return ("\xff" + struct.pack(">Q", value))
+        return (b"\xfe" + struct.pack(">I", value))
+    return (b"\xff" + struct.pack(">Q", value))
         
 def unpack_varint(data, cursor=0):
     """ unpack a integer packed by pack_varint """ 
@@ -52,18 +99,164 @@ def unpack_varint(data, cursor=0):
         return (struct.unpack_from(">I", data, cursor)[0], cursor + 4)
     return (struct.unpack_from(">Q", data, cursor)[0], cursor + 8)
 
+def read_varint(stream):
+    """ read an integer packed by pack_varint from a file-like object """
+    prefix = stream.read(1)
+    if not prefix:
+        raise EncodingError("Decoding error: no data")
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}.get(struct.unpack("B", prefix)[0], 0)
+    data = prefix + stream.read(size)
+    return unpack_varint(data)[0]
+
+
+ESCAPE = b"\xff\xff\xff\xff"
+
+def iter_value_runs(data, start=0):
+    """ Split encoded share values (from data[start:]) in runs of 4 byte values, each followed by at most
+        one 5 byte value. Yields (start, end, escaped_value): data[start:end] are 4 byte big-endian values
+        and escaped_value is the value encoded in the 5 bytes at data[end:end+5] (None at the end of data).
+        A trailing partial value is not part of any run.
+    """
+    if not hasattr(data, "find"):
+        data = bytes(data)
+    pos = start
+    while True:
+        escape = data.find(ESCAPE, pos)
+        while escape != -1 and (escape - pos) % 4:
+            escape = data.find(ESCAPE, escape + 1)
+        if escape == -1 or escape + 5 > len(data):
+            end = escape if escape != -1 else pos + (len(data) - pos) // 4 * 4
+            yield pos, end, None
+            return
+        yield pos, escape, 2**32 + struct.unpack_from("B", data, escape + 4)[0] - 1
+        pos = escape + 5
+
+
+class ShareIndex(object):
+    """ Index of the values of an encoded share, to decode a range of values without scanning the share.
+        The runs are (index of the first value, byte offset, number of 4 byte values, escaped value or None)
+    """
+    def __init__(self, share):
+        self.data = share
+        self.share_idx, cursor = unpack_varint(share)
+        self.firsts = []
+        self.runs = []
+        count = 0
+        end = cursor
+        for start, end, escaped in iter_value_runs(share, cursor):
+            self.firsts.append(count)
+            self.runs.append((count, start, (end - start) // 4, escaped))
+            count += (end - start) // 4 + (escaped is not None)
+            if escaped is not None:
+                end += 5
+        if end != len(share):
+            raise EncodingError("Decoding error: truncated value: %d bytes" % (len(share) - end))
+        self.numblocks = count
+        self.secret_length = None
 
-def add_padding(str, size=4):
-    """ Pad the end of a string to make the length a multiple of 'size'.
-     The byte contains the number of characters to remove, to remove the padding.  
+    def __len__(self):
+        return self.numblocks
+
+    def values(self, start=0, end=None):
+        """ List of the values of the blocks [start:end[ """
+        end = self.numblocks if end is None else min(end, self.numblocks)
+        values = []
+        for first, offset, count, escaped in self.runs[max(0, bisect.bisect_right(self.firsts, start) - 1):]:
+            if first >= end:
+                break
+            a, b = max(start, first), min(end, first + count)
+            if a < b:
+                values.extend(struct.unpack_from(">%dI" % (b - a), self.data, offset + 4 * (a - first)))
+            if escaped is not None and start <= first + count < end:
+                values.append(escaped)
+        return values
+
+
+def add_padding(data, size=4):
+    """ Pad the end of a bytestring to make the length a multiple of 'size'.
+     The byte contains the number of bytes to remove, to remove the padding.  
      """ 
-    nbpad = size - (len(str) % size) 
-    return str + (chr(nbpad) * nbpad)
+    nbpad = size - (len(data) % size) 
+    return data + bytes([nbpad]) * nbpad
+
+def remove_padding(data):
+    """ Remove padding added using 'add_padding' (data: bytes, bytearray or memoryview) """ 
+    return data[:-data[-1]]
+
+def bytes_to_blocks(secret, arrays=True):
+    """ Values of the 4 byte big-endian blocks of the padded bytes-like 'secret', read in place
+        (only the last block is padded): a NumPy uint64 array with arrays=True when NumPy is available,
+        else a tuple (also for secrets under 1KiB, for which struct is faster).
+    """
+    view = memoryview(secret).cast("B")
+    full = len(view) - len(view) % 4
+    last = struct.unpack(">I", add_padding(view[full:].tobytes()))
+    if numpy is None or not arrays or full < 1024:
+        return struct.unpack_from(">%dI" % (full // 4), view) + last
+    blocks = numpy.empty(full // 4 + 1, dtype=numpy.uint64)
+    blocks[:-1] = numpy.frombuffer(view, dtype=">u4", count=full // 4)
+    blocks[-1] = last[0]
+    return blocks
+
+def blocks_to_bytes(intvalues):
+    """ Secret of the values (< 2**32) of its padded 4 byte blocks (a sequence or NumPy array), written in
+        a preallocated buffer and copied once without the padding.
+    """
+    output = bytearray(4 * len(intvalues))
+    if numpy is not None and isinstance(intvalues, numpy.ndarray):
+        numpy.frombuffer(output, dtype=">u4")[:] = intvalues
+    else:
+        struct.pack_into(">%dI" % len(intvalues), output, 0, *intvalues)
+    return bytes(remove_padding(memoryview(output)))
+
+
+class ShareBatch(object):
+    """ Shares of many secrets of the same padded length, stored by column:
+        columns[share_idx] holds the values of that share for every secret, secret after secret
+        (a NumPy uint64 array when NumPy is available, else an array('Q')).
+    """
+    def __init__(self, sharer, numsecrets, numblocks, columns):
+        self.sharer = sharer
+        self.numsecrets = numsecrets
+        self.numblocks = numblocks
+        self.columns = columns
+
+    def __len__(self):
+        return self.numsecrets
+
+    def values(self, secret_idx, share_idx):
+        return self.columns[share_idx][secret_idx*self.numblocks:(secret_idx+1)*self.numblocks]
 
-def remove_padding(str):
-    """ Remove padding added using 'add_padding' """ 
-    nbpad = ord(str[-1])
-    return str[:-nbpad]
+    def share(self, secret_idx, share_idx):
+        """ Encoded share, as returned by ShamirStringSharer.share """
+        return self.sharer.encode_share(share_idx, self.values(secret_idx, share_idx))
+
+    def shares(self, secret_idx):
+        """ All the encoded shares of a secret """
+        return [self.share(secret_idx, share_idx) for share_idx in range(len(self.columns))]
+
+    def column(self, share_idx):
+        """ Encoded share 'share_idx' of every secret. With NumPy, the whole column is encoded at once
+            and only the secrets with 5 byte values are encoded on their own.
+        """
+        values = self.columns[share_idx]
+        if numpy is None or not isinstance(values, numpy.ndarray):
+            return [self.share(secret_idx, share_idx) for secret_idx in range(self.numsecrets)]
+        prefix = pack_varint(share_idx)
+        # one row per secret: the share index then the 4 byte values, copied out of a single buffer
+        size = len(prefix) + 4 * self.numblocks
+        rows = numpy.empty((self.numsecrets, size), dtype=numpy.uint8)
+        rows[:, :len(prefix)] = numpy.frombuffer(prefix, dtype=numpy.uint8)
+        rows[:, len(prefix):] = values.astype(">u4").view(numpy.uint8).reshape((self.numsecrets, -1))
+        data = rows.tobytes()
+        shares = [data[start:start+size] for start in range(0, len(data), size)]
+        for secret_idx in set((numpy.flatnonzero(values >= 0xffffffff) // self.numblocks).tolist()):
+            shares[secret_idx] = self.share(secret_idx, share_idx)
+        return shares
+
+    def all_shares(self):
+        """ Encoded shares of every secret: all_shares()[secret_idx] == shares(secret_idx) """
+        return list(map(list, zip(*[self.column(share_idx) for share_idx in range(len(self.columns))])))
 
 
 class ShamirStringSharer(object):
@@ -71,98 +264,507 @@ class ShamirStringSharer(object):
         The resulting integers [0-4294967310] are then encoded as 4 of 5 bytes. 
         Values from 0 to 2**32-2 take 4 bytes, values above take 5 bytes.
     """ 
-    def __init__(self, random_source=SecureRandomSource()):
+    def __init__(self, random_source=SecureRandomSource(), metrics=NULL_METRICS):
         self.P = 4294967311 # first prime larger than 2**32
-        self.field = ZpField(self.P, random_source=random_source)
+        self.field = FastZpField(self.P, random_source=random_source)
         self.V = self.field.value_type
-        self.sharer = ShamirPointSharer(self.field)
+        self.sharer = ShamirPointSharer(self.field, metrics=metrics)
+        self.lagrange_cache = LagrangeWeightsCache(self.P)
+        self.vectorized = VectorizedSharer(self.field) if numpy is not None else None
+        self.share_readers = collections.OrderedDict()
+        self.max_share_readers = 16
+
+    @property
+    def metrics(self):
+        """ Instrumentation of the stages, shared with the point sharer (see shamir.metrics) """
+        return self.sharer.metrics
+
+    @metrics.setter
+    def metrics(self, metrics):
+        self.sharer.metrics = metrics
         
-    def share(self, secret_string, threshold, numshares):
+    def share(self, secret_string, threshold, numshares, container=False):
+        """ With container=True, the shares are block shares (see shamir.container) """
         assert numshares < self.P, "numshares (%s) must be smaller than P(%s)" % (numshares, self.P)
         assert threshold <= numshares, "threshold (%s) must be smaller or equal to numshares(%s)" % (threshold, numshares)
+        metrics = self.metrics
+        with metrics.stage("padding"):
+            intvalues = bytes_to_blocks(secret_string, arrays=self.vectorized is not None)
+        metrics.count("bytes_shared", len(secret_string))
+        all_shares = self.share_blocks(intvalues, threshold, numshares)
+        with metrics.stage("encode"):
+            if container:
+                shares = [encode_block_share(idx, values, threshold, len(secret_string)) for idx, values in enumerate(all_shares)]
+            else:
+                shares = [self.encode_share(idx, values) for idx, values in enumerate(all_shares)]
+        metrics.count("share_bytes_out", sum(len(share) for share in shares))
+        return shares
+
+    def share_blocks(self, intvalues, threshold, numshares, arrays=False):
+        """ Share each integer block, returns the list of share values for each share index
+            (NumPy arrays with arrays=True when NumPy is available)
+        """
+        metrics = self.metrics
+        metrics.count("blocks", len(intvalues))
+        if self.vectorized is not None:
+            with metrics.stage("random"):
+                coefs = self.vectorized.coefficient_matrix(intvalues, threshold)
+            metrics.count("random_values", len(intvalues) * (threshold-1))
+            with metrics.stage("evaluate"):
+                matrix = self.vectorized.evaluate(coefs, range(1, numshares+1)).T
+                all_shares = list(matrix) if arrays else matrix.tolist()
+            metrics.count("field_mul", len(intvalues) * numshares * (threshold-1))
+            metrics.count("field_add", len(intvalues) * numshares * (threshold-1))
+            return all_shares
         all_shares = []
-        
-        bytevalues = [ord(c) for c in add_padding(secret_string)]
-        intvalues = [joinbase(fourbytes, 256) for fourbytes in iterslices(bytevalues, 4)]
         for i in intvalues:
             shares = self.sharer.share(self.V(i), threshold, [self.V(n+1) for n in range(numshares)])
-            share_values = [value for idx, value in shares]
-            all_shares.append(share_values)
-        return [self.encode_share(idx, [s.value for s in shares]) for idx, shares in enumerate(zip(*all_shares))]
+            all_shares.append([value.value for idx, value in shares])
+        return [list(values) for values in zip(*all_shares)]
         
-    def recombine(self, shares):
+    def recombine(self, shares, workers=None):
+        """ Recombine the shares. The Lagrange weights at x=0 only depend on the share indexes,
+            so they are computed once (and cached) and each block is a single dot product.
+            With workers=N, the blocks are split across a pool of N processes.
+        """
+        metrics = self.metrics
+        with metrics.stage("decode"):
+            decoded_shares = [self.decode_share(s) for s in shares]
+        metrics.count("share_bytes_in", sum(len(s) for s in shares))
+        weights = self.lagrange_weights(share_idx+1 for share_idx, values in decoded_shares)
+        k = len(decoded_shares)
+        if workers is not None and workers > 1:
+            share_values = [values for share_idx, values in decoded_shares]
+            if len(set(len(values) for values in share_values)) != 1:
+                raise EncodingError("Decoding error: shares have different lengths")
+            with metrics.stage("combine"):
+                secret = remove_padding(recombine_parallel(share_values, weights.weights, self.P, workers))
+            metrics.count("blocks", len(share_values[0]))
+            metrics.count("field_mul", len(share_values[0]) * k)
+            metrics.count("field_add", len(share_values[0]) * (k-1))
+            metrics.count("bytes_recombined", len(secret))
+            return secret
+        share_values = [values for share_idx, values in decoded_shares]
+        if len(set(len(values) for values in share_values)) != 1:
+            raise EncodingError("Decoding error: shares have different lengths")
+        with metrics.stage("combine"):
+            if self.vectorized is not None:
+                row = numpy.array([weights.weights], dtype=numpy.uint64)
+                intvalues = matmul_mod(row, numpy.array(share_values, dtype=numpy.uint64), self.P)[0]
+            else:
+                intvalues = [weights.combine(blockvalues) for blockvalues in zip(*share_values)]
+        metrics.count("blocks", len(intvalues))
+        metrics.count("field_mul", len(intvalues) * k)
+        metrics.count("field_add", len(intvalues) * (k-1))
+        with metrics.stage("unpadding"):
+            secret = blocks_to_bytes(intvalues)
+        metrics.count("bytes_recombined", len(secret))
+        return secret
+
+    def lagrange_weights(self, xs):
+        """ Cached Lagrange weights at x=0 of the share points xs """
+        misses = self.lagrange_cache.misses
+        with self.metrics.stage("lagrange"):
+            weights = self.lagrange_cache.get(xs)
+        if self.lagrange_cache.misses != misses:
+            # k*(k-1) products for the numerators and denominators, 3k for Montgomery's batch inversion and the weights
+            k = len(weights.xs)
+            self.metrics.count("inversions", 1)
+            self.metrics.count("field_mul", 2 * k * (k-1) + 3 * k)
+            self.metrics.count("field_add", 2 * k * (k-1))
+        return weights
+
+    def share_reader(self, share):
+        """ BlockShare or ShareIndex of a share, cached for the last shares read """
+        cached_share, reader = self.share_readers.pop(id(share), (None, None))
+        if cached_share is not share:
+            reader = BlockShare(share) if share[:len(MAGIC)] == MAGIC else ShareIndex(share)
+            if len(self.share_readers) >= self.max_share_readers:
+                self.share_readers.popitem(last=False)
+        self.share_readers[id(share)] = (share, reader)
+        return reader
+
+    def recombine_range(self, shares, offset, length):
+        """ Recombine the bytes [offset:offset+length] of the secret, only decoding and interpolating the
+            values of the blocks covering them. The index of each share is built on its first read
+            (block shares need none).
+        """
+        readers = [self.share_reader(share) for share in shares]
+        numblocks = len(readers[0])
+        if any(len(reader) != numblocks for reader in readers) or numblocks == 0:
+            raise EncodingError("Decoding error: shares have different lengths")
+        weights = self.lagrange_cache.get(reader.share_idx+1 for reader in readers)
+        def recombine_blocks(start, end):
+            intvalues = [weights.combine(blockvalues) for blockvalues in zip(*[r.values(start, end) for r in readers])]
+            return struct.pack(">%dI" % len(intvalues), *intvalues)
+        secret_length = readers[0].secret_length
+        if secret_length is None:
+            secret_length = len(remove_padding(recombine_blocks(numblocks - 1, numblocks))) + 4 * (numblocks - 1)
+        end = min(offset + length, secret_length)
+        if offset >= end:
+            return b""
+        first = offset // 4
+        return recombine_blocks(first, (end + 3) // 4)[offset - 4 * first:end - 4 * first]
+
+    def recombine_robust(self, shares, threshold):
+        """ Recombine more than 'threshold' shares of which up to (len(shares) - threshold) // 2 may be corrupted.
+            Returns (secret, sorted indexes of the corrupted shares).
+
+            A block is only decoded (Reed-Solomon decoding with ShamirPointSharer.decode) when the shares
+            not known to be corrupted do not lie on one polynomial of degree < threshold: the corrupted
+            shares found in a block are left out for all the following blocks.
+        """
         decoded_shares = [self.decode_share(s) for s in shares]
-        share_zp_indexes = [self.V(share_idx+1) for share_idx, values in decoded_shares]
-        decoded_zp_shares = zip(*[[self.V(v) for v in values] for share_idx, values in decoded_shares])
+        if len(set(len(values) for share_idx, values in decoded_shares)) != 1:
+            raise EncodingError("Decoding error: shares have different lengths")
+        xs = [share_idx+1 for share_idx, values in decoded_shares]
+        bad = set()
+        intvalues = self.decode_robust(xs, zip(*[values for share_idx, values in decoded_shares]), threshold, bad)
+        return blocks_to_bytes(intvalues), sorted(xs[i]-1 for i in bad)
+
+    def recombine_robust_stream(self, sources, sink, threshold, chunk_size=2**16):
+        """ recombine_robust for shares read in lockstep from the file-like 'sources' or BlockShares
+            (see recombine_stream). The secret is written to the file-like 'sink' unless it is None.
+            Returns the sorted indexes of the corrupted shares.
+        """
+        xs = [self.read_share_index(source)+1 for source in sources]
+        bad = set()
+        blocks = (self.decode_robust(xs, zip(*chunk), threshold, bad)
+                  for chunk in self.iter_share_columns(sources, chunk_size))
+        if sink is None:
+            collections.deque(blocks, maxlen=0)
+        else:
+            self.write_blocks(sink, (struct.pack(">%dI" % len(intvalues), *intvalues) for intvalues in blocks))
+        return sorted(xs[i]-1 for i in bad)
+
+    def decode_robust(self, xs, blocks, threshold, bad):
+        """ Values at x=0 of the 'blocks' (values of the shares at xs), see recombine_robust.
+            The positions of the corrupted shares are added to the set 'bad'.
+        """
+        if len(set(xs)) != len(xs):
+            raise EncodingError("Decoding error: duplicate share indexes")
+        maxerrors = (len(xs) - threshold) // 2
+        checks = None
         intvalues = []
-        for shares in decoded_zp_shares:
-            intvalues.append(self.sharer.recombine(zip(share_zp_indexes, shares), self.V(0)).value)
-        bytevalues = []
-        for i in intvalues:
-            fourbytes = splitbase(i, 256)
-            bytevalues += [0] * (4 - len(fourbytes)) + fourbytes
-        return remove_padding("".join(chr(b) for b in bytevalues))
+        for blockvalues in blocks:
+            if checks is None:
+                good = [i for i in range(len(xs)) if i not in bad]
+                base = good[:threshold]
+                weights = self.lagrange_cache.get(xs[i] for i in base)
+                # the other good shares detect any corruption of the block only if there are enough of them
+                checks = [(i, LagrangeWeights([xs[j] for j in base], self.P, xs[i])) for i in good[threshold:]] \
+                    if len(good) >= threshold + maxerrors else []
+            baseys = [blockvalues[i] for i in base]
+            if checks and all(w.combine(baseys) == blockvalues[i] for i, w in checks):
+                intvalues.append(weights.combine(baseys))
+                continue
+            points = [(self.V(x), self.V(y)) for x, y in zip(xs, blockvalues)]
+            polynomial, error_xs = self.sharer.decode(points, threshold)
+            intvalues.append(polynomial.evaluate(self.field.zero()).value)
+            new_bad = set(xs.index(x.value) for x in error_xs) - bad
+            if new_bad:
+                bad |= new_bad
+                checks = None
+        return intvalues
+
+    def share_many(self, secrets, threshold, numshares):
+        """ Share many secrets of the same padded length in one pass: the secrets are converted
+            in bulk, the randomness is drawn in one call and all the blocks are evaluated together.
+            The shares are identical to calling 'share' for each secret with the same random source.
+        """
+        assert numshares < self.P, "numshares (%s) must be smaller than P(%s)" % (numshares, self.P)
+        assert threshold <= numshares, "threshold (%s) must be smaller or equal to numshares(%s)" % (threshold, numshares)
+        if len(set(len(secret) // 4 for secret in secrets)) > 1:
+            raise ValueError("share_many: all the secrets must have the same padded length")
+        numblocks = len(secrets[0]) // 4 + 1 if secrets else 0
+        if len(set(len(secret) for secret in secrets)) == 1:
+            # same length, same padding: pad the joined secrets instead of each one
+            padding = add_padding(secrets[0])[len(secrets[0]):]
+            data = padding.join(secrets) + padding
+        else:
+            data = b"".join(add_padding(secret) for secret in secrets)
+        if self.vectorized is not None:
+            intvalues = numpy.frombuffer(data, dtype=">u4")
+            matrix = self.vectorized.share(intvalues, threshold, range(1, numshares+1))
+            columns = list(numpy.ascontiguousarray(matrix.T))
+        else:
+            intvalues = struct.unpack(">%dI" % (len(data) // 4), data)
+            columns = [array.array("Q", values) for values in self.share_blocks(intvalues, threshold, numshares)]
+        return ShareBatch(self, len(secrets), numblocks, columns)
+
+    def recombine_many(self, share_groups):
+        """ Recombine many secrets, share_groups contains the list of shares of each secret.
+            The groups using the same share indexes and length are recombined together.
+        """
+        decoded_groups = [[self.decode_share(s) for s in shares] for shares in share_groups]
+        batches = collections.defaultdict(list)
+        for i, decoded_shares in enumerate(decoded_groups):
+            indexes = tuple(share_idx+1 for share_idx, values in decoded_shares)
+            numvalues = set(len(values) for share_idx, values in decoded_shares)
+            if len(numvalues) != 1:
+                raise EncodingError("Decoding error: shares have different lengths")
+            batches[(indexes, numvalues.pop())].append(i)
+        results = [None] * len(decoded_groups)
+        for (indexes, numvalues), members in batches.items():
+            weights = self.lagrange_cache.get(indexes)
+            if self.vectorized is not None:
+                values = numpy.array([[values for share_idx, values in decoded_groups[i]] for i in members],
+                                     dtype=numpy.uint64).reshape((len(members), len(indexes), numvalues))
+                secrets = self.vectorized.combine(weights.weights, values)
+                for i, secret in zip(members, secrets):
+                    results[i] = blocks_to_bytes(secret)
+            else:
+                for i in members:
+                    intvalues = [weights.combine(blockvalues)
+                                 for blockvalues in zip(*[values for share_idx, values in decoded_groups[i]])]
+                    results[i] = blocks_to_bytes(intvalues)
+        return results
+
+    def share_stream(self, source, sinks, threshold, chunk_size=2**16, workers=None):
+        """ Share the content of the file-like object 'source', reading it by chunks of 'chunk_size' bytes.
+            One share is written incrementally to each of the file-like 'sinks'.
+            The shares are identical to the ones returned by 'share' for the same random source.
+            With workers=N, the chunks are shared by a pool of N processes, at most 2*N chunks being in memory
+            at once. The random coefficients of each chunk are still drawn from the random source of the sharer,
+            in the same order, so the shares do not depend on N.
+        """
+        numshares = len(sinks)
+        assert numshares < self.P, "numshares (%s) must be smaller than P(%s)" % (numshares, self.P)
+        assert threshold <= numshares, "threshold (%s) must be smaller or equal to numshares(%s)" % (threshold, numshares)
+        chunk_size = max(4, chunk_size - chunk_size % 4)
+        for idx, sink in enumerate(sinks):
+            sink.write(pack_varint(idx))
+        chunks = self.iter_padded_chunks(source, chunk_size)
+        if workers is not None and workers > 1:
+            random_source = self.field.random_source
+            tasks = ((data, threshold, numshares,
+                      array.array("Q", random_source.randrange_many(0, self.P, len(data) // 4 * (threshold-1))))
+                     for data in chunks)
+            encoded = map_bounded(share_stream_chunk, tasks, workers)
+        else:
+            encoded = (self.share_chunk(data, threshold, numshares) for data in chunks)
+        for parts in encoded:
+            for sink, part in zip(sinks, parts):
+                sink.write(part)
+
+    def iter_padded_chunks(self, source, chunk_size):
+        """ Yields the padded content of the file-like 'source' by chunks of a multiple of 4 bytes """
+        buffered = b""
+        while True:
+            data = source.read(chunk_size)
+            buffered += data
+            if not data:
+                buffered = add_padding(buffered)
+            usable = len(buffered) - len(buffered) % 4
+            if usable:
+                yield buffered[:usable]
+                buffered = buffered[usable:]
+            if not data:
+                break
+
+    def share_chunk(self, data, threshold, numshares):
+        """ Share the 4 byte blocks of 'data', returns the encoded values of each share """
+        intvalues = struct.unpack(">%dI" % (len(data) // 4), data)
+        return [self.encode_share_values(values) for values in self.share_blocks(intvalues, threshold, numshares, arrays=True)]
+
+    def recombine_stream(self, sources, sink, chunk_size=2**16, workers=None):
+        """ Recombine the shares read in lockstep from the file-like 'sources' (by chunks of 'chunk_size' bytes)
+            and write the secret incrementally to the file-like 'sink'. Sources can also be BlockShares
+            (e.g. of a mmap), read by chunks of the same number of values.
+            With workers=N, the decoded chunks are recombined by a pool of N processes.
+        """
+        weights = self.lagrange_cache.get(self.read_share_index(source)+1 for source in sources)
+        columns = self.iter_share_columns(sources, chunk_size)
+        if workers is not None and workers > 1:
+            blocks = map_bounded(combine_blocks, (([array.array("Q", values) for values in chunk], weights.weights, self.P)
+                                                  for chunk in columns), workers)
+        else:
+            blocks = (combine_blocks(chunk, weights.weights, self.P) for chunk in columns)
+        self.write_blocks(sink, blocks)
+
+    def write_blocks(self, sink, blocks):
+        """ Write the padded secret given by chunks of encoded blocks to the file-like 'sink', without the padding """
+        last_block = b""
+        for data in blocks:
+            data = last_block + data
+            sink.write(data[:-4])
+            last_block = data[-4:]
+        if not last_block:
+            raise EncodingError("Decoding error: empty shares")
+        sink.write(remove_padding(last_block))
+
+    def read_share_index(self, source):
+        """ Index of a BlockShare, or read at the start of the file-like share 'source' """
+        return source.share_idx if isinstance(source, BlockShare) else read_varint(source)
+
+    def iter_share_values(self, source, chunk_size):
+        """ Yields the decoded values of the file-like share 'source' (read by chunks of 'chunk_size' bytes,
+            after the share index) or of a BlockShare (by chunks of chunk_size // 4 values)
+        """
+        if isinstance(source, BlockShare):
+            step = max(1, chunk_size // 4)
+            for start in range(0, len(source), step):
+                yield source.values(start, start + step)
+            return
+        pending = b""
+        while True:
+            data = source.read(chunk_size)
+            if not data:
+                break
+            values, consumed = self.decode_share_values_partial(pending + data)
+            pending = (pending + data)[consumed:]
+            if values:
+                yield values
+        if pending:
+            raise EncodingError("Decoding error: truncated value: %d bytes" % (len(pending)))
+
+    def iter_share_columns(self, sources, chunk_size):
+        """ Yields the decoded values of the same blocks of each of the 'sources' (see iter_share_values) """
+        iterators = [self.iter_share_values(source, chunk_size) for source in sources]
+        decoded = [[] for source in sources]
+        eof = False
+        while not eof:
+            eof = True
+            for i, iterator in enumerate(iterators):
+                values = next(iterator, None)
+                if values is not None:
+                    eof = False
+                    decoded[i] += values
+            count = min(len(values) for values in decoded)
+            if count:
+                yield [values[:count] for values in decoded]
+                decoded = [values[count:] for values in decoded]
+        if any(decoded):
+            raise EncodingError("Decoding error: shares have different lengths")
 
     
     def encode_share_values(self, values):
         """ Encodes list of values between 0 and P=4294967311 (smallest prime above 2**32) to bytestrings
             Values from 0 to 2**32-2 take 4 bytes, values above take 5 bytes.
         """
-        resbytes = []
-        for b in values:
-            if b >= 0xffffffff:
-                resbytes += [0xff, 0xff, 0xff, 0xff, b - 2**32 + 1]
-            else:
-                sp = splitbase(b, 256)
-                resbytes += [0] * (4-len(sp))
-                resbytes += sp
-        return "".join(chr(b) for b in resbytes)
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return self.encode_share_values_array(values)
+        escaped = [i for i, v in enumerate(values) if v >= 0xffffffff]
+        if not escaped:
+            return struct.pack(">%dI" % len(values), *values)
+        parts = []
+        start = 0
+        for i in escaped:
+            parts.append(struct.pack(">%dI" % (i - start), *values[start:i]))
+            parts.append(ESCAPE + struct.pack("B", values[i] - 2**32 + 1))
+            start = i + 1
+        parts.append(struct.pack(">%dI" % (len(values) - start), *values[start:]))
+        return b"".join(parts)
         
+    def encode_share_values_array(self, values):
+        """ encode_share_values for a NumPy array: the 5 byte values are found with a vectorized comparison """
+        parts = []
+        start = 0
+        for i in numpy.flatnonzero(values >= 0xffffffff).tolist():
+            parts.append(values[start:i].astype(">u4").tobytes())
+            parts.append(ESCAPE + struct.pack("B", int(values[i]) - 2**32 + 1))
+            start = i + 1
+        parts.append(values[start:].astype(">u4").tobytes())
+        return b"".join(parts)
+
     def encode_share(self, share_idx, values):
         return pack_varint(share_idx) + self.encode_share_values(values)
     
-    def decode_share_values(self, data):
-        """ values from 2**32 to P=4294967311 take 5 bytes """
-        values = []
-        current = []
-        chrcodes = collections.deque(ord(c) for c in data)
-        while current or chrcodes:
-            if chrcodes:
-                current.append(chrcodes.popleft())
-            if len(current) == 4 and current != [0xff,0xff,0xff,0xff]:
-                values.append(joinbase(current, 256))
-                current = []
-            elif len(current) == 5:
-                values.append(2**32 + current[4] - 1)
-                current = []
+    def decode_share_values(self, data, start=0):
+        """ Values encoded in data[start:], read in place. Values from 2**32 to P=4294967311 take 5 bytes """
+        values, consumed = self.decode_share_values_partial(data, start)
+        if start + consumed != len(data):
+            raise EncodingError("Decoding error: truncated value: %d bytes" % (len(data) - start - consumed))
         return values
+
+    def decode_share_values_partial(self, data, start=0):
+        """ Decode all the complete values at the start of data[start:].
+            Returns (values, number of bytes consumed)
+        """
+        values = []
+        consumed = start
+        for run_start, end, escaped in iter_value_runs(data, start):
+            values.extend(struct.unpack_from(">%dI" % ((end - run_start) // 4), data, run_start))
+            if escaped is not None:
+                values.append(escaped)
+                end += 5
+            consumed = end
+        return values, consumed - start
+
+    def decode_share_values_into(self, data, out):
+        """ Decode the values of data into the preallocated array('Q') 'out'.
+            Returns the number of values written, raises EncodingError if 'out' is too short.
+        """
+        count = 0
+        consumed = 0
+        for start, end, escaped in iter_value_runs(data):
+            run = array.array("I")
+            run.frombytes(data[start:end])
+            if sys.byteorder == "little":
+                run.byteswap()
+            if count + len(run) + (escaped is not None) > len(out):
+                raise EncodingError("Decoding error: more than %d values" % (len(out)))
+            out[count:count+len(run)] = array.array("Q", run)
+            count += len(run)
+            if escaped is not None:
+                out[count] = escaped
+                count += 1
+                end += 5
+            consumed = end
+        if consumed != len(data):
+            raise EncodingError("Decoding error: truncated value: %d bytes" % (len(data) - consumed))
+        return count
     
     def decode_share(self, share):
-        share_idx, cursor= unpack_varint(share)
-        values = self.decode_share_values(share[cursor:])
-        return share_idx, values
+        """ Returns (share index, values) of a share or block share """
+        if share[:len(MAGIC)] == MAGIC:
+            block_share = BlockShare(share)
+            return block_share.share_idx, block_share.values()
+        share_idx, cursor = unpack_varint(share)
+        return share_idx, self.decode_share_values(share, cursor)
     
 
-if __name__ == '__main__':
+def share_stream_chunk(data, threshold, numshares, randoms):
+    """ Worker of ShamirStringSharer.share_stream: 'randoms' are the random coefficients of the chunk """
+    return ShamirStringSharer(PresetRandomSource(randoms)).share_chunk(data, threshold, numshares)
 
-    import random
-    shamir = ShamirStringSharer()
-    results = shamir.share("hhazeezezzeiokjgtroitrj itiijtr", 3, 10)
-    
-    for r in results:
-        print (r.encode("hex"))
-    #random.sample(results, 400)
-    print (shamir.recombine(random.sample(results, 3)))
-    
-    exit()
-    #print pack_shareidx(10).encode("hex")
-    print (encode_share(2, [142424242, 4294967295]).encode("hex"))
-    print (encode_share(0, [424242, 4294967296]).encode("hex"))
-    print (encode_share(0, [424242, 4294967310]).encode("hex"))
-    
-    print (decode_share("0000067932ffffffff00".decode("hex")))
-    
-    print (2**32)
-    #print joinbase([255, 256, 256, 256], 256)
-    
-    
\ No newline at end of file
+
+class ShamirByteSharer(object):
+    """ Share and recombine bytestrings byte by byte in GF(256).
+        A share is the share index (varint) followed by exactly one byte per byte of the secret.
+        At most 255 shares can be created.
+        Multiplications by a constant are done on whole bytestrings with translation tables.
+    """
+    def __init__(self, random_source=SecureRandomSource()):
+        self.field = GF256Field(random_source)
+        self.V = self.field.value_type
+        self.sharer = ShamirPointSharer(self.field)
+
+    def share(self, secret, threshold, numshares):
+        assert numshares < 256, "numshares (%s) must be smaller than 256" % (numshares)
+        assert threshold <= numshares, "threshold (%s) must be smaller or equal to numshares(%s)" % (threshold, numshares)
+        randoms = bytearray(self.field.random_source.randrange_many(0, 256, len(secret) * (threshold-1)))
+        # coefs[j]: coefficient of x^(j+1) of the polynomial of every byte
+        coefs = [bytes(randoms[j::threshold-1]) for j in range(threshold-1)]
+        shares = []
+        for idx in range(numshares):
+            table = self.field.mul_table(idx+1)
+            value = bytes(secret)
+            if coefs:
+                value = coefs[-1]
+                for c in reversed([secret] + coefs[:-1]):
+                    value = xor_bytes(value.translate(table), c)
+            shares.append(pack_varint(idx) + value)
+        return shares
+
+    def recombine(self, shares):
+        decoded_shares = [unpack_varint(s) for s in shares]
+        points = PointSet([(self.V(share_idx+1), None) for share_idx, cursor in decoded_shares],
+                          self.field.zero(), self.field.one())
+        result = bytes(len(shares[0]) - decoded_shares[0][1])
+        for share, (share_idx, cursor), weight in zip(shares, decoded_shares, points.lagrange_weights(self.field.zero())):
+            data = share[cursor:]
+            if len(data) != len(result):
+                raise EncodingError("Decoding error: shares have different lengths")
+            result = xor_bytes(result, data.translate(self.field.mul_table(weight.value)))
+        return result
@@ -31,10 +31,11 @@ def splitbase(value, base=257):
         value = div
     return list(reversed(result))
 
+def xor_bytes(a, b):
+    """ Bytewise xor of two bytestrings of the same length """
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
 
 if __name__ == "__main__":
-    print list(iterslices(range(10), 3, True))
-    print joinbase([1, 0, 1], 2)
-    #print splitbase(joinbase([255, 255, 255, 255, 255, 255, 255, 255], 257), 256)
-    
-    #print list(iterslices(range(18), 9))
+    print(list(iterslices(range(10), 3, True)))
+    print(joinbase([1, 0, 1], 2))
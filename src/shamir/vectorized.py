@@ -0,0 +1,102 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def mulmod(a, b, modulus):
+    """ (a * b) % modulus for uint64 arrays with a, b < modulus < 2**40, without overflowing 64 bits.
+        b is split in 16-bit limbs: a*b = ((a*b_hi % m) << 16) + a*b_lo
+    """
+    a = numpy.asarray(a, dtype=numpy.uint64)
+    b = numpy.asarray(b, dtype=numpy.uint64)
+    hi = (a * (b >> numpy.uint64(16))) % numpy.uint64(modulus)
+    lo = a * (b & numpy.uint64(0xffff))
+    return ((hi << numpy.uint64(16)) + lo) % numpy.uint64(modulus)
+
+def matmul_mod(a, b, modulus):
+    """ (a @ b) % modulus for uint64 matrices with entries < modulus < 2**40.
+        When the entries of a or b are small (e.g. powers of small share points), the sums of products fit in
+        64 bits and a single product is needed. Otherwise a is split in 16-bit limbs:
+        a @ b = ((a_hi @ b % m) << 16) + a_lo @ b, or multiplied column by column with mulmod for large k.
+    """
+    m = numpy.uint64(modulus)
+    inner = a.shape[-1]
+    amax = int(a.max()) if a.size else 0
+    bmax = int(b.max()) if b.size else 0
+    if inner * amax * bmax < 2**64:
+        result = numpy.matmul(a, b)
+        result %= m
+        return result
+    if inner * max(amax >> 16, 0xffff) * bmax < 2**64:
+        lo = numpy.matmul(a & numpy.uint64(0xffff), b)
+        lo %= m
+        result = numpy.matmul(a >> numpy.uint64(16), b)
+        result %= m
+        result <<= numpy.uint64(16)
+        result += lo
+        result %= m
+        return result
+    result = numpy.zeros(a.shape[:-1] + b.shape[1:], dtype=numpy.uint64)
+    for j in range(inner):
+        result = (result + mulmod(a[:, j:j+1], b[j:j+1, :], modulus)) % m
+    return result
+
+
+class VectorizedSharer(object):
+    """ Share many blocks at once in GF(modulus) using NumPy.
+
+        The coefficients of all the blocks are held in a (blocks x threshold) matrix
+        (column 0 is the secret) and all the share points are evaluated with vectorized
+        Horner steps. The random coefficients are drawn in the same order as
+        ShamirPointSharer.share so the shares are identical for the same random source.
+    """
+    def __init__(self, field):
+        if numpy is None:
+            raise ImportError("VectorizedSharer requires numpy")
+        if field.modulus >= 2**40:
+            raise ValueError("modulus too large for 64 bit vectorized arithmetic: %d" % (field.modulus))
+        self.field = field
+        self.modulus = field.modulus
+
+    def coefficient_matrix(self, secrets, threshold):
+        coefs = numpy.empty((len(secrets), threshold), dtype=numpy.uint64)
+        coefs[:, 0] = secrets
+        if threshold > 1:
+            random_source = self.field.random_source
+            count = len(secrets) * (threshold-1)
+            if hasattr(random_source, "randrange_array"):
+                randoms = random_source.randrange_array(0, self.modulus, count)
+            else:
+                randoms = numpy.asarray(random_source.randrange_many(0, self.modulus, count), dtype=numpy.uint64)
+            coefs[:, 1:] = randoms.reshape((len(secrets), threshold-1))
+        return coefs
+
+    def evaluate(self, coefs, points):
+        """ Evaluate the polynomials (one per row of 'coefs', lowest degree first) at all the points.
+            Returns a (blocks x points) matrix.
+        """
+        m = numpy.uint64(self.modulus)
+        xs = numpy.asarray(points, dtype=numpy.uint64)
+        direct = not len(points) or int(xs.max()) * self.modulus < 2**64 - self.modulus
+        result = numpy.repeat(coefs[:, -1:], len(points), axis=1)
+        for j in range(coefs.shape[1] - 2, -1, -1):
+            if direct:
+                result = (result * xs + coefs[:, j:j+1]) % m
+            else:
+                result = (mulmod(result, xs, self.modulus) + coefs[:, j:j+1]) % m
+        return result
+
+    def combine(self, weights, values):
+        """ Lagrange recombination: sum(weights[j] * values[..., j, :]) % modulus.
+            values: uint64 array of shape (..., len(weights), blocks)
+        """
+        m = numpy.uint64(self.modulus)
+        result = numpy.zeros(values.shape[:-2] + values.shape[-1:], dtype=numpy.uint64)
+        for j, weight in enumerate(weights):
+            result = (result + mulmod(values[..., j, :], numpy.uint64(weight), self.modulus)) % m
+        return result
+
+    def share(self, secrets, threshold, points):
+        """ Share the list of integer 'secrets' and return a (blocks x points) matrix of share values """
+        return self.evaluate(self.coefficient_matrix(secrets, threshold), points)
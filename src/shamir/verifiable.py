@@ -0,0 +1,232 @@
+""" Verifiable secret sharing with Pedersen commitments.
+
+    The secret is cut in blocks of 31 bytes. Each block b is shared with a polynomial a_b over GF(P) and
+    blinded with a random polynomial r_b, the dealer publishes C[b][j] = G^a_b[j] * H^r_b[j] mod Q for each
+    coefficient. Share i holds y_b = a_b(x) and z_b = r_b(x) for each block (x = i+1), which is correct iff
+    G^y_b * H^z_b = prod_j C[b][j]^(x^j).
+
+    The per-block checks are batched with random 128 bit coefficients rho_b: with A_j = prod_b C[b][j]^rho_b,
+    computed once for all the shares, a share is checked with G^(sum rho_b y_b) * H^(sum rho_b z_b) = prod_j A_j^(x^j),
+    so k+2 exponentiations per share instead of k+2 per block. A wrong share passes with probability 2**-128.
+    The A_j are projected on the subgroup of order P: components of other orders put in the commitments by
+    the dealer would make the result depend on the parity (or residues) of the rho_b drawn by each verifier.
+
+    G and H generate the subgroup of prime order P (256 bits) of Z_Q* (Q: 2048 bits) and are derived from
+    hashes, so log_G(H) is unknown. The commitments hide the secret perfectly and are binding as long as
+    discrete logarithms cannot be computed in that group (~2**112 operations), so shares forged on purpose
+    are rejected like corrupted ones. P and Q are derived from SHAKE-256 outputs: P is the first prime from
+    SHAKE-256("shamir pedersen q") | 2**255 and Q = r*P + 1 the first prime with r even from
+    (SHAKE-256("shamir pedersen Q") | 2**2047) // P.
+
+    share:       header (MODE_VERIFIABLE_SHARE) + varint share index + value and blinding value of each block (32 bytes each)
+    commitments: header (MODE_COMMITMENTS) + varint threshold + varint blocks + 256 bytes per commitment
+"""
+import hashlib
+import io
+import struct
+from shamir.container import HEADER_SIZE, MODE_VERIFIABLE_SHARE, MODE_COMMITMENTS, pack_header, expect_header
+from shamir.lagrange import LagrangeWeightsCache
+from shamir.random_source import SecureRandomSource
+from shamir.shamir import EncodingError, add_padding, remove_padding, pack_varint, read_varint, unpack_varint
+
+P = 0xb09564aa8f0ae9725d64c333029975304dd6c5412586252ecc22b54ef9375a07
+Q = int("cd8204af9bbb8c7e4121ac0ba59fc1c26092b7a6ee2ec3d0325e9da5056a2758190a3c882e54ec42b90a8a378903da7c"
+        "2a9732638b110376190dbc541a09bc8dd9208d7a80e980429af406b9b43d2524416d63f84f3eb28e57e2d608ca991e55"
+        "00665516e8cccbb3e906154040caa3b0521a929126e9c0841f9b3a25c99a5c285233250a370c7766b87fda0fdf9314b2"
+        "10114e5c51b8e152a6e2d02035fe3956adeaf7c16c7b781bbe5b2ec59a06ed69c6b0f56cff4ce98d0e64035981e48c19"
+        "0448d22e310eafa4c744dab54fa1352c01ecfdbd2f15fb713b14107ebf65282ada0f9d06325344098eff1e9baa9a285f"
+        "939f71531a976b7804c3a009ed44f5e1", 16)
+BLOCK_SIZE = 31
+VALUE_SIZE = 32
+COMMITMENT_SIZE = 256
+CHECK_BITS = 128
+# x^PROJECTION is the component of order P of x in Z_Q* (PROJECTION = 1 mod P, 0 mod (Q-1)/P)
+COFACTOR = (Q - 1) // P
+PROJECTION = COFACTOR * pow(COFACTOR, -1, P) % (Q - 1)
+
+
+class VerificationError(Exception):
+    pass
+
+
+def hash_to_subgroup(tag):
+    """ Element of the subgroup of order P derived from 'tag', with no known logarithm """
+    value = int.from_bytes(hashlib.shake_256(tag).digest(COMMITMENT_SIZE + 16), "big") % Q
+    return pow(value, (Q - 1) // P, Q)
+
+G = hash_to_subgroup(b"shamir pedersen G")
+H = hash_to_subgroup(b"shamir pedersen H")
+
+
+class FixedBaseExponentiator(object):
+    """ base^e mod modulus for exponents e < 2**bits with precomputed tables of base^(d * 2^(window*w)) """
+    def __init__(self, base, modulus, bits=256, window=4):
+        self.modulus = modulus
+        self.window = window
+        self.mask = 2**window - 1
+        self.tables = []
+        for w in range((bits + window - 1) // window):
+            table = [1]
+            for d in range(self.mask):
+                table.append(table[-1] * base % modulus)
+            self.tables.append(table)
+            base = table[-1] * base % modulus
+
+    def pow(self, exponent):
+        result = 1
+        for table in self.tables:
+            digit = exponent & self.mask
+            if digit:
+                result = result * table[digit] % self.modulus
+            exponent >>= self.window
+        return result
+
+G_POW = FixedBaseExponentiator(G, Q)
+H_POW = FixedBaseExponentiator(H, Q)
+
+
+def evaluate(coefs, x):
+    """ Value at x of the polynomial with coefficients 'coefs' (lowest degree first) in GF(P) """
+    result = 0
+    for c in reversed(coefs):
+        result = (result * x + c) % P
+    return result
+
+def encode_commitments(threshold, commitments):
+    return pack_header(MODE_COMMITMENTS) + pack_varint(threshold) + pack_varint(len(commitments)) + \
+        b"".join(c.to_bytes(COMMITMENT_SIZE, "big") for block in commitments for c in block)
+
+def unpack_commitments(data):
+    values = [int.from_bytes(data[i:i+COMMITMENT_SIZE], "big") for i in range(0, len(data), COMMITMENT_SIZE)]
+    if any(not 0 < c < Q for c in values):
+        raise EncodingError("Decoding error: commitment out of range")
+    return values
+
+def decode_commitments(data):
+    """ Returns (threshold, commitments of each block) """
+    cursor = expect_header(data, MODE_COMMITMENTS)
+    threshold, cursor = unpack_varint(data, cursor)
+    numblocks, cursor = unpack_varint(data, cursor)
+    if len(data) != cursor + numblocks * threshold * COMMITMENT_SIZE:
+        raise EncodingError("Decoding error: commitments have a wrong length")
+    values = unpack_commitments(data[cursor:])
+    return (threshold, [values[b*threshold:(b+1)*threshold] for b in range(numblocks)])
+
+
+class VerifiableSharer(object):
+    """ Share a bytestring with Pedersen commitments so that each share can be verified on its own.
+        'check_random_source' draws the coefficients of the batched checks, it must not be predictable by the dealer.
+    """
+    def __init__(self, random_source=SecureRandomSource(), check_random_source=SecureRandomSource()):
+        self.random_source = random_source
+        self.check_random_source = check_random_source
+        self.lagrange_cache = LagrangeWeightsCache(P)
+
+    def share(self, secret, threshold, numshares):
+        """ Returns (shares, commitments) """
+        padded = add_padding(secret, BLOCK_SIZE)
+        intvalues = [int.from_bytes(padded[i:i+BLOCK_SIZE], "big") for i in range(0, len(padded), BLOCK_SIZE)]
+        randoms = self.random_source.randrange_many(0, P, len(intvalues) * (2 * threshold - 1))
+        coefs = [[v] + randoms[b*(threshold-1):(b+1)*(threshold-1)] for b, v in enumerate(intvalues)]
+        offset = len(intvalues) * (threshold-1)
+        blinding = [randoms[offset+b*threshold:offset+(b+1)*threshold] for b in range(len(intvalues))]
+        commitments = [[G_POW.pow(a) * H_POW.pow(r) % Q for a, r in zip(block_coefs, block_blinding)]
+                       for block_coefs, block_blinding in zip(coefs, blinding)]
+        shares = []
+        for idx in range(numshares):
+            x = idx + 1
+            values = [evaluate(polynomial, x) for block in zip(coefs, blinding) for polynomial in block]
+            shares.append(pack_header(MODE_VERIFIABLE_SHARE) + pack_varint(idx) +
+                          b"".join(v.to_bytes(VALUE_SIZE, "big") for v in values))
+        return (shares, encode_commitments(threshold, commitments))
+
+    def decode_share(self, share):
+        """ Returns (index, values, blinding values) """
+        cursor = expect_header(share, MODE_VERIFIABLE_SHARE)
+        idx, cursor = unpack_varint(share, cursor)
+        if (len(share) - cursor) % (2 * VALUE_SIZE):
+            raise EncodingError("Decoding error: truncated value: %d bytes" % ((len(share) - cursor) % (2 * VALUE_SIZE)))
+        values = [int.from_bytes(share[i:i+VALUE_SIZE], "big") for i in range(cursor, len(share), VALUE_SIZE)]
+        if any(v >= P for v in values):
+            raise EncodingError("Decoding error: value out of range")
+        return (idx, values[0::2], values[1::2])
+
+    def verify_shares(self, shares, commitments):
+        """ Returns a list of booleans: True when the share matches the commitments """
+        return self.verify_stream([io.BytesIO(share) for share in shares], io.BytesIO(commitments))
+
+    def verify_stream(self, sources, commitments, chunk_blocks=1024):
+        """ verify_shares for shares and commitments read from file-like objects by chunks of 'chunk_blocks'
+            blocks: only the aggregated commitments and the sums of each share are kept across chunks.
+        """
+        expect_header(commitments.read(HEADER_SIZE), MODE_COMMITMENTS)
+        threshold = read_varint(commitments)
+        numblocks = read_varint(commitments)
+        xs = []
+        for source in sources:
+            try:
+                expect_header(source.read(HEADER_SIZE), MODE_VERIFIABLE_SHARE)
+                xs.append(read_varint(source) + 1)
+            except (EncodingError, struct.error):
+                xs.append(None)
+        aggregated = [1] * threshold
+        sums = [[0, 0] for source in sources]
+        for start in range(0, numblocks, chunk_blocks):
+            count = min(chunk_blocks, numblocks - start)
+            data = commitments.read(count * threshold * COMMITMENT_SIZE)
+            if len(data) != count * threshold * COMMITMENT_SIZE:
+                raise EncodingError("Decoding error: commitments have a wrong length")
+            # random linear combination of the blocks
+            rho = self.check_random_source.randrange_many(1, 2**CHECK_BITS, count)
+            values = unpack_commitments(data)
+            for b, r in enumerate(rho):
+                aggregated = [a * pow(c, r, Q) % Q for a, c in zip(aggregated, values[b*threshold:(b+1)*threshold])]
+            for i, source in enumerate(sources):
+                if xs[i] is None:
+                    continue
+                data = source.read(count * 2 * VALUE_SIZE)
+                values = [int.from_bytes(data[v:v+VALUE_SIZE], "big") for v in range(0, len(data), VALUE_SIZE)]
+                if len(data) != count * 2 * VALUE_SIZE or any(v >= P for v in values):
+                    xs[i] = None
+                    continue
+                sums[i][0] += sum(map(int.__mul__, rho, values[0::2]))
+                sums[i][1] += sum(map(int.__mul__, rho, values[1::2]))
+        if commitments.read(1):
+            raise EncodingError("Decoding error: commitments have a wrong length")
+        aggregated = [pow(a, PROJECTION, Q) for a in aggregated]
+        results = []
+        for x, (sum_y, sum_z), source in zip(xs, sums, sources):
+            if x is None or source.read(1):
+                results.append(False)
+                continue
+            lhs = G_POW.pow(sum_y % P) * H_POW.pow(sum_z % P) % Q
+            rhs = 1
+            for j, a in enumerate(aggregated):
+                rhs = rhs * pow(a, pow(x, j, P), Q) % Q
+            results.append(lhs == rhs)
+        return results
+
+    def verify(self, share, commitments):
+        return self.verify_shares([share], commitments)[0]
+
+    def recombine(self, shares, commitments=None):
+        """ Recombine the shares. With commitments, the invalid shares are left out and
+            VerificationError is raised if less than 'threshold' valid shares remain.
+        """
+        if commitments is not None:
+            threshold = decode_commitments(commitments)[0]
+            valid = self.verify_shares(shares, commitments)
+            invalid = [i for i, ok in enumerate(valid) if not ok]
+            shares = [share for share, ok in zip(shares, valid) if ok]
+            if len(shares) < threshold:
+                raise VerificationError("invalid shares: %s, %d valid shares, %d required" %
+                                        (invalid, len(shares), threshold))
+            shares = shares[:threshold]
+        decoded = [self.decode_share(share) for share in shares]
+        if len(set(len(ys) for idx, ys, zs in decoded)) != 1:
+            raise EncodingError("Decoding error: shares have different lengths")
+        weights = self.lagrange_cache.get(idx + 1 for idx, ys, zs in decoded)
+        blocks = [weights.combine(values) for values in zip(*[ys for idx, ys, zs in decoded])]
+        if any(v >= 2**(8*BLOCK_SIZE) for v in blocks):
+            raise EncodingError("Decoding error: recombined block out of range")
+        return remove_padding(b"".join(v.to_bytes(BLOCK_SIZE, "big") for v in blocks))
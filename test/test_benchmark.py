@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+import unittest
+from shamir.benchmark import compare_results, load_results, run_suite, save_results
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_compare_results_ReturnsRegressionsAboveThreshold(self):
+        baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+        results = {"a": 1.2, "b": 1.3, "c": 0.5, "d": 9.0}
+
+        self.assertEqual(compare_results(results, baseline, max_regression=0.25), [("b", 1.0, 1.3)])
+
+    def test_run_suite_CustomMatrix(self):
+        results = run_suite([([16, 17], [(2, 3)])], micro=False)
+
+        self.assertEqual(sorted(results), ["recombine/size=16/k=2/n=3", "recombine/size=17/k=2/n=3",
+                                           "share/size=16/k=2/n=3", "share/size=17/k=2/n=3"])
+
+    def test_save_results_load_results_RoundTrip(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "bench.json")
+            save_results({"share/size=16/k=2/n=3": 0.5}, path)
+
+            self.assertEqual(load_results(path), {"share/size=16/k=2/n=3": 0.5})
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import mmap
+import os
+import tempfile
+import unittest
+from shamir.container import MAGIC, MODE_BLOCKS, MODE_PLAIN, BlockShare, EncodingError, encode_block_share, get_mode
+from shamir.shamir import ShamirStringSharer
+
+VALUES = [0, 1, 2**32-2, 2**32-1, 2**32, 2**32+14, 123456789] * 100
+
+
+class TestContainer(unittest.TestCase):
+    def test_BlockShare_EncodeDecode(self):
+        data = encode_block_share(3, VALUES, 2, 2790, chunk_blocks=64)
+
+        share = BlockShare(data)
+
+        self.assertEqual(get_mode(data), MODE_BLOCKS)
+        self.assertEqual((share.share_idx, share.threshold, share.secret_length, len(share)), (3, 2, 2790, 700))
+        self.assertEqual(share.values(), VALUES)
+        self.assertEqual(share.values(63, 131), VALUES[63:131])
+        self.assertEqual(share.values(690, 800), VALUES[690:])
+
+    def test_BlockShare_OnlyReadChunksAreVerified(self):
+        data = bytearray(encode_block_share(0, VALUES, 2, 2790, chunk_blocks=64))
+        data[share_value_offset(data, 200)] ^= 1
+
+        share = BlockShare(bytes(data))
+
+        self.assertEqual(share.values(0, 128), VALUES[:128])
+        self.assertRaises(EncodingError, share.values, 190, 210)
+        self.assertRaises(EncodingError, share.verify)
+
+    def test_BlockShare_WhenTruncated_RaisesEncodingError(self):
+        data = encode_block_share(0, VALUES, 2, 2790)
+
+        self.assertRaises(EncodingError, BlockShare, data[:-1])
+        self.assertRaises(EncodingError, BlockShare, data[:20])
+
+    def test_BlockShare_FromMmap(self):
+        shares = ShamirStringSharer().share(os.urandom(1000), 2, 3, container=True)
+        with tempfile.TemporaryFile() as f:
+            f.write(shares[1])
+            f.flush()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            share = BlockShare(mapped)
+
+            self.assertEqual(share.values(10, 20), BlockShare(shares[1]).values(10, 20))
+            del share
+            mapped.close()
+
+    def test_ShamirStringSharer_ContainerShares_CanBeRecombinedWithOldShares(self):
+        secret = b"the quick brown fox jumps over the lazy dog"
+        sharer = ShamirStringSharer()
+        shares = sharer.share(secret, 3, 5, container=True)
+        old_format = [sharer.encode_share(*sharer.decode_share(share)) for share in shares]
+
+        self.assertTrue(all(share.startswith(MAGIC) for share in shares))
+        self.assertEqual(get_mode(old_format[0]), MODE_PLAIN)
+        self.assertEqual(sharer.recombine(shares[2:]), secret)
+        self.assertEqual(sharer.recombine(shares[:2] + old_format[4:]), secret)
+
+
+def share_value_offset(data, block):
+    return BlockShare(bytes(data)).values_offset + 4 * block
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import itertools
+import unittest
+from shamir.dispersal import DispersalSharer, InformationDisperser
+from shamir.field import FastZpField
+from shamir.shamir import EncodingError
+
+SECRET = b"the quick brown fox jumps over the lazy dog" * 100
+
+
+class TestDispersal(unittest.TestCase):
+    def test_InformationDisperser_ReconstructFromAnyThresholdShares(self):
+        disperser = InformationDisperser(FastZpField(4294967311))
+        data = bytes(range(256)) * 3
+
+        fragments = disperser.disperse(data, 3, 5)
+
+        self.assertEqual([len(values) for values in fragments], [64] * 5)
+        for indexes in itertools.combinations(range(5), 3):
+            xs = [idx+1 for idx in indexes]
+            self.assertEqual(disperser.reconstruct(xs, [fragments[idx] for idx in indexes]), data)
+
+    def test_DispersalSharer_ShareAndRecombine(self):
+        sharer = DispersalSharer()
+
+        shares = sharer.share(SECRET, 4, 6)
+
+        self.assertTrue(all(len(share) < len(SECRET) / 4 + 150 for share in shares))
+        self.assertEqual(sharer.recombine(shares[2:]), SECRET)
+        self.assertEqual(sharer.recombine(shares[::-1]), SECRET)
+        sharer.disperser.vectorized = None
+        self.assertEqual(sharer.recombine([shares[5], shares[0], shares[3], shares[1]]), SECRET)
+
+    def test_DispersalSharer_SmallSecrets(self):
+        sharer = DispersalSharer()
+        for secret, threshold, numshares in [(b"", 2, 3), (b"a", 1, 1), (b"abcde", 3, 3), (b"abcdefgh", 5, 9)]:
+            shares = sharer.share(secret, threshold, numshares)
+
+            self.assertEqual(sharer.recombine(shares[-threshold:]), secret)
+
+    def test_DispersalSharer_WhenNotEnoughShares_RaisesEncodingError(self):
+        sharer = DispersalSharer()
+        shares = sharer.share(SECRET, 3, 5)
+        other_shares = sharer.share(SECRET[1:], 3, 5)
+
+        self.assertRaises(EncodingError, sharer.recombine, shares[:2])
+        self.assertRaises(EncodingError, sharer.recombine, [shares[0], shares[0], shares[1]])
+        self.assertRaises(EncodingError, sharer.recombine, shares[:2] + other_shares[2:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import socket
+import time
+import unittest
+from shamir.distribution import CustodianClient, CustodianServer, DistributionError, ShareCollector, ShareDistributor
+from shamir.shamir import ShamirStringSharer
+
+
+def unused_endpoint():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    address = s.getsockname()
+    s.close()
+    return address
+
+
+class TestDistribution(unittest.TestCase):
+    def run_with_custodians(self, coroutine, delays):
+        async def main():
+            servers = [CustodianServer(delay) for delay in delays]
+            endpoints = [await server.start() for server in servers]
+            try:
+                return await coroutine(servers, endpoints)
+            finally:
+                for server in servers:
+                    await server.close()
+        return asyncio.run(main())
+
+    def test_CustodianClient_StoreAndFetch(self):
+        async def scenario(servers, endpoints):
+            client = CustodianClient(*endpoints[0])
+            await client.store(b"key", b"share")
+            return await client.fetch(b"key")
+
+        self.assertEqual(self.run_with_custodians(scenario, [0]), b"share")
+
+    def test_CustodianClient_FetchUnknownKey_RaisesDistributionError(self):
+        async def scenario(servers, endpoints):
+            await CustodianClient(*endpoints[0]).fetch(b"key")
+
+        self.assertRaises(DistributionError, self.run_with_custodians, scenario, [0])
+
+    def test_DistributeAndCollect_ResultIsCorrect(self):
+        async def scenario(servers, endpoints):
+            sharer = ShamirStringSharer()
+            await ShareDistributor(sharer, endpoints).distribute(b"backup", b"the secret", 3)
+            return [len(server.shares) for server in servers], \
+                await ShareCollector(sharer, endpoints).collect(b"backup", 3)
+
+        self.assertEqual(self.run_with_custodians(scenario, [0] * 5), ([1] * 5, b"the secret"))
+
+    def test_Collect_DoesNotWaitForStragglers(self):
+        async def scenario(servers, endpoints):
+            sharer = ShamirStringSharer()
+            await ShareDistributor(sharer, endpoints).distribute(b"backup", b"the secret", 2)
+            servers[0].delay = 5
+            start = time.time()
+            result = await ShareCollector(sharer, endpoints + [unused_endpoint()]).collect(b"backup", 2)
+            return result, time.time() - start
+
+        result, duration = self.run_with_custodians(scenario, [0, 0, 0])
+
+        self.assertEqual(result, b"the secret")
+        self.assertTrue(duration < 2)
+
+    def test_Collect_WhenFastestCustodianServesShareOfAnotherLength_SecretIsRecombined(self):
+        async def scenario(servers, endpoints):
+            sharer = ShamirStringSharer()
+            await ShareDistributor(sharer, endpoints).distribute(b"backup", b"the secret", 3)
+            servers[0].shares[b"backup"] = sharer.share(b"a stale and longer secret", 3, 4)[0]
+            for server in servers[1:]:
+                server.delay = 0.1
+            return await ShareCollector(sharer, endpoints).collect(b"backup", 3)
+
+        self.assertEqual(self.run_with_custodians(scenario, [0] * 4), b"the secret")
+
+    def test_Collect_WhenNotEnoughShares_RaisesDistributionError(self):
+        async def scenario(servers, endpoints):
+            sharer = ShamirStringSharer()
+            await ShareDistributor(sharer, endpoints).distribute(b"backup", b"the secret", 3)
+            servers[0].shares.clear()
+            servers[1].delay = 5
+            await ShareCollector(sharer, endpoints, timeout=0.5).collect(b"backup", 3)
+
+        self.assertRaises(DistributionError, self.run_with_custodians, scenario, [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
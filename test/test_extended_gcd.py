@@ -7,10 +7,10 @@ class TestGCD(unittest.TestCase):
         n1, n2 = 252,105
         
         a, b, gcd = extended_gcd(n1, n2)
-        self.assertEquals(gcd, 21)
-        self.assertEquals(a, -2)
-        self.assertEquals(b, 5)
-        self.assertEquals(a*n1+b*n2, gcd) # bezout's identify: just for documentation
+        self.assertEqual(gcd, 21)
+        self.assertEqual(a, -2)
+        self.assertEqual(b, 5)
+        self.assertEqual(a*n1+b*n2, gcd) # bezout's identify: just for documentation
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import unittest
+from shamir.field import ZpField, FastZpField, GF256Field, gf256_mul, gf256_inverse
+from shamir.polynomial import PointSet
+from shamir.shamir import ShamirPointSharer
+from shamir.random_source import UnitTestRandomSource
+
+
+class TestFastZpField(unittest.TestCase):
+    def test_FastZpField_Operations_SameResultAsZpField(self):
+        V, F = ZpField(37).value_type, FastZpField(37).value_type
+        for a in range(37):
+            for b in range(1, 37):
+                self.assertEqual((F(a) + F(b)).value, (V(a) + V(b)).value)
+                self.assertEqual((F(a) - F(b)).value, (V(a) - V(b)).value)
+                self.assertEqual((F(a) * F(b)).value, (V(a) * V(b)).value)
+                self.assertEqual((F(a) // F(b)).value, (V(a) // V(b)).value)
+            self.assertEqual((-F(a)).value, (-V(a)).value)
+
+    def test_FastZpField_IntMethods(self):
+        field = FastZpField(37)
+
+        self.assertEqual(field.add(30, 10), 3)
+        self.assertEqual(field.sub(3, 10), 30)
+        self.assertEqual(field.neg(3), 34)
+        self.assertEqual(field.mul(12, 10), 9)
+        self.assertEqual(field.inverse(5), 15)
+        self.assertEqual(field.div(3, 5), 8)
+        self.assertEqual(field.evaluate([1, 0, 12], 2), 16)
+
+    def test_FastZpField_InverseOfZero_RaisesZeroDivisionError(self):
+        field = FastZpField(37)
+
+        self.assertRaises(ZeroDivisionError, field.inverse, 0)
+        self.assertRaises(ZeroDivisionError, lambda: ~field.value_type(0))
+
+    def test_FastZpField_ShamirPointSharer_ShareAndRecombine(self):
+        field = FastZpField(37, UnitTestRandomSource(range(2)))
+        V = field.value_type
+        sharer = ShamirPointSharer(field)
+
+        shares = sharer.share(V(12), 3, [V(i+1) for i in range(7)])
+
+        self.assertEqual([(x.value, y.value) for x, y in shares],
+                         [(1, 13), (2, 16), (3, 21), (4, 28), (5, 0), (6, 11), (7, 24)])
+        self.assertEqual(sharer.recombine(shares[4:], V(0)), V(12))
+
+
+class TestGF256Field(unittest.TestCase):
+    def test_gf256_mul(self):
+        self.assertEqual(gf256_mul(0x57, 0x83), 0xc1) # FIPS-197 example
+        self.assertEqual(gf256_mul(0x57, 0x13), 0xfe)
+        self.assertEqual(gf256_mul(0, 0x13), 0)
+
+    def test_gf256_inverse(self):
+        for a in range(1, 256):
+            self.assertEqual(gf256_mul(a, gf256_inverse(a)), 1)
+        self.assertRaises(ZeroDivisionError, gf256_inverse, 0)
+
+    def test_GF256Field_mul_table(self):
+        field = GF256Field()
+
+        self.assertEqual(b"\x57\x00\x01".translate(field.mul_table(0x83)), b"\xc1\x00\x83")
+
+    def test_GF256Field_PointSet_evaluate_lagrange(self):
+        field = GF256Field()
+        V = field.value_type
+        # 0x2a + 0x10 x + 0x03 x^2
+        points = [(V(x), V(0x2a) + V(0x10) * V(x) + V(0x03) * V(x) * V(x)) for x in [3, 7, 200]]
+
+        self.assertEqual(PointSet(points, field.zero(), field.one()).evaluate_lagrange(field.zero()), V(0x2a))
+
+
+if __name__ == "__main__":
+    unittest.main()
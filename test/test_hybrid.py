@@ -0,0 +1,84 @@
+import unittest
+from shamir.container import HEADER_SIZE, MODE_PLAIN, MODE_HYBRID_KEY, MODE_HYBRID_CIPHERTEXT, get_mode
+from shamir.hybrid import AuthenticationError, CallbackCipher, HybridSharer, ShakeCipher
+from shamir.random_source import UnitTestRandomSource
+from shamir.shamir import EncodingError, ShamirStringSharer
+
+SECRET = b"the quick brown fox jumps over the lazy dog" * 100
+
+
+class TestHybrid(unittest.TestCase):
+    def test_ShakeCipher_EncryptDecrypt(self):
+        cipher = ShakeCipher(chunk_size=64)
+        key = bytes(range(32))
+
+        data = cipher.encrypt(key, SECRET)
+
+        self.assertEqual(len(data), len(SECRET) + 48)
+        self.assertNotIn(b"quick", data)
+        self.assertEqual(cipher.decrypt(key, data), SECRET)
+        self.assertRaises(AuthenticationError, cipher.decrypt, bytes(32), data)
+        self.assertRaises(AuthenticationError, cipher.decrypt, key, data, b"header")
+
+    def test_ShakeCipher_AssociatedDataIsAuthenticated(self):
+        cipher = ShakeCipher()
+        key = bytes(range(32))
+
+        data = cipher.encrypt(key, SECRET, b"header")
+
+        self.assertEqual(cipher.decrypt(key, data, b"header"), SECRET)
+        self.assertRaises(AuthenticationError, cipher.decrypt, key, data)
+        self.assertRaises(AuthenticationError, cipher.decrypt, key, data, b"heades")
+
+    def test_HybridSharer_ShareAndRecombine(self):
+        sharer = HybridSharer()
+
+        key_shares, ciphertext = sharer.share(SECRET, 3, 5)
+
+        self.assertEqual([get_mode(s) for s in key_shares], [MODE_HYBRID_KEY] * 5)
+        self.assertEqual(get_mode(ciphertext), MODE_HYBRID_CIPHERTEXT)
+        self.assertTrue(all(len(s) < 50 for s in key_shares))
+        self.assertEqual(sharer.recombine(key_shares[2:], ciphertext), SECRET)
+        self.assertEqual(sharer.recombine(key_shares[:1] + key_shares[3:], ciphertext), SECRET)
+
+    def test_HybridSharer_WhenCiphertextTampered_RaisesAuthenticationError(self):
+        sharer = HybridSharer()
+        key_shares, ciphertext = sharer.share(SECRET, 2, 3)
+        tampered = bytearray(ciphertext)
+        tampered[100] ^= 1
+
+        self.assertRaises(AuthenticationError, sharer.recombine, key_shares[:2], bytes(tampered))
+        self.assertRaises(AuthenticationError, sharer.recombine, key_shares[:1], ciphertext)
+
+    def test_HybridSharer_WhenCipherIdTampered_RaisesAuthenticationError(self):
+        sharer = HybridSharer()
+        key_shares, ciphertext = sharer.share(SECRET, 2, 3)
+        relabelled = bytearray(ciphertext)
+        relabelled[HEADER_SIZE] = 3
+        other_cipher = ShakeCipher()
+        other_cipher.cipher_id = 3
+
+        self.assertRaises(AuthenticationError, HybridSharer(cipher=other_cipher).recombine, key_shares[:2], bytes(relabelled))
+
+    def test_HybridSharer_WhenGivenWrongContainer_RaisesEncodingError(self):
+        sharer = HybridSharer()
+        key_shares, ciphertext = sharer.share(SECRET, 2, 3)
+        plain_shares = ShamirStringSharer().share(b"legacy share", 2, 3)
+
+        self.assertEqual(get_mode(plain_shares[0]), MODE_PLAIN)
+        self.assertRaises(EncodingError, sharer.recombine, key_shares[:2], key_shares[2])
+        self.assertRaises(EncodingError, sharer.recombine, plain_shares[:2], ciphertext)
+
+    def test_HybridSharer_WithCallbackCipher(self):
+        xor = lambda key, data, associated_data: bytes(b ^ key[0] for b in data)
+        sharer = HybridSharer(random_source=UnitTestRandomSource(range(7, 1000)), cipher=CallbackCipher(2, xor, xor))
+
+        key_shares, ciphertext = sharer.share(b"secret", 2, 3)
+
+        self.assertEqual(ciphertext[-6:], bytes(b ^ 7 for b in b"secret"))
+        self.assertEqual(sharer.recombine(key_shares[1:], ciphertext), b"secret")
+        self.assertRaises(EncodingError, HybridSharer().recombine, key_shares[1:], ciphertext)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from shamir.field import ZpField
+from shamir.lagrange import LagrangeWeights, LagrangeWeightsCache, batch_inverse_mod
+from shamir.polynomial import PointSet
+
+
+class TestLagrange(unittest.TestCase):
+    def test_batch_inverse_mod(self):
+        values = [1, 2, 5, 36, 17]
+
+        inverses = batch_inverse_mod(values, 37)
+
+        self.assertEqual([(v * i) % 37 for v, i in zip(values, inverses)], [1] * 5)
+
+    def test_batch_inverse_mod_WhenGivenZero_RaisesZeroDivisionError(self):
+        self.assertRaises(ZeroDivisionError, batch_inverse_mod, [3, 0, 4], 37)
+
+    def test_LagrangeWeights_combine_SameResultAsPointSet(self):
+        field = ZpField(37)
+        V = field.value_type
+        points = [(2, 16), (7, 24), (5, 0), (4, 28)]
+
+        weights = LagrangeWeights([x for x, y in points], 37)
+        expected = PointSet([(V(x), V(y)) for x, y in points], field.zero(), field.one()).evaluate_lagrange(V(0))
+
+        self.assertEqual(weights.combine([y for x, y in points]), 12)
+        self.assertEqual(weights.combine([y for x, y in points]), expected.value)
+
+    def test_LagrangeWeights_WhenDuplicateIndexes_RaisesZeroDivisionError(self):
+        self.assertRaises(ZeroDivisionError, LagrangeWeights, [2, 7, 2], 37)
+
+    def test_LagrangeWeightsCache_ReusesWeightsForSameIndexes(self):
+        cache = LagrangeWeightsCache(37)
+
+        weights1 = cache.get([2, 7, 5])
+        weights2 = cache.get((2, 7, 5))
+
+        self.assertTrue(weights1 is weights2)
+
+    def test_LagrangeWeightsCache_EvictsLeastRecentlyUsed(self):
+        cache = LagrangeWeightsCache(37, maxsize=2)
+        weights1 = cache.get([1, 2])
+        cache.get([1, 3])
+        cache.get([1, 2])
+        cache.get([1, 4])
+
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.get([1, 2]) is weights1)
+        self.assertEqual(sorted(cache.entries), [(1, 2), (1, 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import binascii
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from shamir.__main__ import TextSink, TextSource, main
+from shamir.shamir import ShamirStringSharer
+from shamir.verifiable import VerifiableSharer
+
+
+def run(argv, stdin=b""):
+    """ Returns (exit code, stdout bytes) """
+    stdout = io.TextIOWrapper(io.BytesIO())
+    with mock.patch("sys.stdin", io.TextIOWrapper(io.BytesIO(stdin))), mock.patch("sys.stdout", stdout):
+        code = main(argv)
+        stdout.flush()
+        return code, stdout.buffer.getvalue()
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.secret = os.urandom(10001)
+        self.secret_path = self.path("secret")
+        with open(self.secret_path, "wb") as f:
+            f.write(self.secret)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_TextSink_TextSource_Base64_RoundTripByChunks(self):
+        output = io.BytesIO()
+        sink = TextSink(output, "base64")
+        for i in range(0, len(self.secret), 7):
+            sink.write(self.secret[i:i+7])
+        sink.close()
+        source = TextSource(io.BytesIO(output.getvalue()), "base64")
+
+        self.assertEqual(source.read(1), self.secret[:1])
+        self.assertEqual(source.read(1000), self.secret[1:1001])
+        self.assertEqual(source.read(), self.secret[1001:])
+        self.assertEqual(source.read(5), b"")
+
+    def test_split_combine_Files(self):
+        self.assertEqual(run(["split", "-k", "3", "-n", "5", "-o", self.path("share"), self.secret_path,
+                              "--chunk-size", "1000"])[0], 0)
+
+        code, output = run(["combine", self.path("share.5"), self.path("share.2"), self.path("share.3")])
+        self.assertEqual(code, 0)
+        self.assertEqual(output, self.secret)
+
+    def test_split_combine_Base64FilesWithJobs(self):
+        run(["split", "-k", "2", "-n", "3", "-o", self.path("share"), "--format", "base64", self.secret_path,
+             "--jobs", "2", "--chunk-size", "4000"])
+
+        code, output = run(["combine", self.path("share.3"), self.path("share.1"), "--format", "base64",
+                            "--jobs", "2", "--chunk-size", "999"])
+        self.assertEqual(output, self.secret)
+
+    def test_split_combine_HexLinesOnStdinStdout(self):
+        code, output = run(["split", "-k", "2", "-n", "3"], stdin=b"hello world")
+        lines = output.splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(run(["combine"], stdin=lines[2] + b"\n" + lines[0] + b"\n"), (0, b"hello world"))
+
+    def test_verify_CorruptedShare_IsReported(self):
+        run(["split", "-k", "2", "-n", "5", "-o", self.path("share"), self.secret_path])
+        with open(self.path("share.4"), "r+b") as f:
+            f.seek(200)
+            f.write(b"\x00\x01\x02\x03")
+        paths = [self.path("share.%d" % (i + 1)) for i in range(5)]
+
+        code, output = run(["verify", "-k", "2"] + paths)
+        self.assertEqual(code, 1)
+        self.assertEqual(output.decode().splitlines(), ["%s: OK" % p for p in paths[:3]] +
+                         ["%s: inconsistent with the other shares" % paths[3], "%s: OK" % paths[4]])
+
+    def test_combine_verify_HexBlockShareFiles(self):
+        shares = ShamirStringSharer().share(self.secret, 2, 4, container=True)
+        shares[3] = shares[3][:-1] + bytes([shares[3][-1] ^ 1])
+        shares[1] = shares[1][:10]
+        paths = [self.path("block.%d" % (i + 1)) for i in range(4)]
+        for path, share in zip(paths, shares):
+            with open(path, "wb") as f:
+                f.write(binascii.hexlify(share))
+
+        code, output = run(["combine", paths[2], paths[0], "--format", "hex", "--chunk-size", "1000"])
+        self.assertEqual((code, output), (0, self.secret))
+        code, output = run(["verify", "-k", "2", "--format", "hex"] + paths)
+        self.assertEqual(code, 1)
+        self.assertEqual(output.decode().splitlines(),
+                         ["%s: OK" % paths[0], "%s: Decoding error: truncated block share header" % paths[1],
+                          "%s: OK" % paths[2], "%s: Decoding error: CRC mismatch in chunk 0" % paths[3]])
+
+    def test_verify_Commitments_Files(self):
+        shares, commitments = VerifiableSharer().share(self.secret[:1000], 2, 3)
+        shares[1] = shares[1][:-1] + bytes([shares[1][-1] ^ 1])
+        paths = [self.path("verifiable.%d" % (i + 1)) for i in range(3)]
+        for path, data in zip(paths + [self.path("commitments")], shares + [commitments]):
+            with open(path, "wb") as f:
+                f.write(data)
+
+        code, output = run(["verify", "--commitments", self.path("commitments")] + paths)
+        self.assertEqual(code, 1)
+        self.assertEqual(output.decode().splitlines(), ["%s: OK" % paths[0], "%s: does not match the commitments" % paths[1],
+                                                        "%s: OK" % paths[2]])
+
+    def test_combine_MissingFile_ReturnsError(self):
+        with mock.patch("sys.stderr", io.StringIO()) as stderr:
+            self.assertEqual(run(["combine", self.path("missing")])[0], 1)
+        self.assertIn("missing", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
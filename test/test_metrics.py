@@ -0,0 +1,63 @@
+import unittest
+from shamir.metrics import NULL_METRICS, CallbackMetrics, Profiler
+from shamir.profile import run_workload
+from shamir.shamir import ShamirStringSharer
+
+
+class TestMetrics(unittest.TestCase):
+    def test_ShamirStringSharer_metrics_DisabledByDefault(self):
+        sharer = ShamirStringSharer()
+
+        self.assertIs(sharer.metrics, NULL_METRICS)
+        self.assertIs(sharer.sharer.metrics, NULL_METRICS)
+
+    def test_Profiler_share_recombine_StagesAndCounters(self):
+        profiler = Profiler()
+        sharer = ShamirStringSharer(metrics=profiler)
+        shares = sharer.share(b"secret data", 3, 5)
+
+        self.assertEqual(sharer.recombine(shares[:3]), b"secret data")
+        self.assertEqual(list(profiler.stages), ["padding", "random", "evaluate", "encode",
+                                                 "decode", "lagrange", "combine", "unpadding"])
+        self.assertEqual(profiler.counters["blocks"], 3 + 3)
+        self.assertEqual(profiler.counters["random_values"], 3 * 2)
+        self.assertEqual(profiler.counters["inversions"], 1)
+        self.assertEqual(profiler.counters["bytes_shared"], 11)
+        self.assertEqual(profiler.counters["bytes_recombined"], 11)
+        self.assertEqual(profiler.counters["share_bytes_out"], sum(len(s) for s in shares))
+
+    def test_Profiler_ShamirPointSharerFallback_CountsEachBlock(self):
+        profiler = Profiler()
+        sharer = ShamirStringSharer(metrics=profiler)
+        sharer.vectorized = None
+        sharer.share(b"secret data", 3, 5)
+
+        self.assertEqual(profiler.stages["random"].calls, 3)
+        self.assertEqual(profiler.stages["evaluate"].calls, 3)
+        self.assertEqual(profiler.counters["field_mul"], 3 * 5 * 2)
+
+    def test_CallbackMetrics_ReceivesStages(self):
+        stages = []
+        counters = {}
+        metrics = CallbackMetrics(lambda name, seconds, peak: stages.append(name),
+                                  lambda name, value: counters.__setitem__(name, counters.get(name, 0) + value))
+        sharer = ShamirStringSharer()
+        sharer.metrics = metrics
+        shares = sharer.share(b"abc", 2, 3)
+        sharer.metrics = NULL_METRICS
+        sharer.recombine(shares[:2])
+
+        self.assertEqual(stages, ["padding", "random", "evaluate", "encode"])
+        self.assertEqual(counters["bytes_shared"], 3)
+        self.assertNotIn("bytes_recombined", counters)
+
+    def test_run_workload_TraceMemory_ReportsPeakAllocation(self):
+        profiler = run_workload(Profiler(trace_memory=True), 4096, 2, 3)
+
+        self.assertTrue(all(stats.peak_memory is not None for stats in profiler.stages.values()))
+        self.assertGreater(profiler.stages["padding"].peak_memory, 4096)
+        self.assertIn("unpadding", profiler.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
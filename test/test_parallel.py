@@ -0,0 +1,43 @@
+import io
+import unittest
+from shamir.lagrange import LagrangeWeights
+from shamir.parallel import recombine_parallel, split_range
+from shamir.random_source import UnitTestRandomSource
+from shamir.shamir import ShamirStringSharer
+
+
+class TestParallel(unittest.TestCase):
+    def test_split_range(self):
+        self.assertEqual(split_range(10, 3), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(split_range(2, 4), [(0, 1), (1, 2)])
+
+    def test_recombine_parallel_ResultIsCorrect(self):
+        P = 4294967311
+        weights = LagrangeWeights([2, 4, 5], P).weights
+        # polynomials 12 + x + x^2 and 2**32-1 + 3x + 2x^2 evaluated at 2, 4, 5
+        share_values = [[18, 2**32+13], [32, 2**32+43], [42, 2**32+64]]
+
+        result = recombine_parallel(share_values, weights, P, workers=2)
+
+        self.assertEqual(result, b"\x00\x00\x00\x0c\xff\xff\xff\xff")
+
+    def test_ShamirStringSharer_recombine_WithWorkers_SameResultAsSerial(self):
+        secret = bytes(bytearray(range(256))) * 20
+        shamir = ShamirStringSharer(random_source=UnitTestRandomSource(range(10000)))
+        shares = shamir.share(secret, 3, 5)
+
+        self.assertEqual(shamir.recombine(shares[1:4], workers=3), secret)
+        self.assertEqual(shamir.recombine(shares[1:4], workers=3), shamir.recombine(shares[1:4]))
+
+    def test_ShamirStringSharer_share_stream_WithWorkers_SameSharesAsSerial(self):
+        secret = bytes(bytearray(range(256))) * 20
+        sinks = [io.BytesIO() for i in range(5)]
+        ShamirStringSharer(UnitTestRandomSource(range(10000))).share_stream(io.BytesIO(secret), sinks, 3, 1000)
+        parallel_sinks = [io.BytesIO() for i in range(5)]
+        ShamirStringSharer(UnitTestRandomSource(range(10000))).share_stream(io.BytesIO(secret), parallel_sinks, 3, 1000,
+                                                                           workers=2)
+
+        self.assertEqual([sink.getvalue() for sink in parallel_sinks], [sink.getvalue() for sink in sinks])
+
+if __name__ == "__main__":
+    unittest.main()
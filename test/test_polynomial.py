@@ -1,44 +1,120 @@
 import unittest
 import itertools
 from shamir.field import ZpField
-from shamir.polynomial import Polynomial, PointSet
+from shamir.polynomial import Polynomial, PointSet, SubproductTree, DecodingError, convolve, divmod_lists
 
 
 class TestPolynomial(unittest.TestCase):
     def test_Polynomial_repr(self):
         p = Polynomial([3, 5, 78, 2])
         
-        self.assertEquals(repr(p), "<Polynomial:3x^3+5x^2+78x+2>")
+        self.assertEqual(repr(p), "<Polynomial:3x^3+5x^2+78x+2>")
 
     def test_Polynomial_evaluate_ValueIsCorrect(self):
         p = Polynomial([3, 5, 78, 2])
         
         value = p.evaluate(3)
         
-        self.assertEquals(value, 362)
+        self.assertEqual(value, 362)
    
     def test_Polynomial_mult(self):
         
-        self.assertEquals(Polynomial([3, 5]) * Polynomial([2]), Polynomial([6, 10]))
-        self.assertEquals(Polynomial([3, 5]) * Polynomial([4, 5]), Polynomial([12, 35, 25]))
+        self.assertEqual(Polynomial([3, 5]) * Polynomial([2]), Polynomial([6, 10]))
+        self.assertEqual(Polynomial([3, 5]) * Polynomial([4, 5]), Polynomial([12, 35, 25]))
 
     def test_Polynomial_add(self):
-        self.assertEquals(Polynomial([3, 5, 9]) + Polynomial([4, 5]), 
+        self.assertEqual(Polynomial([3, 5, 9]) + Polynomial([4, 5]), 
                           Polynomial([3, 9, 14]))
 
 
     def test_Polynomial_multByInteger(self):
-        self.assertEquals(Polynomial([3, 5]) * 2, Polynomial([6, 10]))
-        self.assertEquals(Polynomial([3, 5]) * 6, Polynomial([18, 30]))
+        self.assertEqual(Polynomial([3, 5]) * 2, Polynomial([6, 10]))
+        self.assertEqual(Polynomial([3, 5]) * 6, Polynomial([18, 30]))
    
     def test_Polynomial_from_factored_form(self):
         p = Polynomial.from_roots([4, 7, 9])
-        self.assertEquals(p, Polynomial([1, -20, 127, -252]))
+        self.assertEqual(p, Polynomial([1, -20, 127, -252]))
     
+    def test_convolve_Karatsuba_SameResultAsSchoolbook(self):
+        a = [(i * 37) % 101 - 50 for i in range(90)]
+        b = [(i * 53) % 97 - 48 for i in range(70)]
+        expected = [0] * (len(a) + len(b) - 1)
+        for i, a_i in enumerate(a):
+            for j, b_j in enumerate(b):
+                expected[i+j] += a_i * b_j
+
+        self.assertEqual(convolve(a, b, 0), expected)
+
+    def test_divmod_lists(self):
+        # x^3 - 2x^2 - 4 = (x - 3)(x^2 + x + 3) + 5
+        self.assertEqual(divmod_lists([1, -2, 0, -4], [1, -3], 0, 1), ([1, 1, 3], [5]))
+
+
+class TestSubproductTree(unittest.TestCase):
+    def test_SubproductTree_root_IsProductOfRoots(self):
+        tree = SubproductTree([4, 7, 9])
+
+        self.assertEqual(Polynomial(tree.root.coefs), Polynomial.from_roots([4, 7, 9]))
+
+    def test_SubproductTree_evaluate(self):
+        tree = SubproductTree([1, 2, 3, -1, 5])
+
+        self.assertEqual(tree.evaluate([3, 5, 78, 2]), [Polynomial([3, 5, 78, 2]).evaluate(x) for x in [1, 2, 3, -1, 5]])
+
+    def test_SubproductTree_evaluate_LargeField_SameResultAsHorner(self):
+        field = ZpField(4294967311)
+        V = field.value_type
+        polynomial = Polynomial([V((i * 2654435761) % 4294967311) for i in range(150)])
+        xs = [V(i+1) for i in range(300)]
+        tree = SubproductTree(xs, field.zero(), field.one())
+
+        self.assertEqual(tree.evaluate(polynomial.coefs), [polynomial.evaluate(x) for x in xs])
+        self.assertTrue(tree.root.left.left.inverse is not None) # cached for the next evaluations
+
+    def test_SubproductTree_interpolate_Field(self):
+        field = ZpField(4294967311)
+        V = field.value_type
+        coefs = [V((i * 2654435761) % 4294967311) for i in range(40)]
+        xs = [V(i+1) for i in range(40)]
+        tree = SubproductTree(xs, field.zero(), field.one())
+
+        self.assertEqual(tree.interpolate([Polynomial(coefs).evaluate(x) for x in xs]), coefs)
+
+    def test_PointSet_get_lagrange_polynomial_fast_SameResultAsSchoolbook(self):
+        field = ZpField(37)
+        V = field.value_type
+        points = PointSet([(V(2), V(16)), (V(7), V(24)), (V(5), V(0)), (V(4), V(28))], field.zero(), field.one())
+
+        self.assertEqual(points.get_lagrange_polynomial_fast(), Polynomial([V(0), V(1), V(0), V(12)]))
+
+
 class TestLagrangePolynomial(unittest.TestCase):
+    def test_PointSet_decode_CorrectsErrors(self):
+        field = ZpField(257)
+        V = field.value_type
+        p = Polynomial([V(3), V(100), V(17)])
+        points = [(V(x), p.evaluate(V(x))) for x in range(1, 10)]
+        points[2] = (V(3), V(5))
+        points[6] = (V(7), V(0))
+
+        decoded, error_xs = PointSet(points, field.zero(), field.one()).decode(3)
+
+        self.assertEqual(decoded, p)
+        self.assertEqual(sorted(x.value for x in error_xs), [3, 7])
+
+    def test_PointSet_decode_WhenTooManyErrors_RaisesDecodingError(self):
+        field = ZpField(257)
+        V = field.value_type
+        p = Polynomial([V(3), V(100), V(17)])
+        points = [(V(x), p.evaluate(V(x))) for x in range(1, 7)]
+        points[0] = (V(1), V(5))
+        points[4] = (V(5), V(0))
+
+        self.assertRaises(DecodingError, PointSet(points, field.zero(), field.one()).decode, 3)
+
     def test_1(self):
         p = PointSet([(1.0, 3.0), (-1.0, 2.0), (2.0, -1.0)]).get_lagrange_polynomial()
-        self.assertEquals( p, Polynomial([-1.5, 0.5, 4.0]))
+        self.assertEqual( p, Polynomial([-1.5, 0.5, 4.0]))
         
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+from shamir.random_source import SecureRandomSource, UnitTestRandomSource
+from shamir.vectorized import numpy
+
+P = 4294967311
+
+
+def chi_square(counts):
+    expected = float(sum(counts)) / len(counts)
+    return sum((c - expected) ** 2 / expected for c in counts)
+
+def histogram(values, bins, value_to_bin):
+    counts = [0] * bins
+    for v in values:
+        counts[value_to_bin(v)] += 1
+    return counts
+
+
+class TestSecureRandomSource(unittest.TestCase):
+    # chi-square critical values at p=1e-6 (false failure once in a million runs)
+    CRITICAL_63DOF = 131.0
+    CRITICAL_2DOF = 27.7
+
+    def check_uniformity(self, random_source):
+        values = random_source.randrange_many(0, P, 64000)
+
+        self.assertEqual(len(values), 64000)
+        self.assertTrue(all(0 <= v < P for v in values))
+        self.assertLess(chi_square(histogram(values, 64, lambda v: v * 64 // P)), self.CRITICAL_63DOF)
+        self.assertLess(chi_square(histogram(values, 64, lambda v: v % 64)), self.CRITICAL_63DOF)
+
+    def check_no_modulo_bias(self, random_source):
+        # 192 values in one byte words: without rejection, [0, 64[ would be drawn twice as often
+        values = random_source.randrange_many(0, 192, 30000)
+
+        self.assertLess(chi_square(histogram(values, 3, lambda v: v // 64)), self.CRITICAL_2DOF)
+
+    def test_randrange_many_IsUniform(self):
+        random_source = SecureRandomSource(buffer_size=1024)
+
+        self.check_uniformity(random_source)
+        self.check_no_modulo_bias(random_source)
+
+    def test_randrange_many_WithoutNumpy_IsUniform(self):
+        random_source = SecureRandomSource(buffer_size=1024)
+
+        with mock.patch("shamir.random_source.numpy", None):
+            self.check_uniformity(random_source)
+            self.check_no_modulo_bias(random_source)
+
+    def test_randrange_InRange(self):
+        random_source = SecureRandomSource()
+
+        values = [random_source.randrange(-3, 4) for i in range(1000)]
+
+        self.assertEqual(set(values), set(range(-3, 4)))
+        self.assertTrue(all(0 <= v < 2**70 for v in random_source.randrange_many(0, 2**70, 10)))
+        self.assertRaises(ValueError, random_source.randrange_many, 5, 5, 1)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_randrange_array_InRange(self):
+        random_source = SecureRandomSource()
+
+        values = random_source.randrange_array(5, 12, 1000)
+
+        self.assertEqual(values.dtype, numpy.uint64)
+        self.assertEqual(set(values.tolist()), set(range(5, 12)))
+        self.assertTrue(int(random_source.randrange_array(0, 4294967311, 1000).max()) < 4294967311)
+
+    def test_randbytes_BufferIsRefilled(self):
+        random_source = SecureRandomSource(buffer_size=16)
+
+        data = [random_source.randbytes(10) for i in range(10)]
+
+        self.assertEqual([len(d) for d in data], [10] * 10)
+        self.assertEqual(len(set(data)), 10)
+        self.assertEqual(len(random_source.randbytes(100)), 100)
+
+
+class TestUnitTestRandomSource(unittest.TestCase):
+    def test_randrange_many_ContinuesSequence(self):
+        random_source = UnitTestRandomSource(range(10))
+
+        self.assertEqual(random_source.randrange(0, 10), 0)
+        self.assertEqual(random_source.randrange_many(0, 10, 3), [1, 2, 3])
+        self.assertEqual(random_source.randrange(0, 10), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from shamir.recombiner import Recombiner
+from shamir.shamir import EncodingError, ShamirStringSharer
+
+SECRET = b"the quick brown fox jumps over the lazy dog"
+
+
+class TestRecombiner(unittest.TestCase):
+    def check_add_shares(self, use_numpy):
+        sharer = ShamirStringSharer()
+        shares = sharer.share(SECRET, 3, 5)
+        recombiner = Recombiner(sharer, 3)
+        recombiner.use_numpy = use_numpy and recombiner.use_numpy
+
+        self.assertIsNone(recombiner.add_share(shares[4]))
+        self.assertIsNone(recombiner.add_share(shares[4]))
+        self.assertEqual(recombiner.missing, 2)
+        self.assertIsNone(recombiner.add_share(shares[1]))
+        self.assertEqual(recombiner.add_share(shares[2]), SECRET)
+        self.assertEqual(recombiner.add_share(shares[0]), SECRET)
+
+    def test_Recombiner_AddShares_ReturnsSecretAtThreshold(self):
+        self.check_add_shares(use_numpy=True)
+
+    def test_Recombiner_AddSharesWithoutNumpy_ReturnsSecretAtThreshold(self):
+        self.check_add_shares(use_numpy=False)
+
+    def test_Recombiner_ThresholdOne(self):
+        sharer = ShamirStringSharer()
+        shares = sharer.share(SECRET, 1, 2)
+
+        self.assertEqual(Recombiner(sharer, 1).add_share(shares[1]), SECRET)
+
+    def test_Recombiner_WhenSharesHaveDifferentLengths_RaisesEncodingError(self):
+        sharer = ShamirStringSharer()
+        recombiner = Recombiner(sharer, 2)
+        recombiner.add_share(sharer.share(SECRET, 2, 3)[0])
+
+        self.assertRaises(EncodingError, recombiner.add_share, sharer.share(SECRET[:10], 2, 3)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
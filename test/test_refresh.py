@@ -0,0 +1,66 @@
+import io
+import unittest
+from shamir.refresh import ShareRefresher
+from shamir.shamir import EncodingError, ShamirStringSharer
+
+SECRET = b"the quick brown fox jumps over the lazy dog" * 20
+
+
+def refresh(refresher, shares, threshold):
+    numblocks = len(refresher.sharer.decode_share(shares[0])[1])
+    updates = [io.BytesIO() for share in shares]
+    refresher.write_updates(numblocks, threshold, updates, chunk_size=50)
+    new_shares = []
+    for share, update in zip(shares, updates):
+        sink = io.BytesIO()
+        refresher.apply_update(io.BytesIO(share), io.BytesIO(update.getvalue()), sink, chunk_size=64)
+        new_shares.append(sink.getvalue())
+    return new_shares
+
+
+class TestRefresh(unittest.TestCase):
+    def test_ShareRefresher_Refresh_SameSecretNewShares(self):
+        sharer = ShamirStringSharer()
+        refresher = ShareRefresher(sharer)
+        shares = sharer.share(SECRET, 3, 5)
+
+        new_shares = refresh(refresher, shares, 3)
+
+        self.assertTrue(all(old != new for old, new in zip(shares, new_shares)))
+        self.assertEqual(sharer.recombine(new_shares[2:]), SECRET)
+        self.assertEqual(sharer.recombine([new_shares[4], new_shares[0], new_shares[2]]), SECRET)
+        self.assertNotEqual(sharer.recombine([new_shares[0], shares[1], shares[2]]), SECRET)
+
+    def test_ShareRefresher_WhenUpdateOfAnotherShare_RaisesEncodingError(self):
+        refresher = ShareRefresher()
+        shares = refresher.sharer.share(SECRET, 2, 3)
+        updates = [io.BytesIO() for share in shares]
+        refresher.write_updates(10, 2, updates)
+
+        self.assertRaises(EncodingError, refresher.apply_update,
+                          io.BytesIO(shares[0]), io.BytesIO(updates[1].getvalue()), io.BytesIO())
+        self.assertRaises(EncodingError, refresher.apply_update,
+                          io.BytesIO(shares[0]), io.BytesIO(updates[0].getvalue()), io.BytesIO())
+
+    def test_ShareRefresher_Redistribute_NewThreshold(self):
+        sharer = ShamirStringSharer()
+        refresher = ShareRefresher(sharer)
+        shares = sharer.share(SECRET, 3, 5)
+        old_holders = [4, 0, 2]
+        subshares = [[io.BytesIO() for j in range(6)] for i in old_holders]
+        for i, sinks in zip(old_holders, subshares):
+            refresher.redistribute(io.BytesIO(shares[i]), sinks, 4, chunk_size=100)
+
+        new_shares = []
+        for j in range(6):
+            sink = io.BytesIO()
+            refresher.combine_subshares([io.BytesIO(sinks[j].getvalue()) for sinks in subshares], sink, chunk_size=70)
+            new_shares.append(sink.getvalue())
+
+        self.assertEqual(sharer.recombine(new_shares[2:]), SECRET)
+        self.assertEqual(sharer.recombine(new_shares[:4]), SECRET)
+        self.assertNotEqual(sharer.recombine(new_shares[:3]), SECRET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import itertools
+import os
+import unittest
+from unittest import mock
+from shamir.random_source import UnitTestRandomSource
+from shamir.scheme import SharingScheme
+from shamir.shamir import EncodingError, ShamirStringSharer
+from shamir.vectorized import numpy
+
+
+class TestSharingScheme(unittest.TestCase):
+    def test_SharingScheme_share_SameSharesAsShamirStringSharer(self):
+        secret = b"a fixed configuration secret"
+        expected = ShamirStringSharer(UnitTestRandomSource(range(2**32, 2**32 + 100))).share(secret, 3, 5)
+        scheme = SharingScheme(3, 5, ShamirStringSharer(UnitTestRandomSource(range(2**32, 2**32 + 100))))
+
+        self.assertEqual(scheme.share(secret), expected)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_SharingScheme_share_SmallVandermondePowers_SingleProduct(self):
+        scheme = SharingScheme(3, 5)
+        secret = os.urandom(4096)
+
+        with mock.patch.object(numpy, "matmul", wraps=numpy.matmul) as matmul:
+            shares = scheme.share(secret)
+
+        self.assertEqual(matmul.call_count, 1)
+        self.assertEqual(scheme.recombine(shares[2:]), secret)
+
+    def test_SharingScheme_recombine_EveryKSubset(self):
+        scheme = SharingScheme(3, 5)
+        shares = scheme.share(b"secret data")
+
+        for subset in itertools.permutations(shares, 3):
+            self.assertEqual(scheme.recombine(list(subset)), b"secret data")
+        self.assertEqual(len(scheme.lagrange_cache), 10)
+
+    def test_SharingScheme_WithoutNumpy_SameShares(self):
+        sharer = ShamirStringSharer(UnitTestRandomSource(range(100)))
+        expected = SharingScheme(5, 9, sharer).share(b"0123456789")
+        sharer = ShamirStringSharer(UnitTestRandomSource(range(100)))
+        sharer.vectorized = None
+        scheme = SharingScheme(5, 9, sharer)
+
+        self.assertEqual(scheme.share(b"0123456789"), expected)
+        self.assertEqual(scheme.recombine(expected[4:]), b"0123456789")
+
+    def test_SharingScheme_recombine_BoundedWeightsCache(self):
+        scheme = SharingScheme(2, 6, max_cached_weights=4)
+        shares = scheme.share(b"abc")
+
+        for pair in itertools.combinations(shares, 2):
+            self.assertEqual(scheme.recombine(list(pair)), b"abc")
+        self.assertEqual(len(scheme.lagrange_cache), 4)
+
+    def test_SharingScheme_recombine_NotEnoughShares_RaisesEncodingError(self):
+        scheme = SharingScheme(3, 5)
+        shares = scheme.share(b"abc")
+
+        self.assertRaises(EncodingError, scheme.recombine, [shares[0], shares[1], shares[1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
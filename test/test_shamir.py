@@ -1,8 +1,13 @@
+import array
+import io
+import os
+import struct
 import unittest
 from shamir.shamir import ShamirPointSharer, ShamirStringSharer, pack_varint,\
-    unpack_varint
-from shamir.field import ZpField
-from shamir.polynomial import Polynomial
+    unpack_varint, EncodingError, ShamirByteSharer, ShareIndex, blocks_to_bytes, bytes_to_blocks
+from shamir.container import BlockShare, encode_block_share
+from shamir.field import ZpField, GF256Field
+from shamir.polynomial import DecodingError, Polynomial
 from shamir.random_source import UnitTestRandomSource
 
 
@@ -15,7 +20,7 @@ class TestShamir(unittest.TestCase):
         
         shares = sharer.share(V(12), 3, [V(i+1) for i in range(numshares)])
         
-        self.assertEquals(shares,
+        self.assertEqual(shares,
                           [(V(1), V(13)), 
                            (V(2), V(16)), 
                            (V(3), V(21)), 
@@ -24,6 +29,36 @@ class TestShamir(unittest.TestCase):
                            (V(6), V(11)), 
                            (V(7), V(24))])
         
+    def test_Shamir_ShareWithMultipointEvaluation_SameResultAsHorner(self):
+        field = ZpField(37, UnitTestRandomSource(range(2)))
+        V = field.value_type
+        sharer = ShamirPointSharer(field, multipoint_threshold=2)
+        points = [V(i+1) for i in range(7)]
+
+        shares = sharer.share(V(12), 3, points)
+
+        self.assertEqual(shares, list(zip(points, [V(13), V(16), V(21), V(28), V(0), V(11), V(24)])))
+        self.assertEqual(list(sharer.trees), [tuple(points)])
+
+    def test_Shamir_ShareWithMultipointEvaluationFastRemainders_SameResultAsHorner(self):
+        """ threshold 160 with 256 points: the nodes of degree 128 and 64 use the power series remainder """
+        fields = [ZpField(4294967311, UnitTestRandomSource(range(1000, 2000))) for i in range(2)]
+        sharer = ShamirPointSharer(fields[0], multipoint_threshold=64)
+        horner = ShamirPointSharer(fields[1])
+        points = [[field.value_type(i+1) for i in range(256)] for field in fields]
+
+        shares = sharer.share(fields[0].value_type(12), 160, points[0])
+        tree = sharer.trees[tuple(points[0])]
+        inverses = [tree.root.left.inverse, tree.root.right.left.inverse]
+        shares_cached = sharer.share(fields[0].value_type(12), 160, points[0])
+
+        for result in (shares, shares_cached):
+            expected = horner.share(fields[1].value_type(12), 160, points[1])
+            self.assertEqual([(x.value, y.value) for x, y in result], [(x.value, y.value) for x, y in expected])
+        self.assertEqual([len(inverse) for inverse in inverses], [129, 65])
+        self.assertIs(tree.root.left.inverse, inverses[0])
+        self.assertIs(tree.root.right.left.inverse, inverses[1])
+
     def test_Shamir_WhenShared3OutOf7SharesAndGiven4Shares_SecretCanBeRecombined(self):
         field = ZpField(37)
         V = field.value_type
@@ -34,7 +69,7 @@ class TestShamir(unittest.TestCase):
                                    (V(5), V(0)), 
                                    (V(4), V(28))], x_recomb=V(0))
         
-        self.assertEquals(secret,
+        self.assertEqual(secret,
                           V(12))
 
     def test_Shamir_WhenShared3OutOf7SharesAndGiven4Shares_PolynomialCanBeRecombined(self):
@@ -47,7 +82,7 @@ class TestShamir(unittest.TestCase):
                                                    (V(5), V(0)), 
                                                    (V(4), V(28))])
         
-        self.assertEquals(polynom, Polynomial([V(0), V(1), V(0), V(12)]))
+        self.assertEqual(polynom, Polynomial([V(0), V(1), V(0), V(12)]))
         
     
     def test_Shamir_WhenShared3OutOf7SharesAndGiven5Shares_SecretCanBeRecombined(self):
@@ -74,7 +109,7 @@ class TestShamir(unittest.TestCase):
                                    (V(7), V(24)), 
                                    (V(5), V(0))], x_recomb=V(0))
         
-        self.assertEquals(secret, V(12))
+        self.assertEqual(secret, V(12))
         
     def test_Shamir_WhenShared3OutOf7SharesAndGiven3Shares_SecretCanBeRecombined(self):
         field = ZpField(37)
@@ -93,15 +128,15 @@ class TestShamir(unittest.TestCase):
         secret = sharer.recombine([(V(2), V(16)),
                                    (V(4), V(28))], x_recomb=V(0))
         
-        self.assertEquals(secret, V(4))
+        self.assertEqual(secret, V(4))
         
     def test_shamir_share_string(self):
         shamir = ShamirStringSharer( random_source=UnitTestRandomSource(range(50)))
         
-        shared_strings = shamir.share("the quick brown fox jumps over the lazy dog", 2, 3)
-        shared_strings_hex = [e.encode("hex") for e in shared_strings]
+        shared_strings = shamir.share(b"the quick brown fox jumps over the lazy dog", 2, 3)
+        shared_strings_hex = [e.hex() for e in shared_strings]
         
-        self.assertEquals(shared_strings_hex, 
+        self.assertEqual(shared_strings_hex, 
                           ["0074686520717569646b2062746f776e23666f78246a756d7573206f7c6572207b68652074617a7929646f670b",
                            "0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715",
                            "0274686520717569666b2062786f776e29666f782c6a756d7f73206f886572208968652084617a793b646f671f"])
@@ -113,9 +148,9 @@ class TestShamir(unittest.TestCase):
         data = ["0074686520717569646b2062746f776e23666f78246a756d7573206f7c6572207b68652074617a7929646f670b",
                 "0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715"]
     
-        result =  shamir.recombine([i.decode("hex") for i in data])
+        result =  shamir.recombine([bytes.fromhex(i) for i in data])
         
-        self.assertEquals(result, "the quick brown fox jumps over the lazy dog")
+        self.assertEqual(result, b"the quick brown fox jumps over the lazy dog")
 
     def test_Shamir_WhenSharingString2OutOf3WithFakeRandomAndGiven2Shares_ResultIsCorrect(self):
         """ testcase from fake random 2 out of 3 (2 other values)"""
@@ -124,9 +159,9 @@ class TestShamir(unittest.TestCase):
         data = ["0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715",
                 "0274686520717569666b2062786f776e29666f782c6a756d7f73206f886572208968652084617a793b646f671f"]
     
-        result =  shamir.recombine([i.decode("hex") for i in data])
+        result =  shamir.recombine([bytes.fromhex(i) for i in data])
         
-        self.assertEquals(result, "the quick brown fox jumps over the lazy dog")
+        self.assertEqual(result, b"the quick brown fox jumps over the lazy dog")
 
     def test_Shamir_WhenSharingString2OutOf3WithRealRandomAndGiven3Shares_ResultIsCorrect(self):
         """ testcase created with real random """
@@ -136,72 +171,284 @@ class TestShamir(unittest.TestCase):
                 "019cb454fd090488de15107ef9eb8cae58ad2b2102826cee8594500d4dddf33420c7004f0691388b259cfc1d57",
                 "0230da4ce454cc18a36a088d4429974e65d088f5730e68af0824e7dc311a33bde7f64de65329179420b9427882"]
     
-        result =  shamir.recombine([i.decode("hex") for i in data])
+        result =  shamir.recombine([bytes.fromhex(i) for i in data])
         
-        self.assertEquals(result, "the quick brown fox jumps over the lazy dog")
+        self.assertEqual(result, b"the quick brown fox jumps over the lazy dog")
 
     def test_Shamir_EncodeShareValues(self):
         shamir = ShamirStringSharer()
 
-        self.assertEquals(shamir.encode_share_values([0]).encode("hex"), "00000000")
-        self.assertEquals(shamir.encode_share_values([1]).encode("hex"), "00000001")
-        self.assertEquals(shamir.encode_share_values([1000]).encode("hex"), "000003e8")
-        self.assertEquals(shamir.encode_share_values([1000000]).encode("hex"), "000f4240")
-        self.assertEquals(shamir.encode_share_values([2**32-1]).encode("hex"), "ffffffff00")
-        self.assertEquals(shamir.encode_share_values([2**32]).encode("hex"), "ffffffff01")
-        self.assertEquals(shamir.encode_share_values([2**32+10]).encode("hex"), "ffffffff0b")
-        self.assertEquals(shamir.encode_share_values([2**32+40]).encode("hex"), "ffffffff29")
-        self.assertEquals(shamir.encode_share_values([1000, 2**32+40]).encode("hex"), "000003e8ffffffff29")
-        self.assertEquals(shamir.encode_share_values([0, 1, 1000, 2**32-2, 2**32-1, 2**32+40]).encode("hex"), "0000000000000001000003e8fffffffeffffffff00ffffffff29")
-        self.assertEquals(shamir.encode_share_values([ 2**32+40, 0, 2**32-1, 1, 1000, 2**32-2]).encode("hex"), "ffffffff2900000000ffffffff0000000001000003e8fffffffe")
+        self.assertEqual(shamir.encode_share_values([0]).hex(), "00000000")
+        self.assertEqual(shamir.encode_share_values([1]).hex(), "00000001")
+        self.assertEqual(shamir.encode_share_values([1000]).hex(), "000003e8")
+        self.assertEqual(shamir.encode_share_values([1000000]).hex(), "000f4240")
+        self.assertEqual(shamir.encode_share_values([2**32-1]).hex(), "ffffffff00")
+        self.assertEqual(shamir.encode_share_values([2**32]).hex(), "ffffffff01")
+        self.assertEqual(shamir.encode_share_values([2**32+10]).hex(), "ffffffff0b")
+        self.assertEqual(shamir.encode_share_values([2**32+40]).hex(), "ffffffff29")
+        self.assertEqual(shamir.encode_share_values([1000, 2**32+40]).hex(), "000003e8ffffffff29")
+        self.assertEqual(shamir.encode_share_values([0, 1, 1000, 2**32-2, 2**32-1, 2**32+40]).hex(), "0000000000000001000003e8fffffffeffffffff00ffffffff29")
+        self.assertEqual(shamir.encode_share_values([ 2**32+40, 0, 2**32-1, 1, 1000, 2**32-2]).hex(), "ffffffff2900000000ffffffff0000000001000003e8fffffffe")
         
 
     def test_Shamir_DecodeShareValues(self):
         shamir = ShamirStringSharer()
 
-        self.assertEquals(shamir.decode_share_values('00000000'.decode("hex")), [0])
-        self.assertEquals(shamir.decode_share_values('000003e8'.decode("hex")), [1000])
-        self.assertEquals(shamir.decode_share_values('000f4240'.decode("hex")), [1000000])
-        self.assertEquals(shamir.decode_share_values('ffffffff00'.decode("hex")), [2**32-1])
-        self.assertEquals(shamir.decode_share_values('ffffffff01'.decode("hex")), [2**32])
-        self.assertEquals(shamir.decode_share_values('ffffffff0b'.decode("hex")), [2**32+10])
-        self.assertEquals(shamir.decode_share_values('ffffffff29'.decode("hex")), [2**32+40])
-        self.assertEquals(shamir.decode_share_values('000003e8ffffffff29'.decode("hex")), [1000, 2**32+40])
-        self.assertEquals(shamir.decode_share_values('0000000000000001000003e8fffffffeffffffff00ffffffff29'.decode("hex")), [0, 1, 1000, 2**32-2, 2**32-1, 2**32+40])
-        self.assertEquals(shamir.decode_share_values('ffffffff2900000000ffffffff0000000001000003e8fffffffe'.decode("hex")), [2**32+40, 0, 2**32-1, 1, 1000, 2**32-2])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('00000000')), [0])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('000003e8')), [1000])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('000f4240')), [1000000])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('ffffffff00')), [2**32-1])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('ffffffff01')), [2**32])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('ffffffff0b')), [2**32+10])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('ffffffff29')), [2**32+40])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('000003e8ffffffff29')), [1000, 2**32+40])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('0000000000000001000003e8fffffffeffffffff00ffffffff29')), [0, 1, 1000, 2**32-2, 2**32-1, 2**32+40])
+        self.assertEqual(shamir.decode_share_values(bytes.fromhex('ffffffff2900000000ffffffff0000000001000003e8fffffffe')), [2**32+40, 0, 2**32-1, 1, 1000, 2**32-2])
 
 
     def test_Shamir_PackVarInt(self):
-        self.assertEquals(pack_varint(0).encode("hex"), "00")
-        self.assertEquals(pack_varint(1).encode("hex"), "01")
-        self.assertEquals(pack_varint(100).encode("hex"), "64")
-        self.assertEquals(pack_varint(200).encode("hex"), "c8")
-        self.assertEquals(pack_varint(252).encode("hex"), "fc")
-        self.assertEquals(pack_varint(253).encode("hex"), "fd00fd")
-        self.assertEquals(pack_varint(254).encode("hex"), "fd00fe")
-        self.assertEquals(pack_varint(255).encode("hex"), "fd00ff")
-        self.assertEquals(pack_varint(256).encode("hex"), "fd0100")
-        self.assertEquals(pack_varint(65535).encode("hex"), "fdffff")
-        self.assertEquals(pack_varint(65536).encode("hex"), "fe00010000")
-        self.assertEquals(pack_varint(2**32-1).encode("hex"), "feffffffff")
-        self.assertEquals(pack_varint(2**32).encode("hex"), "ff0000000100000000")
-        self.assertEquals(pack_varint(2**32+1000000000).encode("hex"), "ff000000013b9aca00")
+        self.assertEqual(pack_varint(0).hex(), "00")
+        self.assertEqual(pack_varint(1).hex(), "01")
+        self.assertEqual(pack_varint(100).hex(), "64")
+        self.assertEqual(pack_varint(200).hex(), "c8")
+        self.assertEqual(pack_varint(252).hex(), "fc")
+        self.assertEqual(pack_varint(253).hex(), "fd00fd")
+        self.assertEqual(pack_varint(254).hex(), "fd00fe")
+        self.assertEqual(pack_varint(255).hex(), "fd00ff")
+        self.assertEqual(pack_varint(256).hex(), "fd0100")
+        self.assertEqual(pack_varint(65535).hex(), "fdffff")
+        self.assertEqual(pack_varint(65536).hex(), "fe00010000")
+        self.assertEqual(pack_varint(2**32-1).hex(), "feffffffff")
+        self.assertEqual(pack_varint(2**32).hex(), "ff0000000100000000")
+        self.assertEqual(pack_varint(2**32+1000000000).hex(), "ff000000013b9aca00")
 
     def test_Shamir_UnpackVarInt(self):
-        self.assertEquals(unpack_varint("00".decode("hex")), (0, 1)) # returns (value, nbparsed)
-        self.assertEquals(unpack_varint("01".decode("hex")), (1, 1))
-        self.assertEquals(unpack_varint("64".decode("hex")), (100, 1))
-        self.assertEquals(unpack_varint("c8".decode("hex")), (200, 1))
-        self.assertEquals(unpack_varint("fc".decode("hex")), (252, 1))
-        self.assertEquals(unpack_varint("fd00fd".decode("hex")), (253, 3))
-        self.assertEquals(unpack_varint("fd00fe".decode("hex")), (254, 3))
-        self.assertEquals(unpack_varint("fd00ff".decode("hex")), (255, 3))
-        self.assertEquals(unpack_varint("fd0100".decode("hex")), (256, 3))
-        self.assertEquals(unpack_varint("fdffff".decode("hex")), (65535, 3))
-        self.assertEquals(unpack_varint("fe00010000".decode("hex")), (65536, 5))
-        self.assertEquals(unpack_varint("feffffffff".decode("hex")), (2**32-1, 5))
-        self.assertEquals(unpack_varint("ff0000000100000000".decode("hex")), (2**32, 9))
-        self.assertEquals(unpack_varint("ff000000013b9aca00".decode("hex")), (2**32+1000000000, 9))
+        self.assertEqual(unpack_varint(bytes.fromhex("00")), (0, 1)) # returns (value, nbparsed)
+        self.assertEqual(unpack_varint(bytes.fromhex("01")), (1, 1))
+        self.assertEqual(unpack_varint(bytes.fromhex("64")), (100, 1))
+        self.assertEqual(unpack_varint(bytes.fromhex("c8")), (200, 1))
+        self.assertEqual(unpack_varint(bytes.fromhex("fc")), (252, 1))
+        self.assertEqual(unpack_varint(bytes.fromhex("fd00fd")), (253, 3))
+        self.assertEqual(unpack_varint(bytes.fromhex("fd00fe")), (254, 3))
+        self.assertEqual(unpack_varint(bytes.fromhex("fd00ff")), (255, 3))
+        self.assertEqual(unpack_varint(bytes.fromhex("fd0100")), (256, 3))
+        self.assertEqual(unpack_varint(bytes.fromhex("fdffff")), (65535, 3))
+        self.assertEqual(unpack_varint(bytes.fromhex("fe00010000")), (65536, 5))
+        self.assertEqual(unpack_varint(bytes.fromhex("feffffffff")), (2**32-1, 5))
+        self.assertEqual(unpack_varint(bytes.fromhex("ff0000000100000000")), (2**32, 9))
+        self.assertEqual(unpack_varint(bytes.fromhex("ff000000013b9aca00")), (2**32+1000000000, 9))
+
+    def test_ShamirByteSharer_ShareAndRecombine(self):
+        secret = b"the quick brown fox jumps over the lazy dog"
+        shamir = ShamirByteSharer()
+
+        shares = shamir.share(secret, 3, 5)
+
+        self.assertEqual([len(s) for s in shares], [len(secret) + 1] * 5)
+        self.assertEqual(shamir.recombine([shares[4], shares[0], shares[2]]), secret)
+        self.assertEqual(shamir.recombine(shares), secret)
+
+    def test_ShamirByteSharer_SameSharesAsPointSharer(self):
+        field = GF256Field(UnitTestRandomSource(range(10, 20)))
+        V = field.value_type
+        points = [V(i+1) for i in range(4)]
+        expected = [ShamirPointSharer(field).share(V(b), 3, points) for b in bytearray(b"ab")]
+        shamir = ShamirByteSharer(random_source=UnitTestRandomSource(range(10, 20)))
+
+        shares = shamir.share(b"ab", 3, 4)
+
+        self.assertEqual(shares, [struct.pack("BBB", i, expected[0][i][1].value, expected[1][i][1].value)
+                                  for i in range(4)])
+
+    def test_Shamir_EncodeDecodeShareValues_RoundTrip(self):
+        shamir = ShamirStringSharer()
+        values = [0x00ffffff, 0xffffff00, 2**32-1, 0xffffffff-1, 2**32+14, 1, 2**32-1]
+
+        data = shamir.encode_share_values(values)
+
+        self.assertEqual(len(data), 4 * 7 + 3)
+        self.assertEqual(shamir.decode_share_values(data), values)
+        self.assertEqual(shamir.decode_share_values(memoryview(data)), values)
+
+    def test_Shamir_DecodeShareValuesInto_PreallocatedArray(self):
+        shamir = ShamirStringSharer()
+        out = array.array("Q", [0] * 8)
+
+        count = shamir.decode_share_values_into(bytes.fromhex("0000000000000001000003e8fffffffeffffffff00ffffffff29"), out)
+
+        self.assertEqual(count, 6)
+        self.assertEqual(list(out[:count]), [0, 1, 1000, 2**32-2, 2**32-1, 2**32+40])
+
+    def test_Shamir_DecodeShareValuesInto_WhenArrayTooShort_RaisesEncodingError(self):
+        shamir = ShamirStringSharer()
+
+        for data, size in [("0000000000000001000003e8", 2), ("00000000ffffffff29", 1)]:
+            out = array.array("Q", [0] * size)
+            self.assertRaises(EncodingError, shamir.decode_share_values_into, bytes.fromhex(data), out)
+            self.assertEqual(len(out), size)
+
+    def test_Shamir_DecodeShareValues_WhenTruncated_RaisesEncodingError(self):
+        shamir = ShamirStringSharer()
+
+        self.assertRaises(EncodingError, shamir.decode_share_values, bytes.fromhex("00000001000003"))
+        self.assertRaises(EncodingError, shamir.decode_share_values, bytes.fromhex("00000001ffffffff"))
+
+    def test_Shamir_DecodeShareValuesPartial_ReturnsConsumedBytes(self):
+        shamir = ShamirStringSharer()
+
+        self.assertEqual(shamir.decode_share_values_partial(bytes.fromhex("00000001ffffffff")), ([1], 4))
+        self.assertEqual(shamir.decode_share_values_partial(bytes.fromhex("00000001ffffffff0000")), ([1, 2**32-1], 9))
+
+    def test_Shamir_ShareStream_SameSharesAsShare(self):
+        secret = b"the quick brown fox jumps over the lazy dog"
+        expected = ShamirStringSharer(random_source=UnitTestRandomSource(range(50))).share(secret, 2, 3)
+        shamir = ShamirStringSharer(random_source=UnitTestRandomSource(range(50)))
+        sinks = [io.BytesIO() for i in range(3)]
+
+        shamir.share_stream(io.BytesIO(secret), sinks, 2, chunk_size=8)
+
+        self.assertEqual([sink.getvalue() for sink in sinks], expected)
+
+    def test_Shamir_RecombineStream_ResultIsCorrect(self):
+        data = ["0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715",
+                "0274686520717569666b2062786f776e29666f782c6a756d7f73206f886572208968652084617a793b646f671f"]
+        shamir = ShamirStringSharer()
+        sink = io.BytesIO()
+
+        shamir.recombine_stream([io.BytesIO(bytes.fromhex(d)) for d in data], sink, chunk_size=6)
+
+        self.assertEqual(sink.getvalue(), b"the quick brown fox jumps over the lazy dog")
+
+    def test_Shamir_RecombineStream_WhenSharesHaveDifferentLengths_RaisesEncodingError(self):
+        data = ["0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715",
+                "0274686520717569666b2062786f776e29666f782c6a756d7f73206f886572208968652084617a793b"]
+        shamir = ShamirStringSharer()
+
+        self.assertRaises(EncodingError, shamir.recombine_stream,
+                          [io.BytesIO(bytes.fromhex(d)) for d in data], io.BytesIO())
+
+    def test_Shamir_RecombineRobust_CorruptedSharesAreCorrectedAndReported(self):
+        secret = b"the quick brown fox jumps over the lazy dog"
+        shamir = ShamirStringSharer()
+        shares = shamir.share(secret, 3, 8)
+        shares[1] = shares[1][:5] + bytes([shares[1][5] ^ 1]) + shares[1][6:]
+        shares[6] = shares[6][:30] + bytes([shares[6][30] ^ 0x80]) + shares[6][31:]
+
+        self.assertEqual(shamir.recombine_robust(shares, 3), (secret, [1, 6]))
+        self.assertEqual(shamir.recombine_robust(shares[2:6], 3), (secret, []))
+
+    def test_Shamir_RecombineRobust_WhenTooManyCorruptedShares_RaisesDecodingError(self):
+        shamir = ShamirStringSharer()
+        shares = shamir.share(b"the quick brown fox", 3, 5)
+        shares = [s[:5] + bytes([s[5] ^ 1]) + s[6:] for s in shares[:2]] + shares[2:]
+
+        self.assertRaises(DecodingError, shamir.recombine_robust, shares, 3)
+
+    def test_Shamir_RecombineRobustStream_SameResultAsRecombineRobust(self):
+        secret = os.urandom(1001)
+        shamir = ShamirStringSharer()
+        shares = shamir.share(secret, 3, 7)
+        shares[2] = shares[2][:500] + bytes([shares[2][500] ^ 1]) + shares[2][501:]
+        block_share = encode_block_share(6, shamir.decode_share(shares[6])[1], 3, len(secret), chunk_blocks=16)
+        sources = [io.BytesIO(share) for share in shares[:6]] + [BlockShare(block_share)]
+        sink = io.BytesIO()
+
+        self.assertEqual(shamir.recombine_robust_stream(sources, sink, 3, chunk_size=64), [2])
+        self.assertEqual(sink.getvalue(), secret)
+        self.assertEqual(shamir.recombine_robust_stream([io.BytesIO(share) for share in shares], None, 3), [2])
+
+    def test_Shamir_RecombineStream_BlockShares(self):
+        secret = os.urandom(1001)
+        shamir = ShamirStringSharer()
+        shares = shamir.share(secret, 2, 3, container=True)
+        sink = io.BytesIO()
+
+        shamir.recombine_stream([BlockShare(shares[2]), BlockShare(shares[0])], sink, chunk_size=100)
+        self.assertEqual(sink.getvalue(), secret)
+
+    def test_Shamir_RecombineRange_SameResultAsSlicingTheSecret(self):
+        secret = b"the quick brown fox jumps over the lazy dog"
+        shamir = ShamirStringSharer()
+        for container in [False, True]:
+            shares = shamir.share(secret, 3, 5, container=container)[1:4]
+            for offset, length in [(0, 3), (4, 4), (5, 10), (40, 10), (43, 1), (50, 2), (0, 100)]:
+                self.assertEqual(shamir.recombine_range(shares, offset, length), secret[offset:offset+length])
+
+    def test_ShareIndex_values_WithFiveByteValues(self):
+        shamir = ShamirStringSharer()
+        values = [0, 2**32-1, 5, 2**32+3, 2**32+14, 9, 10] * 3
+        index = ShareIndex(shamir.encode_share(2, values))
+
+        self.assertEqual(index.share_idx, 2)
+        self.assertEqual(len(index), len(values))
+        self.assertEqual(index.values(), values)
+        for start, end in [(0, 1), (1, 2), (1, 4), (3, 5), (6, 15), (14, 30)]:
+            self.assertEqual(index.values(start, end), values[start:end])
+        self.assertRaises(EncodingError, ShareIndex, shamir.encode_share(2, values)[:-1])
+
+    def test_bytes_to_blocks_blocks_to_bytes_RoundTrip(self):
+        for secret in [b"", b"abc", b"abcd", bytes(range(256)) * 9 + b"x"]:
+            blocks = bytes_to_blocks(memoryview(bytearray(secret)))
+
+            self.assertEqual([int(v) for v in blocks], list(bytes_to_blocks(secret, arrays=False)))
+            self.assertEqual(blocks_to_bytes(blocks), secret)
+            self.assertEqual(blocks_to_bytes(list(bytes_to_blocks(secret, arrays=False))), secret)
+
+    def test_Shamir_decode_share_OldFormatFromAnyBuffer(self):
+        shamir = ShamirStringSharer()
+        share = bytes.fromhex("0174686520717569656b2062766f776e26666f78286a756d7a73206f82657220826865207c617a7932646f6715")
+        expected = shamir.decode_share(share)
+
+        self.assertEqual(shamir.decode_share(bytearray(share)), expected)
+        self.assertEqual(shamir.decode_share(memoryview(share)), expected)
+        self.assertEqual(shamir.decode_share_values(share, 1), expected[1])
+
+    def test_Shamir_ShareMany_SameSharesAsShare(self):
+        secrets = [b"the quick brown fox", b"jumps over the lazy", b"dog"]
+        expected_sharer = ShamirStringSharer(random_source=UnitTestRandomSource(range(100)))
+        expected = [expected_sharer.share(secret, 3, 5) for secret in secrets[:2]]
+        shamir = ShamirStringSharer(random_source=UnitTestRandomSource(range(100)))
+
+        batch = shamir.share_many(secrets[:2], 3, 5)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual([batch.shares(i) for i in range(2)], expected)
+        self.assertEqual(batch.column(1), [expected[0][1], expected[1][1]])
+        self.assertRaises(ValueError, shamir.share_many, secrets, 3, 5)
+
+    def test_Shamir_ShareMany_DifferentLengthsSamePaddedLength_SameSharesAsShare(self):
+        secrets = [b"the quick brown fox", b"dog jumps over fox"]
+        expected_sharer = ShamirStringSharer(random_source=UnitTestRandomSource(range(100)))
+        expected = [expected_sharer.share(secret, 2, 3) for secret in secrets]
+        shamir = ShamirStringSharer(random_source=UnitTestRandomSource(range(100)))
+
+        batch = shamir.share_many(secrets, 2, 3)
+
+        self.assertEqual([batch.shares(i) for i in range(2)], expected)
+
+    def test_Shamir_ShareMany_AllSharesWithFiveByteValues_SameSharesAsShare(self):
+        secrets = [b"\x00" * 8, b"the fox!", b"\x00\x00\x00\x00jump"]
+        # with the coefficient P-1, the values of a zero block are P-x >= 2**32-1, encoded on 5 bytes
+        randoms = [4294967311 - 1] * 100
+        expected_sharer = ShamirStringSharer(random_source=UnitTestRandomSource(randoms))
+        expected = [expected_sharer.share(secret, 2, 4) for secret in secrets]
+        shamir = ShamirStringSharer(random_source=UnitTestRandomSource(randoms))
+
+        batch = shamir.share_many(secrets, 2, 4)
+
+        self.assertTrue(any(len(share) != len(expected[0][0]) for shares in expected for share in shares))
+        self.assertEqual(batch.all_shares(), expected)
+        self.assertEqual(batch.column(2), [shares[2] for shares in expected])
+
+    def test_Shamir_RecombineMany_ResultIsCorrect(self):
+        secrets = [b"the quick brown fox", b"jumps over the lazy", b"dog jumps over fox"]
+        shamir = ShamirStringSharer()
+        batch = shamir.share_many(secrets[:2], 3, 5)
+        groups = [batch.shares(0)[:3], batch.shares(1)[2:], shamir.share(secrets[2], 2, 3)[1:]]
+
+        self.assertEqual(shamir.recombine_many(groups), secrets)
+        shamir.vectorized = None
+        self.assertEqual(shamir.recombine_many(groups), secrets)
 
         
     
@@ -12,10 +12,9 @@ class TestShamirSlow(unittest.TestCase):
     def test_shamir_share_string_many_shares(self):
         shamir = ShamirStringSharer( random_source=UnitTestRandomSource(range(5000)))
         
-        shared_strings = shamir.share("abcd", 500, 1000)
-        shared_strings_hex = [e.encode("hex") for e in shared_strings]
-        print len(shared_strings)
-        self.assertEquals(shared_strings_hex[-3:], 
+        shared_strings = shamir.share(b"abcd", 500, 1000)
+        shared_strings_hex = [e.hex() for e in shared_strings]
+        self.assertEqual(shared_strings_hex[-3:], 
                           ["fd03e5fb1f47b53999f54a",
                            "fd03e60142cc5c6b6db0bd",
                            "fd03e7b77b0a13da539d9b"])
@@ -35,16 +34,16 @@ class TestShamirSlow(unittest.TestCase):
 
         for b in range(256): # iterate over all encodable byte values
             for r in range(257): # iterate over all random values 
-                sharedbyte = shamir.share(chr(b), 2, 3)
-                share1_counts[(b, decode_share(sharedbyte[0])[1][0])] += 1
-                share2_counts[(b, decode_share(sharedbyte[1])[1][0])] += 1
-                share3_counts[(b, decode_share(sharedbyte[2])[1][0])] += 1
+                sharedbyte = shamir.share(bytes([b]), 2, 3)
+                share1_counts[(b, shamir.decode_share(sharedbyte[0])[1][0])] += 1
+                share2_counts[(b, shamir.decode_share(sharedbyte[1])[1][0])] += 1
+                share3_counts[(b, shamir.decode_share(sharedbyte[2])[1][0])] += 1
 
         for b in range(256): # iterate over all encodable byte values
             for r in range(257): # iterate over all random values 
-                self.assertEquals(share1_counts[(b, r)], 1)
-                self.assertEquals(share2_counts[(b, r)], 1)
-                self.assertEquals(share3_counts[(b, r)], 1)'''
+                self.assertEqual(share1_counts[(b, r)], 1)
+                self.assertEqual(share2_counts[(b, r)], 1)
+                self.assertEqual(share3_counts[(b, r)], 1)'''
 
 
         
@@ -0,0 +1,70 @@
+import unittest
+import random
+from shamir.field import ZpField
+from shamir.random_source import UnitTestRandomSource
+from shamir.shamir import ShamirStringSharer
+from shamir.vectorized import VectorizedSharer, matmul_mod, mulmod, numpy
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestVectorized(unittest.TestCase):
+    def test_mulmod_SameResultAsPythonIntegers(self):
+        P = 4294967311
+        rand = random.Random(1)
+        a = [rand.randrange(P) for i in range(100)] + [P-1]
+        b = [rand.randrange(P) for i in range(100)] + [P-1]
+
+        result = mulmod(a, b, P)
+
+        self.assertEqual(result.tolist(), [(x * y) % P for x, y in zip(a, b)])
+
+    def test_matmul_mod_SmallLimbsAndColumns_SameResultAsPythonIntegers(self):
+        P = 4294967311
+        rand = random.Random(2)
+        for inner, bmax in [(4, 100), (4, P), (2**16 + 1, P)]:
+            a = [[rand.randrange(P) for j in range(inner)] for i in range(3)]
+            b = [[rand.randrange(bmax) for j in range(2)] for i in range(inner)]
+            expected = [[sum(x * y for x, y in zip(row, column)) % P for column in zip(*b)] for row in a]
+
+            result = matmul_mod(numpy.array(a, dtype=numpy.uint64), numpy.array(b, dtype=numpy.uint64), P)
+            self.assertEqual(result.tolist(), expected)
+
+    def test_VectorizedSharer_share_SameResultAsPointSharer(self):
+        field = ZpField(37, UnitTestRandomSource(range(2)))
+        sharer = VectorizedSharer(field)
+
+        shares = sharer.share([12], 3, range(1, 8))
+
+        self.assertEqual(shares.tolist(), [[13, 16, 21, 28, 0, 11, 24]])
+
+    def test_VectorizedSharer_WhenLargePoints_NoOverflow(self):
+        P = 4294967311
+        field = ZpField(P, UnitTestRandomSource([P-1, P-2]))
+        sharer = VectorizedSharer(field)
+        points = [2**40 - 1, P-1]
+
+        shares = sharer.share([P-3], 3, points)
+
+        self.assertEqual(shares.tolist(), [[((P-2) * x * x + (P-1) * x + P-3) % P for x in points]])
+
+    def test_ShamirStringSharer_encode_share_values_SameResultForArrays(self):
+        sharer = ShamirStringSharer()
+        values = [0, 1, 2**32-2, 2**32-1, 5, 2**32+14, 4294967310, 7]
+
+        encoded = sharer.encode_share_values(numpy.array(values, dtype=numpy.uint64))
+
+        self.assertEqual(encoded, sharer.encode_share_values(values))
+        self.assertEqual(sharer.decode_share_values(encoded), values)
+
+    def test_ShamirStringSharer_share_blocks_SameResultWithAndWithoutNumpy(self):
+        rand = random.Random(2)
+        blocks = [rand.randrange(2**32) for i in range(50)]
+        vectorized = ShamirStringSharer(random_source=UnitTestRandomSource(range(1000)))
+        pure = ShamirStringSharer(random_source=UnitTestRandomSource(range(1000)))
+        pure.vectorized = None
+
+        self.assertEqual(vectorized.share_blocks(blocks, 5, 9), pure.share_blocks(blocks, 5, 9))
+
+
+if __name__ == "__main__":
+    unittest.main()
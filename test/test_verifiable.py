@@ -0,0 +1,123 @@
+import hashlib
+import io
+import itertools
+import unittest
+from shamir.random_source import UnitTestRandomSource
+from shamir.shamir import EncodingError
+from shamir.verifiable import G, H, G_POW, P, Q, VerifiableSharer, VerificationError, decode_commitments
+
+SECRET = b"the quick brown fox jumps over the lazy dog"
+
+
+def is_probable_prime(n, bases=(2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)):
+    """ Miller-Rabin test """
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for i in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def shake_int(tag, size):
+    return int.from_bytes(hashlib.shake_256(tag).digest(size), "big")
+
+def corrupt(share, position):
+    data = bytearray(share)
+    data[position] ^= 1
+    return bytes(data)
+
+
+class TestVerifiable(unittest.TestCase):
+    def test_Group_SubgroupOfOrderP(self):
+        self.assertEqual((P.bit_length(), Q.bit_length()), (256, 2048))
+        self.assertTrue(is_probable_prime(P))
+        self.assertTrue(is_probable_prime(Q))
+        self.assertEqual((Q - 1) % P, 0)
+        self.assertNotEqual(G, 1)
+        self.assertNotEqual(H, 1)
+        self.assertEqual(pow(G, P, Q), 1)
+        self.assertEqual(pow(H, P, Q), 1)
+
+    def test_Group_DerivedFromShake(self):
+        start = shake_int(b"shamir pedersen q", 32) | 2**255 | 1
+        r = (Q - 1) // P
+        r_start = (shake_int(b"shamir pedersen Q", 256) | 2**2047) // P
+
+        self.assertEqual([n for n in range(start, P + 1, 2) if is_probable_prime(n, (2, 3))], [P])
+        self.assertEqual(r % 2, 0)
+        self.assertTrue(r_start < r < r_start + 4096)
+
+    def test_FixedBaseExponentiator_SameResultAsPow(self):
+        for e in [0, 1, 15, 16, 255, 256, 65537, 2**128 + 3, P - 1]:
+            self.assertEqual(G_POW.pow(e), pow(G, e, Q))
+
+    def test_VerifiableSharer_ValidSharesAreVerified(self):
+        sharer = VerifiableSharer()
+
+        shares, commitments = sharer.share(SECRET, 3, 5)
+
+        self.assertEqual(decode_commitments(commitments)[0], 3)
+        self.assertEqual(len(decode_commitments(commitments)[1]), 2)
+        self.assertEqual(sharer.verify_shares(shares, commitments), [True] * 5)
+        self.assertEqual(sharer.recombine(shares[2:]), SECRET)
+
+    def test_VerifiableSharer_CorruptedSharesAreDetected(self):
+        sharer = VerifiableSharer()
+        shares, commitments = sharer.share(SECRET, 3, 5)
+        shares[1] = corrupt(shares[1], 20)     # share value
+        shares[3] = corrupt(shares[3], -1)     # blinding value
+
+        self.assertEqual(sharer.verify_shares(shares, commitments), [True, False, True, False, True])
+        self.assertFalse(sharer.verify(shares[0][:-1], commitments))
+        self.assertEqual(sharer.recombine(shares, commitments), SECRET)
+        self.assertRaises(VerificationError, sharer.recombine, shares[:4], commitments)
+
+    def test_VerifiableSharer_WhenCommitmentsOfAnotherSecret_SharesAreRejected(self):
+        sharer = VerifiableSharer()
+        shares, commitments = sharer.share(SECRET, 2, 3)
+        other_commitments = sharer.share(SECRET, 2, 3)[1]
+
+        self.assertEqual(sharer.verify_shares(shares, other_commitments), [False] * 3)
+        self.assertRaises(EncodingError, decode_commitments, commitments[:-1])
+
+    def test_VerifiableSharer_WhenValuesOutOfRange_ShareIsRejected(self):
+        sharer = VerifiableSharer()
+        shares, commitments = sharer.share(SECRET, 2, 3)
+        forged = shares[0][:-32] + (2**256 - 1).to_bytes(32, "big")
+
+        self.assertEqual(sharer.verify_shares([forged, shares[0][:-1]], commitments), [False, False])
+        self.assertRaises(EncodingError, sharer.recombine, [forged, shares[1]])
+
+    def test_VerifiableSharer_WhenCommitmentOutsideTheSubgroup_SameResultForAllVerifiers(self):
+        shares, commitments = VerifiableSharer().share(SECRET, 2, 3)
+        # Q-1 has order 2: without the projection, the shares would only pass for an even coefficient of this block
+        value = int.from_bytes(commitments[-256:], "big") * (Q - 1) % Q
+        forged = commitments[:-256] + value.to_bytes(256, "big")
+        odd = VerifiableSharer(check_random_source=UnitTestRandomSource(itertools.count(1, 2)))
+        even = VerifiableSharer(check_random_source=UnitTestRandomSource(itertools.count(2, 2)))
+
+        self.assertEqual(odd.verify_shares(shares, forged), [True] * 3)
+        self.assertEqual(even.verify_shares(shares, forged), [True] * 3)
+        self.assertEqual(odd.verify_shares([corrupt(shares[0], -1)], forged), [False])
+        self.assertRaises(EncodingError, decode_commitments, commitments[:-256] + Q.to_bytes(256, "big"))
+
+    def test_VerifiableSharer_VerifyStream_ByChunks(self):
+        sharer = VerifiableSharer()
+        shares, commitments = sharer.share(SECRET * 4, 3, 5)
+        shares[2] = corrupt(shares[2], -40)
+
+        results = sharer.verify_stream([io.BytesIO(share) for share in shares], io.BytesIO(commitments), chunk_blocks=2)
+        self.assertEqual(results, [True, True, False, True, True])
+        self.assertEqual(sharer.verify_stream([io.BytesIO(shares[0] + b"\x00")], io.BytesIO(commitments)), [False])
+        self.assertRaises(EncodingError, sharer.verify_stream, [io.BytesIO(shares[0])], io.BytesIO(commitments[:-1]))
+
+if __name__ == "__main__":
+    unittest.main()